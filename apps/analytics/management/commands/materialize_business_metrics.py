@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from apps.analytics.metrics import backfill_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily BusinessMetrics rollups that back the analytics dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD), defaults to the first sale/pipeline')
+        parser.add_argument('--until', help='Last day to rebuild (YYYY-MM-DD), defaults to today')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        since = date.fromisoformat(options['since']) if options['since'] else None
+        until = date.fromisoformat(options['until']) if options['until'] else None
+        for tenant in tenants:
+            written = backfill_daily_metrics(tenant, since=since, until=until)
+            self.stdout.write(f"{tenant.slug}: {written} metric rows written")
+        self.stdout.write(self.style.SUCCESS('Business metrics materialized'))
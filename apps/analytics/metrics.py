@@ -0,0 +1,345 @@
+"""
+Daily per-tenant/per-store rollups of sales and pipeline activity.
+
+Sale, SaleItem and SalesPipeline writes mark the day they belong to as dirty
+(see signals.py) and a Celery task re-materializes that day's BusinessMetrics
+rows from a handful of grouped queries. A nightly task reconciles the last few
+days to pick up writes that bypass signals (queryset.update(), moved close
+dates) and refreshes that could not be queued. Dashboards read these rows
+instead of aggregating Sale/SalesPipeline on every request; migration 0003
+materialized the history that predates them.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.sales.models import Sale, SaleItem, SalesPipeline
+from apps.tenants.models import Tenant
+from shared.cache import bump_on_commit
+from .models import BusinessMetrics
+
+
+REVENUE_STATUSES = ['confirmed', 'processing', 'shipped', 'delivered']
+DAILY = 'daily'
+
+# Per-category and per-stage metrics share one metric_type, keyed by name prefix
+CATEGORY_REVENUE = 'category_revenue:'
+STAGE_COUNT = 'stage_count:'
+STAGE_VALUE = 'stage_value:'
+
+# Seconds a dirty day waits before it is re-materialized; writes landing in
+# that window are folded into the same refresh
+REFRESH_DELAY = 10
+RECONCILE_DAYS = 3
+BACKFILL_WINDOW_DAYS = 31
+
+MetricType = BusinessMetrics.MetricType
+
+logger = logging.getLogger(__name__)
+
+
+def day_bounds(day):
+    """(start, end) datetimes of a calendar day in the current time zone"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def collect_daily_metrics(tenant, start, end):
+    """
+    Aggregate a tenant's activity for the days start..end (inclusive) into
+    {(day, store_id): {(metric_type, metric_name): value}}.
+    Sales and pipelines are attributed to the store of their sales rep.
+    """
+    metrics = defaultdict(lambda: defaultdict(Decimal))
+    revenue = Q(status__in=REVENUE_STATUSES)
+
+    sales = Sale.objects.filter(tenant=tenant, created_at__date__range=(start, end)).values(
+        day=TruncDate('created_at'),
+        store=F('sales_representative__store'),
+    ).annotate(
+        orders=Count('id'),
+        paid_orders=Count('id', filter=revenue),
+        gross_sales=Sum('total_amount'),
+        revenue=Sum('total_amount', filter=revenue),
+    ).order_by()
+    for row in sales:
+        bucket = metrics[row['day'], row['store']]
+        bucket[MetricType.SALES, 'orders'] += row['orders']
+        bucket[MetricType.SALES, 'paid_orders'] += row['paid_orders']
+        bucket[MetricType.SALES, 'gross_sales'] += row['gross_sales'] or 0
+        bucket[MetricType.REVENUE, 'revenue'] += row['revenue'] or 0
+
+    items = SaleItem.objects.filter(
+        sale__tenant=tenant,
+        sale__status__in=REVENUE_STATUSES,
+        sale__created_at__date__range=(start, end),
+    ).values(
+        day=TruncDate('sale__created_at'),
+        store=F('sale__sales_representative__store'),
+        category=F('product__category'),
+    ).annotate(total=Sum('total_price')).order_by()
+    for row in items:
+        name = f"{CATEGORY_REVENUE}{row['category'] or ''}"
+        metrics[row['day'], row['store']][MetricType.REVENUE, name] += row['total'] or 0
+
+    # Pipelines count towards the day they were created, in their current stage
+    pipelines = SalesPipeline.objects.filter(tenant=tenant, created_at__date__range=(start, end)).values(
+        'stage',
+        day=TruncDate('created_at'),
+        store=F('sales_representative__store'),
+    ).annotate(count=Count('id'), value=Sum('expected_value')).order_by()
+    for row in pipelines:
+        bucket = metrics[row['day'], row['store']]
+        bucket[MetricType.PIPELINE, STAGE_COUNT + row['stage']] += row['count']
+        bucket[MetricType.PIPELINE, STAGE_VALUE + row['stage']] += row['value'] or 0
+
+    # Won deals count towards the day they were closed
+    won = SalesPipeline.objects.filter(tenant=tenant, stage=SalesPipeline.Stage.CLOSED_WON).annotate(
+        closed_on=Coalesce('actual_close_date', TruncDate('created_at')),
+    ).filter(closed_on__range=(start, end)).values(
+        'closed_on',
+        store=F('sales_representative__store'),
+    ).annotate(count=Count('id')).order_by()
+    for row in won:
+        metrics[row['closed_on'], row['store']][MetricType.CONVERSION, 'deals_won'] += row['count']
+
+    return metrics
+
+
+def materialize_daily_metrics(tenant, start, end=None):
+    """Rebuild the daily BusinessMetrics rows of a tenant for start..end (inclusive); returns rows written"""
+    end = end or start
+    first, _ = day_bounds(start)
+    _, last = day_bounds(end)
+
+    with transaction.atomic():
+        # Serialize refreshes per tenant so overlapping runs can't interleave delete/insert
+        list(Tenant.objects.select_for_update().filter(pk=tenant.pk).values_list('pk', flat=True))
+        rows = []
+        for (day, store_id), values in collect_daily_metrics(tenant, start, end).items():
+            period_start, period_end = day_bounds(day)
+            for (metric_type, metric_name), value in values.items():
+                if not value:
+                    continue
+                rows.append(BusinessMetrics(
+                    tenant=tenant,
+                    store_id=store_id,
+                    metric_type=metric_type,
+                    metric_name=metric_name,
+                    value=value,
+                    period_start=period_start,
+                    period_end=period_end,
+                    period_type=DAILY,
+                ))
+        BusinessMetrics.objects.filter(
+            tenant=tenant,
+            period_type=DAILY,
+            period_start__gte=first,
+            period_start__lt=last,
+        ).delete()
+        BusinessMetrics.objects.bulk_create(rows, batch_size=1000)
+        # Dashboards cached before the rollup caught up must not outlive it
+        bump_on_commit(tenant.pk, 'sales')
+    return len(rows)
+
+
+def first_activity_date(tenant):
+    """Earliest day with a sale or pipeline for the tenant, or None"""
+    days = [
+        Sale.objects.filter(tenant=tenant).aggregate(first=Min('created_at'))['first'],
+        SalesPipeline.objects.filter(tenant=tenant).aggregate(first=Min('created_at'))['first'],
+    ]
+    days = [timezone.localtime(day).date() for day in days if day]
+    return min(days) if days else None
+
+
+def backfill_daily_metrics(tenant, since=None, until=None):
+    """Materialize every day from `since` (default: first activity) to `until` in bounded windows"""
+    until = until or timezone.localdate()
+    since = since or first_activity_date(tenant)
+    written = 0
+    while since and since <= until:
+        window_end = min(since + timedelta(days=BACKFILL_WINDOW_DAYS - 1), until)
+        written += materialize_daily_metrics(tenant, since, window_end)
+        since = window_end + timedelta(days=1)
+    return written
+
+
+def reconcile_recent(days=RECONCILE_DAYS, today=None):
+    """Re-materialize the last `days` days for every tenant; returns rows written"""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    return sum(materialize_daily_metrics(tenant, start, today) for tenant in Tenant.objects.all())
+
+
+def _enqueue_refresh(tenant_id, day):
+    from .tasks import refresh_daily_metrics
+
+    if refresh_daily_metrics.app.conf.task_always_eager:
+        refresh_daily_metrics.delay(tenant_id, day.isoformat())
+        return
+    # A refresh already queued for this day runs after this write committed
+    key = f'analytics:metrics-refresh:{tenant_id}:{day.isoformat()}'
+    if not cache.add(key, 1, timeout=REFRESH_DELAY):
+        return
+    try:
+        refresh_daily_metrics.apply_async((tenant_id, day.isoformat()), countdown=REFRESH_DELAY)
+    except Exception:
+        # The write has committed; the nightly reconcile rebuilds the day instead
+        cache.delete(key)
+        logger.exception('Could not queue the metrics refresh of tenant %s for %s', tenant_id, day)
+
+
+def mark_dirty(tenant_id, day):
+    """Schedule a refresh of a tenant's day once the current transaction commits"""
+    if tenant_id and day:
+        transaction.on_commit(partial(_enqueue_refresh, tenant_id, day))
+
+
+def as_local_date(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _percentage(part, whole):
+    return round(float(part) / float(whole) * 100, 2) if whole else 0
+
+
+class MetricTotals:
+    """Summed rollup values for one tenant (optionally one store), read with a single grouped query"""
+
+    def __init__(self, tenant, store=None, today=None):
+        today = today or timezone.localdate()
+        self.this_month = today.replace(day=1)
+        self.last_month = (self.this_month - timedelta(days=1)).replace(day=1)
+        this_month_start, _ = day_bounds(self.this_month)
+        last_month_start, _ = day_bounds(self.last_month)
+
+        rows = BusinessMetrics.objects.filter(tenant=tenant, period_type=DAILY)
+        if store is not None:
+            rows = rows.filter(store=store)
+        rows = rows.values('metric_type', 'metric_name').annotate(
+            total=Sum('value'),
+            this_month=Sum('value', filter=Q(period_start__gte=this_month_start)),
+            last_month=Sum('value', filter=Q(period_start__gte=last_month_start, period_start__lt=this_month_start)),
+        ).order_by()
+        self.rows = {(row['metric_type'], row['metric_name']): row for row in rows}
+
+    def get(self, metric_type, metric_name, period='total'):
+        row = self.rows.get((metric_type, metric_name))
+        return (row and row[period]) or Decimal('0')
+
+    def prefixed(self, metric_type, prefix, period='total'):
+        """{suffix: value} for every metric whose name starts with prefix"""
+        return {
+            name[len(prefix):]: row[period] or Decimal('0')
+            for (kind, name), row in self.rows.items()
+            if kind == metric_type and name.startswith(prefix)
+        }
+
+
+def dashboard_metrics(tenant, store=None, today=None):
+    """Payload of the analytics dashboard, built from the materialized daily rollups"""
+    totals = MetricTotals(tenant, store, today)
+    return {
+        'sales': _sales_section(totals),
+        'pipeline': _pipeline_section(totals),
+        'conversion': _conversion_section(totals),
+        'revenue': _revenue_section(totals),
+    }
+
+
+def _sales_section(totals):
+    total_revenue = totals.get(MetricType.REVENUE, 'revenue')
+    paid_orders = totals.get(MetricType.SALES, 'paid_orders')
+    return {
+        'total_sales': int(totals.get(MetricType.SALES, 'orders')),
+        'monthly_sales': int(totals.get(MetricType.SALES, 'orders', 'this_month')),
+        'total_revenue': float(total_revenue),
+        'monthly_revenue': float(totals.get(MetricType.REVENUE, 'revenue', 'this_month')),
+        'avg_order_value': float(total_revenue / paid_orders) if paid_orders else 0.0,
+    }
+
+
+def _pipeline_section(totals):
+    stage_data = {}
+    for stage_code, stage_name in SalesPipeline.Stage.choices:
+        stage_data[stage_code] = {
+            'name': stage_name,
+            'count': int(totals.get(MetricType.PIPELINE, STAGE_COUNT + stage_code)),
+            'value': float(totals.get(MetricType.PIPELINE, STAGE_VALUE + stage_code)),
+        }
+    open_stages = [code for code in stage_data if code != SalesPipeline.Stage.CLOSED_LOST]
+    return {
+        'stages': stage_data,
+        'total_pipeline_value': sum(stage_data[code]['value'] for code in open_stages),
+        'active_deals': sum(stage_data[code]['count'] for code in open_stages),
+    }
+
+
+def _conversion_section(totals):
+    lead = STAGE_COUNT + SalesPipeline.Stage.LEAD
+    total_leads = int(totals.get(MetricType.PIPELINE, lead))
+    converted_leads = int(totals.get(MetricType.CONVERSION, 'deals_won'))
+    monthly_leads = int(totals.get(MetricType.PIPELINE, lead, 'this_month'))
+    monthly_converted = int(totals.get(MetricType.CONVERSION, 'deals_won', 'this_month'))
+    return {
+        'total_leads': total_leads,
+        'converted_leads': converted_leads,
+        'conversion_rate': _percentage(converted_leads, total_leads),
+        'monthly_leads': monthly_leads,
+        'monthly_converted': monthly_converted,
+        'monthly_conversion_rate': _percentage(monthly_converted, monthly_leads),
+    }
+
+
+def _revenue_section(totals):
+    current_revenue = totals.get(MetricType.REVENUE, 'revenue', 'this_month')
+    last_month_revenue = totals.get(MetricType.REVENUE, 'revenue', 'last_month')
+    revenue_growth = 0
+    if last_month_revenue > 0:
+        revenue_growth = round(float((current_revenue - last_month_revenue) / last_month_revenue * 100), 2)
+
+    by_category = totals.prefixed(MetricType.REVENUE, CATEGORY_REVENUE, 'this_month')
+    top_categories = sorted(
+        ((category, total) for category, total in by_category.items() if total),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:5]
+    return {
+        'current_revenue': float(current_revenue),
+        'last_month_revenue': float(last_month_revenue),
+        'revenue_growth': revenue_growth,
+        'revenue_by_product': [
+            {'items__product__category': int(category) if category else None, 'total': total}
+            for category, total in top_categories
+        ],
+    }
+
+
+def daily_series(tenant, metric_type, metric_name, start, end=None, store=None):
+    """[(day, value)] of one daily metric from start to end (inclusive), days without activity omitted"""
+    end = end or timezone.localdate()
+    first, _ = day_bounds(start)
+    _, last = day_bounds(end)
+    rows = BusinessMetrics.objects.filter(
+        tenant=tenant,
+        period_type=DAILY,
+        metric_type=metric_type,
+        metric_name=metric_name,
+        period_start__gte=first,
+        period_start__lt=last,
+    )
+    if store is not None:
+        rows = rows.filter(store=store)
+    rows = rows.values('period_start').annotate(total=Sum('value')).order_by('period_start')
+    return [(as_local_date(row['period_start']), row['total']) for row in rows]
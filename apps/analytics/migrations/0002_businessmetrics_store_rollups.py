@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0002_store_tenant'),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='businessmetrics',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='businessmetrics',
+            name='store',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='business_metrics', to='stores.store'),
+        ),
+        migrations.AlterField(
+            model_name='businessmetrics',
+            name='metric_type',
+            field=models.CharField(choices=[('sales', 'Sales'), ('revenue', 'Revenue'), ('customers', 'Customers'), ('products', 'Products'), ('conversion', 'Conversion Rate'), ('retention', 'Customer Retention'), ('pipeline', 'Pipeline')], max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='businessmetrics',
+            constraint=models.UniqueConstraint(condition=models.Q(('store__isnull', False)), fields=('metric_type', 'metric_name', 'period_start', 'period_end', 'tenant', 'store'), name='analytics_metric_store_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='businessmetrics',
+            constraint=models.UniqueConstraint(condition=models.Q(('store__isnull', True)), fields=('metric_type', 'metric_name', 'period_start', 'period_end', 'tenant'), name='analytics_metric_tenant_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='businessmetrics',
+            index=models.Index(fields=['tenant', 'period_type', 'period_start'], name='analytics_metric_period_idx'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+
+# Frozen copies of the constants in apps/analytics/metrics.py
+REVENUE_STATUSES = ['confirmed', 'processing', 'shipped', 'delivered']
+DAILY = 'daily'
+CATEGORY_REVENUE = 'category_revenue:'
+STAGE_COUNT = 'stage_count:'
+STAGE_VALUE = 'stage_value:'
+CLOSED_WON = 'closed_won'
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def collect_metrics(apps, tenant_id):
+    """{(day, store_id): {(metric_type, metric_name): value}} over a tenant's whole history"""
+    Sale = apps.get_model('sales', 'Sale')
+    SaleItem = apps.get_model('sales', 'SaleItem')
+    SalesPipeline = apps.get_model('sales', 'SalesPipeline')
+
+    metrics = defaultdict(lambda: defaultdict(Decimal))
+    revenue = Q(status__in=REVENUE_STATUSES)
+
+    sales = Sale.objects.filter(tenant_id=tenant_id).values(
+        day=TruncDate('created_at'),
+        store=F('sales_representative__store'),
+    ).annotate(
+        orders=Count('id'),
+        paid_orders=Count('id', filter=revenue),
+        gross_sales=Sum('total_amount'),
+        revenue=Sum('total_amount', filter=revenue),
+    ).order_by()
+    for row in sales:
+        bucket = metrics[row['day'], row['store']]
+        bucket['sales', 'orders'] += row['orders']
+        bucket['sales', 'paid_orders'] += row['paid_orders']
+        bucket['sales', 'gross_sales'] += row['gross_sales'] or 0
+        bucket['revenue', 'revenue'] += row['revenue'] or 0
+
+    items = SaleItem.objects.filter(sale__tenant_id=tenant_id, sale__status__in=REVENUE_STATUSES).values(
+        day=TruncDate('sale__created_at'),
+        store=F('sale__sales_representative__store'),
+        category=F('product__category'),
+    ).annotate(total=Sum('total_price')).order_by()
+    for row in items:
+        name = f"{CATEGORY_REVENUE}{row['category'] or ''}"
+        metrics[row['day'], row['store']]['revenue', name] += row['total'] or 0
+
+    pipelines = SalesPipeline.objects.filter(tenant_id=tenant_id).values(
+        'stage',
+        day=TruncDate('created_at'),
+        store=F('sales_representative__store'),
+    ).annotate(count=Count('id'), value=Sum('expected_value')).order_by()
+    for row in pipelines:
+        bucket = metrics[row['day'], row['store']]
+        bucket['pipeline', STAGE_COUNT + row['stage']] += row['count']
+        bucket['pipeline', STAGE_VALUE + row['stage']] += row['value'] or 0
+
+    won = SalesPipeline.objects.filter(tenant_id=tenant_id, stage=CLOSED_WON).annotate(
+        closed_on=Coalesce('actual_close_date', TruncDate('created_at')),
+    ).values(
+        'closed_on',
+        store=F('sales_representative__store'),
+    ).annotate(count=Count('id')).order_by()
+    for row in won:
+        metrics[row['closed_on'], row['store']]['conversion', 'deals_won'] += row['count']
+
+    return metrics
+
+
+def backfill_metrics(apps, schema_editor):
+    """Materialize the daily rows for all existing history, as materialize_business_metrics does"""
+    BusinessMetrics = apps.get_model('analytics', 'BusinessMetrics')
+    Tenant = apps.get_model('tenants', 'Tenant')
+
+    for tenant_id in Tenant.objects.values_list('pk', flat=True):
+        rows = []
+        for (day, store_id), values in collect_metrics(apps, tenant_id).items():
+            period_start, period_end = day_bounds(day)
+            rows += [
+                BusinessMetrics(
+                    tenant_id=tenant_id,
+                    store_id=store_id,
+                    metric_type=metric_type,
+                    metric_name=metric_name,
+                    value=value,
+                    period_start=period_start,
+                    period_end=period_end,
+                    period_type=DAILY,
+                )
+                for (metric_type, metric_name), value in values.items()
+                if value
+            ]
+        BusinessMetrics.objects.filter(tenant_id=tenant_id, period_type=DAILY).delete()
+        BusinessMetrics.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_businessmetrics_store_rollups'),
+        ('sales', '0001_initial'),
+        ('products', '0001_initial'),
+        ('users', '0003_user_store'),
+    ]
+
+    operations = [
+        # The rows stay correct after unapplying, so there is nothing to undo
+        migrations.RunPython(backfill_metrics, migrations.RunPython.noop),
+    ]
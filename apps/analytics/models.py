@@ -69,6 +69,7 @@ class BusinessMetrics(models.Model):
         PRODUCTS = 'products', _('Products')
         CONVERSION = 'conversion', _('Conversion Rate')
         RETENTION = 'retention', _('Customer Retention')
+        PIPELINE = 'pipeline', _('Pipeline')
 
     # Metric Information
     metric_type = models.CharField(max_length=20, choices=MetricType.choices)
@@ -102,6 +103,14 @@ class BusinessMetrics(models.Model):
         on_delete=models.CASCADE,
         related_name='business_metrics'
     )
+    # Store the rollup belongs to; null for activity of users without a store
+    store = models.ForeignKey(
+        'stores.Store',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='business_metrics'
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -111,7 +120,21 @@ class BusinessMetrics(models.Model):
         verbose_name = _('Business Metric')
         verbose_name_plural = _('Business Metrics')
         ordering = ['-period_end']
-        unique_together = ['metric_type', 'metric_name', 'period_start', 'period_end', 'tenant']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric_type', 'metric_name', 'period_start', 'period_end', 'tenant', 'store'],
+                condition=models.Q(store__isnull=False),
+                name='analytics_metric_store_unique',
+            ),
+            models.UniqueConstraint(
+                fields=['metric_type', 'metric_name', 'period_start', 'period_end', 'tenant'],
+                condition=models.Q(store__isnull=True),
+                name='analytics_metric_tenant_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'period_type', 'period_start'], name='analytics_metric_period_idx'),
+        ]
 
     def __str__(self):
         return f"{self.metric_name} - {self.period_start.date()} to {self.period_end.date()}"
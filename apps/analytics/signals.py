@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.sales.models import Sale, SaleItem, SalesPipeline
+from .metrics import mark_dirty, as_local_date
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+def refresh_sale_metrics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    mark_dirty(instance.tenant_id, as_local_date(instance.created_at))
+
+
+@receiver(post_save, sender=SaleItem)
+@receiver(post_delete, sender=SaleItem)
+def refresh_sale_item_metrics(sender, instance, raw=False, **kwargs):
+    """Items feed the per-category revenue of their sale's day"""
+    if raw:
+        return
+    try:
+        sale = instance.sale
+    except Sale.DoesNotExist:
+        return
+    mark_dirty(sale.tenant_id, as_local_date(sale.created_at))
+
+
+@receiver(post_save, sender=SalesPipeline)
+@receiver(post_delete, sender=SalesPipeline)
+def refresh_pipeline_metrics(sender, instance, raw=False, **kwargs):
+    """Stage counts live on the creation day, won deals on the close day"""
+    if raw:
+        return
+    mark_dirty(instance.tenant_id, as_local_date(instance.created_at))
+    if instance.actual_close_date:
+        mark_dirty(instance.tenant_id, instance.actual_close_date)
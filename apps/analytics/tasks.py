@@ -0,0 +1,25 @@
+import logging
+from datetime import date
+
+from celery import shared_task
+
+from apps.tenants.models import Tenant
+from .metrics import materialize_daily_metrics, reconcile_recent, RECONCILE_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_daily_metrics(tenant_id, day):
+    """Re-materialize one tenant's daily BusinessMetrics rows after a Sale/SalesPipeline write"""
+    tenant = Tenant.objects.filter(pk=tenant_id).first()
+    if tenant is None:
+        logger.warning('Skipping metrics refresh for missing tenant %s', tenant_id)
+        return 0
+    return materialize_daily_metrics(tenant, date.fromisoformat(day))
+
+
+@shared_task
+def reconcile_business_metrics(days=RECONCILE_DAYS):
+    """Nightly: rebuild the last few days for every tenant to catch writes that bypassed signals"""
+    return reconcile_recent(days=days)
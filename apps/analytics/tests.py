@@ -1,3 +1,90 @@
-from django.test import TestCase
+from importlib import import_module
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from kombu.exceptions import OperationalError
+
+from apps.clients.models import Client
+from apps.sales.models import Sale, SalesPipeline
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from .metrics import dashboard_metrics, materialize_daily_metrics, mark_dirty
+from .models import BusinessMetrics
+from .tasks import refresh_daily_metrics
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.rep = User.objects.create_user(username='rep', password='x', role='inhouse_sales', tenant=self.tenant)
+        self.client_record = Client.objects.create(tenant=self.tenant, email='asha@example.com', first_name='Asha')
+
+    def make_sale(self, number, amount, status=Sale.Status.CONFIRMED):
+        return Sale.objects.create(
+            order_number=number, client=self.client_record, sales_representative=self.rep,
+            status=status, subtotal=amount, total_amount=amount, tenant=self.tenant,
+        )
+
+    def make_pipeline(self, stage, value):
+        return SalesPipeline.objects.create(
+            title='Wedding set', client=self.client_record, sales_representative=self.rep,
+            stage=stage, expected_value=value, tenant=self.tenant,
+        )
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+class DailyRollupTests(MetricsTestCase):
+    def test_writes_refresh_the_day_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_sale('A-1', 1000)
+            self.make_sale('A-2', 500, status=Sale.Status.CANCELLED)
+            self.make_pipeline(SalesPipeline.Stage.LEAD, 2000)
+            self.make_pipeline(SalesPipeline.Stage.CLOSED_WON, 3000)
+
+        sales = dashboard_metrics(self.tenant)['sales']
+        self.assertEqual((sales['total_sales'], sales['total_revenue']), (2, 1000.0))
+        self.assertEqual(sales['monthly_revenue'], 1000.0)
+        conversion = dashboard_metrics(self.tenant)['conversion']
+        self.assertEqual((conversion['total_leads'], conversion['converted_leads']), (1, 1))
+
+    def test_rebuilding_a_day_replaces_its_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            sale = self.make_sale('A-1', 1000)
+        Sale.objects.filter(pk=sale.pk).update(total_amount=1500)
+
+        materialize_daily_metrics(self.tenant, timezone.localdate())
+
+        self.assertEqual(dashboard_metrics(self.tenant)['sales']['total_revenue'], 1500.0)
+
+
+class BackfillTests(MetricsTestCase):
+    def test_migration_materializes_existing_history(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.make_sale('A-1', 1000)
+            self.make_pipeline(SalesPipeline.Stage.CLOSED_WON, 3000)
+        self.assertFalse(BusinessMetrics.objects.exists())
+
+        import_module('apps.analytics.migrations.0003_backfill_business_metrics').backfill_metrics(apps, None)
+        backfilled = dashboard_metrics(self.tenant)
+
+        materialize_daily_metrics(self.tenant, timezone.localdate())
+        self.assertEqual(backfilled, dashboard_metrics(self.tenant))
+        self.assertEqual(backfilled['sales']['total_revenue'], 1000.0)
+
+
+class EnqueueTests(MetricsTestCase):
+    def test_unreachable_broker_is_logged_not_raised(self):
+        with mock.patch.object(refresh_daily_metrics, 'apply_async', side_effect=OperationalError('down')):
+            with self.assertLogs('apps.analytics.metrics', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    mark_dirty(self.tenant.pk, timezone.localdate())
+
+        # The failed attempt does not hold back the next write's refresh
+        with mock.patch.object(refresh_daily_metrics, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                mark_dirty(self.tenant.pk, timezone.localdate())
+        apply_async.assert_called_once()
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead
+from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead, UnreadCounter
 
 
 @admin.register(Announcement)
@@ -116,4 +116,12 @@ class MessageReadAdmin(admin.ModelAdmin):
     readonly_fields = ['read_at', 'responded_at']
     
     def has_add_permission(self, request):
-        return False  # Read records are created automatically 
\ No newline at end of file
+        return False  # Read records are created automatically 
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'kind', 'count', 'updated_at']
+    list_filter = ['kind']
+    search_fields = ['user__username', 'user__first_name', 'user__last_name']
+    readonly_fields = ['user', 'kind', 'count', 'updated_at']
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AnnouncementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.announcements'
-    verbose_name = 'Announcements & Communication' 
\ No newline at end of file
+    verbose_name = 'Announcements & Communication'
+
+    def ready(self):
+        import apps.announcements.signals
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def count_published(apps, schema_editor):
+    """Announcements already live start out counted; counters themselves are created on first read"""
+    Announcement = apps.get_model('announcements', 'Announcement')
+    now = timezone.now()
+    Announcement.objects.filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now),
+        is_active=True,
+        publish_at__lte=now,
+    ).update(counted_unread=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('announcements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='counted_unread',
+            field=models.BooleanField(default=False, editable=False, help_text="Whether this announcement is counted in the tenant users' unread counters"),
+        ),
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('announcement', 'Announcement'), ('team_message', 'Team Message')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Unread Counter',
+                'verbose_name_plural': 'Unread Counters',
+                'unique_together': {('user', 'kind')},
+            },
+        ),
+        migrations.RunPython(count_published, migrations.RunPython.noop),
+    ]
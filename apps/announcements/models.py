@@ -81,6 +81,11 @@ class Announcement(models.Model):
         blank=True,
         help_text=_('When this announcement expires (null for no expiration)')
     )
+    counted_unread = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text=_("Whether this announcement is counted in the tenant users' unread counters")
+    )
 
     # Author and metadata
     author = models.ForeignKey(
@@ -292,4 +297,31 @@ class MessageRead(models.Model):
     def save(self, *args, **kwargs):
         if self.responded and not self.responded_at:
             self.responded_at = timezone.now()
-        super().save(*args, **kwargs) 
\ No newline at end of file
+        super().save(*args, **kwargs) 
+
+
+class UnreadCounter(models.Model):
+    """
+    Per-user count of unread announcements / team messages, kept up to date
+    by signals and repaired nightly (see unread.py).
+    """
+    class Kind(models.TextChoices):
+        ANNOUNCEMENT = 'announcement', _('Announcement')
+        TEAM_MESSAGE = 'team_message', _('Team Message')
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='unread_counters'
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Unread Counter')
+        verbose_name_plural = _('Unread Counters')
+        unique_together = ['user', 'kind']
+
+    def __str__(self):
+        return f"{self.user.username}: {self.count} unread {self.kind}"
@@ -0,0 +1,72 @@
+"""
+Read models for the announcement and team message list/detail endpoints.
+
+The serializers used to run several queries per object: read counts,
+recipient counts, the current user's read state and the latest replies.
+These functions compute all of that in SQL instead. Counts and per-user
+flags are correlated subqueries. Related rows are prefetched, and the
+latest replies come from a window function, so a page costs the same
+number of queries however many rows it holds.
+
+The serializers read the annotations when present and fall back to
+per-object queries for instances built elsewhere, e.g. a freshly created
+reply.
+"""
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Prefetch, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from .models import AnnouncementRead, MessageRead, TeamMessage
+
+
+LATEST_REPLIES = 5
+Recipient = TeamMessage.recipients.through
+
+
+def _count(queryset, field):
+    """Correlated COUNT(*) of `queryset` rows grouped on `field`, 0 when there are none"""
+    counts = queryset.order_by().values(field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def announcements_for_display(queryset, user):
+    """Announcements with read_total, read_by_user and acknowledged_by_user and their relations loaded"""
+    reads = AnnouncementRead.objects.filter(announcement=OuterRef('pk'))
+    own = reads.filter(user_id=user.pk)
+    return queryset.select_related('author', 'tenant').prefetch_related(
+        'target_stores',
+        'target_tenants',
+        Prefetch('reads', queryset=AnnouncementRead.objects.select_related('user')),
+    ).annotate(
+        read_total=_count(reads, 'announcement'),
+        read_by_user=Exists(own),
+        acknowledged_by_user=Exists(own.filter(acknowledged=True)),
+    )
+
+
+def latest_replies(limit=LATEST_REPLIES):
+    """Prefetch of each message's newest `limit` replies as `latest_replies`"""
+    ordering = (F('is_urgent').desc(), F('created_at').desc())
+    replies = TeamMessage.objects.select_related('sender').annotate(
+        reply_rank=Window(RowNumber(), partition_by=[F('parent_message_id')], order_by=ordering),
+    ).filter(reply_rank__lte=limit).order_by(*ordering)
+    return Prefetch('replies', queryset=replies, to_attr='latest_replies')
+
+
+def messages_for_display(queryset, user):
+    """
+    Team messages with read_total, recipient_total, reply_total, read_by_user
+    and responded_by_user, their relations and their latest replies loaded
+    """
+    reads = MessageRead.objects.filter(message=OuterRef('pk'))
+    own = reads.filter(user_id=user.pk)
+    return queryset.select_related('sender', 'store', 'tenant').prefetch_related(
+        'recipients',
+        Prefetch('reads', queryset=MessageRead.objects.select_related('user')),
+        latest_replies(),
+    ).annotate(
+        read_total=_count(reads, 'message'),
+        recipient_total=_count(Recipient.objects.filter(teammessage=OuterRef('pk')), 'teammessage'),
+        reply_total=_count(TeamMessage.objects.filter(parent_message=OuterRef('pk')), 'parent_message'),
+        read_by_user=Exists(own),
+        responded_by_user=Exists(own.filter(responded=True)),
+    )
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead
+from .queries import LATEST_REPLIES
 
 User = get_user_model()
 
@@ -31,6 +32,14 @@ class TenantSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug']
 
 
+def _current_user_read(serializer, obj):
+    """The request user's read record of obj, for instances without the read-state annotations"""
+    request = serializer.context.get('request')
+    if request and request.user.is_authenticated:
+        return obj.reads.filter(user=request.user).first()
+    return None
+
+
 class AnnouncementReadSerializer(serializers.ModelSerializer):
     """Serializer for announcement read tracking."""
     user = UserSerializer(read_only=True)
@@ -65,6 +74,9 @@ class AnnouncementSerializer(serializers.ModelSerializer):
         read_only_fields = ['author', 'tenant', 'created_at', 'updated_at', 'reads']
     
     def get_read_count(self, obj):
+        # Annotated by queries.announcements_for_display() on the list/detail endpoints
+        if hasattr(obj, 'read_total'):
+            return obj.read_total
         return obj.reads.count()
     
     def get_unread_count(self, obj):
@@ -73,17 +85,15 @@ class AnnouncementSerializer(serializers.ModelSerializer):
         return 0
     
     def get_is_read_by_current_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.reads.filter(user=request.user).exists()
-        return False
+        if hasattr(obj, 'read_by_user'):
+            return obj.read_by_user
+        return _current_user_read(self, obj) is not None
     
     def get_is_acknowledged_by_current_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            read_record = obj.reads.filter(user=request.user).first()
-            return read_record.acknowledged if read_record else False
-        return False
+        if hasattr(obj, 'acknowledged_by_user'):
+            return obj.acknowledged_by_user
+        read_record = _current_user_read(self, obj)
+        return read_record.acknowledged if read_record else False
     
     def get_priority_color(self, obj):
         return obj.get_priority_color()
@@ -153,7 +163,11 @@ class TeamMessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['sender', 'store', 'tenant', 'created_at', 'updated_at', 'reads']
     
     def get_replies(self, obj):
-        # Only include basic info for replies to avoid circular references
+        # Only include basic info for replies to avoid circular references;
+        # the list/detail endpoints prefetch them (queries.latest_replies())
+        replies = getattr(obj, 'latest_replies', None)
+        if replies is None:
+            replies = obj.replies.select_related('sender')[:LATEST_REPLIES]
         return [
             {
                 'id': reply.id,
@@ -161,32 +175,37 @@ class TeamMessageSerializer(serializers.ModelSerializer):
                 'sender': UserSerializer(reply.sender).data,
                 'created_at': reply.created_at
             }
-            for reply in obj.replies.all()[:5]  # Limit to 5 most recent replies
+            for reply in replies
         ]
     
     def get_read_count(self, obj):
+        # Annotated by queries.messages_for_display() on the list/detail endpoints
+        if hasattr(obj, 'read_total'):
+            return obj.read_total
         return obj.reads.count()
     
     def get_unread_count(self, obj):
         # Calculate based on recipients who haven't read
-        recipient_count = obj.recipients.count()
-        read_count = obj.reads.count()
-        return max(0, recipient_count - read_count)
+        if hasattr(obj, 'recipient_total'):
+            recipient_count = obj.recipient_total
+        else:
+            recipient_count = obj.recipients.count()
+        return max(0, recipient_count - self.get_read_count(obj))
     
     def get_is_read_by_current_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.reads.filter(user=request.user).exists()
-        return False
+        if hasattr(obj, 'read_by_user'):
+            return obj.read_by_user
+        return _current_user_read(self, obj) is not None
     
     def get_is_responded_by_current_user(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            read_record = obj.reads.filter(user=request.user).first()
-            return read_record.responded if read_record else False
-        return False
+        if hasattr(obj, 'responded_by_user'):
+            return obj.responded_by_user
+        read_record = _current_user_read(self, obj)
+        return read_record.responded if read_record else False
     
     def get_thread_count(self, obj):
+        if hasattr(obj, 'reply_total'):
+            return obj.reply_total
         return obj.thread_count
 
 
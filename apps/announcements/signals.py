@@ -0,0 +1,70 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from shared.cache import invalidate_on_save
+from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead
+from . import unread
+
+
+@receiver(post_save, sender=Announcement)
+def count_announcement(sender, instance, raw=False, **kwargs):
+    """Publishing, deactivating or expiring an announcement moves the tenant's unread counters"""
+    if raw:
+        return
+    unread.sync_announcement(instance)
+
+
+@receiver(pre_delete, sender=Announcement)
+def uncount_announcement(sender, instance, **kwargs):
+    # Before the cascade removes the reads that tell readers from non-readers
+    unread.announcement_deleted(instance)
+
+
+@receiver(post_save, sender=AnnouncementRead)
+def announcement_read(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    unread.announcement_read(instance, -1)
+
+
+@receiver(post_delete, sender=AnnouncementRead)
+def announcement_unread(sender, instance, origin=None, **kwargs):
+    # Reads removed by deleting their announcement or user are handled there
+    if isinstance(origin, AnnouncementRead) or getattr(origin, 'model', None) is AnnouncementRead:
+        unread.announcement_read(instance, 1)
+
+
+@receiver(m2m_changed, sender=TeamMessage.recipients.through)
+def count_message_recipients(sender, instance, action, reverse, pk_set, **kwargs):
+    """Added recipients gain an unread message, removed ones lose it"""
+    if reverse:
+        # user.received_messages edits aren't used; reconcile_counters() repairs them
+        return
+    if action == 'pre_clear':
+        instance._cleared_recipient_ids = list(instance.recipients.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        unread.recipients_changed(instance, getattr(instance, '_cleared_recipient_ids', []), -1)
+    elif action == 'post_add':
+        unread.recipients_changed(instance, pk_set, 1)
+    elif action == 'post_remove':
+        unread.recipients_changed(instance, pk_set, -1)
+
+
+@receiver(pre_delete, sender=TeamMessage)
+def uncount_message(sender, instance, **kwargs):
+    unread.message_deleted(instance)
+
+
+@receiver(post_save, sender=MessageRead)
+def message_read(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    unread.message_read(instance, -1)
+
+
+@receiver(post_delete, sender=MessageRead)
+def message_unread(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, MessageRead) or getattr(origin, 'model', None) is MessageRead:
+        unread.message_read(instance, 1)
+
+
+invalidate_on_save(Announcement, 'announcements')
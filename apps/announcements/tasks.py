@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from .unread import reconcile_counters, sync_due_announcements
+
+
+@shared_task
+def sync_announcement_unread():
+    """Minutely: count announcements whose publish time passed, uncount expired ones"""
+    return sync_due_announcements()
+
+
+@shared_task
+def reconcile_unread_counters():
+    """Nightly: recompute every unread counter to repair drift"""
+    return reconcile_counters()
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.stores.models import Store
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from shared import push
+from shared.push import MemoryBroker
+from . import unread
+from .models import Announcement, AnnouncementRead, MessageRead, TeamMessage, UnreadCounter
+
+
+Kind = UnreadCounter.Kind
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(push, '_broker', MemoryBroker(maxlen=10))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.owner = User.objects.create_user(username='owner', password='x', role='business_admin', tenant=self.tenant)
+        self.asha = User.objects.create_user(username='asha', password='x', role='inhouse_sales', tenant=self.tenant)
+        self.ravi = User.objects.create_user(username='ravi', password='x', role='inhouse_sales', tenant=self.tenant)
+
+    def counts(self, kind):
+        return [unread.unread_count(user, kind) for user in (self.asha, self.ravi)]
+
+    def announce(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Announcement.objects.create(
+                title='Diwali hours', content='Open till 10pm', author=self.owner, tenant=self.tenant, **fields
+            )
+
+    def test_counters_start_from_a_live_count(self):
+        self.announce()
+        UnreadCounter.objects.all().delete()
+        cache.clear()
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [1, 1])
+        self.assertEqual(UnreadCounter.objects.filter(kind=Kind.ANNOUNCEMENT).count(), 2)
+
+    def test_publishing_reading_and_deactivating_move_the_counters(self):
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+        announcement = self.announce()
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [1, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            read = AnnouncementRead.objects.create(announcement=announcement, user=self.asha)
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            announcement.is_active = False
+            announcement.save()
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            read.delete()
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+
+    def test_scheduled_announcements_count_once_due(self):
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+        publish_at = timezone.now() + timedelta(hours=1)
+        self.announce(publish_at=publish_at)
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(unread.sync_due_announcements(publish_at), 1)
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [1, 1])
+
+    def test_team_message_recipients_and_reads(self):
+        self.assertEqual(self.counts(Kind.TEAM_MESSAGE), [0, 0])
+        store = Store.objects.create(name='MG Road', code='MG', address='-', city='Pune', state='MH', tenant=self.tenant)
+        message = TeamMessage.objects.create(
+            subject='Stock', content='Count', sender=self.owner, store=store, tenant=self.tenant
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            message.recipients.add(self.asha, self.ravi)
+        self.assertEqual(self.counts(Kind.TEAM_MESSAGE), [1, 1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MessageRead.objects.create(message=message, user=self.asha)
+            message.recipients.remove(self.ravi)
+        self.assertEqual(self.counts(Kind.TEAM_MESSAGE), [0, 0])
+
+    def test_reconcile_repairs_drifted_rows(self):
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [0, 0])
+        self.announce()
+        UnreadCounter.objects.filter(user=self.asha).update(count=7)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(unread.reconcile_counters(), 1)
+        self.assertEqual(self.counts(Kind.ANNOUNCEMENT), [1, 1])
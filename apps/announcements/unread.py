@@ -0,0 +1,248 @@
+"""
+Per-user unread counters for announcements and team messages.
+
+UnreadCounter holds one row per (user, kind). Signals adjust the rows with
+set-based F() UPDATEs as things happen:
+
+  announcements  - counted for every user of the tenant while published;
+                   sync_announcement() applies publish/deactivate on save and
+                   the minutely sweep applies scheduled publish and expiry.
+                   Announcement.counted_unread records what is applied.
+  team messages  - counted for each recipient in the message's tenant as
+                   recipients are added or removed.
+  reads          - creating (or deleting) a read record decrements (or
+                   increments) the reader's counter.
+
+Newly published announcements and received team messages are also pushed
+to the tenant / recipients (see shared/push.py).
+
+unread_count() answers from the cache, then from the counter row, and
+creates missing rows from a live count. reconcile_counters() recomputes
+every row nightly to repair drift (users changing tenant, raw SQL,
+reverse m2m edits). Users without a tenant see every tenant's announcements and
+are always answered with a live count.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.core.cache import cache
+from django.utils import timezone
+
+from shared.cache import bump_on_commit, get_versions
+from shared.push import publish, publish_many, tenant_channel, user_channel
+from .models import Announcement, AnnouncementRead, MessageRead, TeamMessage, UnreadCounter
+
+
+Kind = UnreadCounter.Kind
+Recipient = TeamMessage.recipients.through
+CACHE_TIMEOUT = 300
+
+
+def visible_announcements(user, now=None):
+    """Active, published, unexpired announcements of the user's tenant (all tenants without one)"""
+    now = now or timezone.now()
+    queryset = Announcement.objects.filter(is_active=True)
+    if user.tenant_id:
+        queryset = queryset.filter(tenant_id=user.tenant_id)
+    return queryset.filter(
+        Q(publish_at__lte=now) &
+        (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+    )
+
+
+def published_q(now=None):
+    now = now or timezone.now()
+    return Q(is_active=True, publish_at__lte=now) & (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+
+
+def _live_count(user, kind):
+    """Count from the source tables; for tenant users this is exactly what the counter tracks"""
+    if kind == Kind.ANNOUNCEMENT:
+        if user.tenant_id:
+            announcements = Announcement.objects.filter(tenant_id=user.tenant_id, counted_unread=True)
+        else:
+            announcements = visible_announcements(user)
+        read = AnnouncementRead.objects.filter(announcement=OuterRef('pk'), user=user)
+        return announcements.exclude(Exists(read)).count()
+
+    messages = TeamMessage.objects.filter(recipients=user)
+    if user.tenant_id:
+        messages = messages.filter(tenant_id=user.tenant_id)
+    read = MessageRead.objects.filter(message=OuterRef('pk'), user=user)
+    return messages.exclude(Exists(read)).count()
+
+
+def _cache_key(user_id, tenant_id, kind):
+    version, = get_versions(tenant_id, ('unread',))
+    return f'unread:{kind}:{user_id}:{version}'
+
+
+def unread_count(user, kind):
+    """Unread announcements / team messages for the user"""
+    if not user.tenant_id:
+        return _live_count(user, kind)
+    key = _cache_key(user.pk, user.tenant_id, kind)
+    count = cache.get(key)
+    if count is None:
+        counter = UnreadCounter.objects.filter(user=user, kind=kind).values_list('count', flat=True).first()
+        if counter is None:
+            counter, _ = UnreadCounter.objects.get_or_create(
+                user=user, kind=kind, defaults={'count': _live_count(user, kind)}
+            )
+            counter = counter.count
+        count = max(counter, 0)
+        cache.set(key, count, CACHE_TIMEOUT)
+    return count
+
+
+def _forget(user_id, tenant_id, kind):
+    cache.delete(_cache_key(user_id, tenant_id, kind))
+
+
+def _forget_on_commit(user, kind):
+    transaction.on_commit(partial(_forget, user.pk, user.tenant_id, kind))
+
+
+def _adjust(kind, delta, tenant_id, users):
+    """Add delta to the counters of the tenant's users matched by `users` (a Q on UnreadCounter)"""
+    UnreadCounter.objects.filter(users, kind=kind, user__tenant_id=tenant_id).update(count=F('count') + delta)
+    bump_on_commit(tenant_id, 'unread')
+
+
+# Announcements
+
+def sync_announcement(announcement, now=None):
+    """Count or uncount the announcement for its tenant's users if its visibility changed"""
+    now = now or timezone.now()
+    should_count = announcement.is_active and announcement.publish_at <= now and not (
+        announcement.expires_at and announcement.expires_at <= now
+    )
+    if should_count == announcement.counted_unread:
+        return False
+    # Only the caller that flips the flag applies the delta
+    flipped = Announcement.objects.filter(
+        pk=announcement.pk, counted_unread=announcement.counted_unread
+    ).update(counted_unread=should_count)
+    announcement.counted_unread = should_count
+    if not flipped:
+        return False
+    readers = AnnouncementRead.objects.filter(announcement_id=announcement.pk).values('user_id')
+    _adjust(Kind.ANNOUNCEMENT, 1 if should_count else -1, announcement.tenant_id, ~Q(user_id__in=readers))
+    if should_count:
+        publish(tenant_channel(announcement.tenant_id), 'announcements.announcement', {
+            'id': announcement.pk,
+            'title': announcement.title,
+            'priority': announcement.priority,
+            'is_pinned': announcement.is_pinned,
+        })
+    return True
+
+
+def sync_due_announcements(now=None):
+    """Apply scheduled publish times and expiries that have passed; returns announcements changed"""
+    now = now or timezone.now()
+    due = Announcement.objects.filter(
+        (Q(counted_unread=False) & published_q(now)) | (Q(counted_unread=True) & ~published_q(now))
+    )
+    return sum(sync_announcement(announcement, now) for announcement in due)
+
+
+def announcement_deleted(announcement):
+    if announcement.counted_unread:
+        readers = AnnouncementRead.objects.filter(announcement_id=announcement.pk).values('user_id')
+        _adjust(Kind.ANNOUNCEMENT, -1, announcement.tenant_id, ~Q(user_id__in=readers))
+
+
+def announcement_read(read, delta):
+    """A read record was created (delta -1) or deleted (delta +1)"""
+    counted = Announcement.objects.filter(
+        pk=read.announcement_id, counted_unread=True, tenant_id=OuterRef('user__tenant_id')
+    )
+    updated = UnreadCounter.objects.filter(Exists(counted), user_id=read.user_id, kind=Kind.ANNOUNCEMENT).update(
+        count=F('count') + delta
+    )
+    if updated:
+        _forget_on_commit(read.user, Kind.ANNOUNCEMENT)
+
+
+# Team messages
+
+def recipients_changed(message, user_ids, delta):
+    """Recipients were added (+1) or removed (-1); users who read the message are unaffected"""
+    if not user_ids:
+        return
+    readers = MessageRead.objects.filter(message_id=message.pk).values('user_id')
+    _adjust(Kind.TEAM_MESSAGE, delta, message.tenant_id, Q(user_id__in=user_ids) & ~Q(user_id__in=readers))
+    if delta > 0:
+        publish_many([
+            (user_channel(user_id), 'announcements.teammessage', {
+                'id': message.pk,
+                'subject': message.subject,
+                'sender': message.sender_id,
+                'is_urgent': message.is_urgent,
+            })
+            for user_id in user_ids
+        ])
+
+
+def message_deleted(message):
+    recipients = Recipient.objects.filter(teammessage_id=message.pk).values_list('user_id', flat=True)
+    recipients_changed(message, list(recipients), -1)
+
+
+def message_read(read, delta):
+    """A read record was created (delta -1) or deleted (delta +1)"""
+    recipient = Recipient.objects.filter(
+        teammessage_id=read.message_id, user_id=read.user_id,
+        teammessage__tenant_id=OuterRef('user__tenant_id'),
+    )
+    updated = UnreadCounter.objects.filter(Exists(recipient), user_id=read.user_id, kind=Kind.TEAM_MESSAGE).update(
+        count=F('count') + delta
+    )
+    if updated:
+        _forget_on_commit(read.user, Kind.TEAM_MESSAGE)
+
+
+# Reconciliation
+
+def reconcile_counters():
+    """Recompute every counter row from the source tables; returns rows corrected"""
+    sync_due_announcements()
+    corrected = 0
+    tenant_ids = UnreadCounter.objects.filter(user__tenant__isnull=False).values_list(
+        'user__tenant_id', flat=True
+    ).distinct()
+    for tenant_id in tenant_ids:
+        corrected += _reconcile_tenant(tenant_id)
+    return corrected
+
+
+def _reconcile_tenant(tenant_id):
+    counted = Announcement.objects.filter(tenant_id=tenant_id, counted_unread=True)
+    announcement_total = counted.count()
+    announcement_reads = dict(
+        AnnouncementRead.objects.filter(announcement__in=counted, user__tenant_id=tenant_id)
+        .values('user_id').annotate(count=Count('id')).order_by().values_list('user_id', 'count')
+    )
+    read = MessageRead.objects.filter(message_id=OuterRef('teammessage_id'), user_id=OuterRef('user_id'))
+    message_unread = dict(
+        Recipient.objects.filter(teammessage__tenant_id=tenant_id, user__tenant_id=tenant_id)
+        .exclude(Exists(read))
+        .values('user_id').annotate(count=Count('id')).order_by().values_list('user_id', 'count')
+    )
+
+    expected = {
+        Kind.ANNOUNCEMENT: lambda user_id: announcement_total - announcement_reads.get(user_id, 0),
+        Kind.TEAM_MESSAGE: lambda user_id: message_unread.get(user_id, 0),
+    }
+    stale = []
+    for counter in UnreadCounter.objects.filter(user__tenant_id=tenant_id):
+        count = expected[counter.kind](counter.user_id)
+        if counter.count != count:
+            counter.count = count
+            stale.append(counter)
+    if stale:
+        UnreadCounter.objects.bulk_update(stale, ['count'], batch_size=500)
+        bump_on_commit(tenant_id, 'unread')
+    return len(stale)
@@ -7,16 +7,22 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead
+from .models import Announcement, AnnouncementRead, TeamMessage, MessageRead, UnreadCounter
+from .unread import unread_count, visible_announcements
+from .queries import announcements_for_display, messages_for_display
 from .serializers import (
     AnnouncementSerializer, AnnouncementCreateSerializer, AnnouncementUpdateSerializer,
     TeamMessageSerializer, TeamMessageCreateSerializer, TeamMessageUpdateSerializer,
     AnnouncementReadCreateSerializer, MessageReadCreateSerializer,
     UserSerializer
 )
+from shared.pagination import cap_rows
 
 User = get_user_model()
 
+# Actions that serialize with AnnouncementSerializer / TeamMessageSerializer
+DISPLAY_ACTIONS = ['list', 'retrieve', 'pinned', 'urgent', 'threads']
+
 
 class AnnouncementViewSet(viewsets.ModelViewSet):
     """
@@ -33,19 +39,10 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
         """Filter announcements based on user's access level and targeting."""
         user = self.request.user
         
-        # Base queryset - show all active announcements for the user's tenant
-        queryset = Announcement.objects.filter(is_active=True)
-        
-        # Filter by tenant
-        if user.tenant:
-            queryset = queryset.filter(tenant=user.tenant)
-        
-        # Filter by publish date and expiration
-        now = timezone.now()
-        queryset = queryset.filter(
-            Q(publish_at__lte=now) &
-            (Q(expires_at__isnull=True) | Q(expires_at__gt=now))
-        )
+        # Active, published, unexpired announcements for the user's tenant
+        queryset = visible_announcements(user)
+        if self.action in DISPLAY_ACTIONS:
+            queryset = announcements_for_display(queryset, user)
         
         return queryset.distinct()
 
@@ -103,25 +100,21 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread announcements for current user."""
-        user = request.user
-        read_announcements = AnnouncementRead.objects.filter(user=user).values_list('announcement_id', flat=True)
-        
-        unread_count = self.get_queryset().exclude(id__in=read_announcements).count()
-        
-        return Response({'unread_count': unread_count})
+        # Maintained counter, see unread.py
+        return Response({'unread_count': unread_count(request.user, UnreadCounter.Kind.ANNOUNCEMENT)})
 
     @action(detail=False, methods=['get'])
     def pinned(self, request):
         """Get pinned announcements."""
         pinned_announcements = self.get_queryset().filter(is_pinned=True)
-        serializer = self.get_serializer(pinned_announcements, many=True)
+        serializer = self.get_serializer(cap_rows(pinned_announcements), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def urgent(self, request):
         """Get urgent announcements."""
         urgent_announcements = self.get_queryset().filter(priority='urgent')
-        serializer = self.get_serializer(urgent_announcements, many=True)
+        serializer = self.get_serializer(cap_rows(urgent_announcements), many=True)
         return Response(serializer.data)
 
 
@@ -148,6 +141,8 @@ class TeamMessageViewSet(viewsets.ModelViewSet):
         # Filter by tenant
         if user.tenant:
             queryset = queryset.filter(tenant=user.tenant)
+        if self.action in DISPLAY_ACTIONS:
+            queryset = messages_for_display(queryset, user)
         
         return queryset.distinct()
 
@@ -235,18 +230,14 @@ class TeamMessageViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread messages for current user."""
-        user = request.user
-        read_messages = MessageRead.objects.filter(user=user).values_list('message_id', flat=True)
-        
-        unread_count = self.get_queryset().filter(recipients=user).exclude(id__in=read_messages).count()
-        
-        return Response({'unread_count': unread_count})
+        # Maintained counter, see unread.py
+        return Response({'unread_count': unread_count(request.user, UnreadCounter.Kind.TEAM_MESSAGE)})
 
     @action(detail=False, methods=['get'])
     def urgent(self, request):
         """Get urgent messages."""
         urgent_messages = self.get_queryset().filter(is_urgent=True)
-        serializer = self.get_serializer(urgent_messages, many=True)
+        serializer = self.get_serializer(cap_rows(urgent_messages), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -256,7 +247,7 @@ class TeamMessageViewSet(viewsets.ModelViewSet):
             reply_count=Count('replies')
         ).order_by('-reply_count', '-created_at')
         
-        serializer = self.get_serializer(threads, many=True)
+        serializer = self.get_serializer(cap_rows(threads), many=True)
         return Response(serializer.data)
 
 
@@ -1,11 +1,18 @@
 from django.contrib import admin
-from .models import Client, CustomerTag, ClientInteraction, Appointment, FollowUp, Task, Announcement, Purchase
+from .models import Client, CustomerTag, ClientInteraction, Appointment, FollowUp, Task, Announcement, Purchase, ImportExportJob, AuditLogArchive
 
 class ClientAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'email', 'customer_type', 'tenant', 'created_at', 'is_deleted', 'deleted_at')
     search_fields = ["first_name", "last_name", "email", "phone"]
     list_filter = ["customer_type", "tenant", "created_at"]
 
+class ImportExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job_type', 'status', 'tenant', 'processed_rows', 'total_rows', 'imported_count', 'created_at', 'finished_at')
+    list_filter = ["job_type", "status", "tenant"]
+
+class AuditLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ('period_start', 'period_end', 'row_count', 'file', 'created_at')
+
 # Register your models here
 admin.site.register(Client, ClientAdmin)
 admin.site.register(CustomerTag)
@@ -15,3 +22,5 @@ admin.site.register(FollowUp)
 admin.site.register(Task)
 admin.site.register(Announcement)
 admin.site.register(Purchase)
+admin.site.register(ImportExportJob, ImportExportJobAdmin)
+admin.site.register(AuditLogArchive, AuditLogArchiveAdmin)
@@ -0,0 +1,166 @@
+"""
+Audit trail for Client changes.
+
+Entries only hold the fields that changed, diffed against the values the
+instance was loaded with (see Client.from_db), so no extra SELECT is issued
+before a save. Entries are queued with transaction.on_commit, so work that
+is rolled back never gets logged, and inside an audit_batch() (opened per
+request by AuditLogMiddleware) they are written with one bulk_create.
+"""
+from contextlib import contextmanager
+from functools import partial
+
+from asgiref.local import Local
+from django.db import transaction
+
+from .models import AuditLog, serialize_field
+
+
+# auto_now bumps this on every save, so it never counts as a change on its own
+IGNORED_FIELDS = {'updated_at'}
+# Derived from other fields (shared/search.py, identity.py); never part of an audit entry
+DERIVED_FIELDS = {'search_vector', 'email_normalized', 'phone_normalized'}
+
+_local = Local()
+
+
+class AuditBatch:
+    """Audit entries collected during a request or bulk operation"""
+
+    def __init__(self, user=None):
+        self.user = user
+        self.entries = []
+        self.deleted_client_ids = set()
+
+    def add(self, entry):
+        self.entries.append(entry)
+
+    def flush(self):
+        # Hard-deleted clients take their audit trail with them (FK cascade)
+        entries = [entry for entry in self.entries if entry.client_id not in self.deleted_client_ids]
+        self.entries = []
+        for entry in entries:
+            if entry.user_id is None and self.user is not None:
+                entry.user = self.user
+        if entries:
+            AuditLog.objects.bulk_create(entries, batch_size=1000)
+        return len(entries)
+
+
+def current_batch():
+    return getattr(_local, 'batch', None)
+
+
+@contextmanager
+def audit_batch(user=None):
+    """Collect audit entries recorded inside the block and write them with one bulk_create"""
+    outer = current_batch()
+    if outer is not None:
+        yield outer
+        return
+    batch = AuditBatch(user)
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+        batch.flush()
+
+
+def _collect(entry):
+    batch = current_batch()
+    if batch is None:
+        entry.save()
+    else:
+        batch.add(entry)
+
+
+def record(entry):
+    """Queue an unsaved AuditLog; it is kept only if the surrounding transaction commits"""
+    transaction.on_commit(partial(_collect, entry))
+
+
+def snapshot(instance, skip_empty=False):
+    """All concrete field values of a client, keyed by field name"""
+    data = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in DERIVED_FIELDS:
+            continue
+        value = getattr(instance, field.attname)
+        if skip_empty and value in (None, '', [], {}):
+            continue
+        data[field.name] = serialize_field(value)
+    return data
+
+
+def diff(instance):
+    """(before, after) dicts of the fields changed since load, or None if nothing changed"""
+    changed = instance.get_changed_fields()
+    if changed is None:
+        return None, snapshot(instance)
+    changed -= IGNORED_FIELDS | DERIVED_FIELDS
+    if not changed:
+        return None
+    loaded = instance._loaded_values
+    before = {}
+    after = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in changed:
+            before[field.name] = serialize_field(loaded.get(field.attname))
+            after[field.name] = serialize_field(getattr(instance, field.attname))
+    return before, after
+
+
+def create_entry(client, user=None):
+    """Unsaved 'create' entry for a new client, holding only the fields that were set"""
+    return AuditLog(client=client, action='create', user=user, before=None, after=snapshot(client, skip_empty=True))
+
+
+def log_save(instance, created):
+    """Record a create/update (or restore, via instance._audit_action) for a saved client"""
+    user = getattr(instance, '_auditlog_user', None)
+    action = getattr(instance, '_audit_action', None)
+    instance._audit_action = None
+
+    if created:
+        record(create_entry(instance, user))
+        return
+
+    changes = diff(instance)
+    if changes is None:
+        return
+    before, after = changes
+    record(AuditLog(client=instance, action=action or 'update', user=user, before=before, after=after))
+
+
+def log_bulk_change(client_ids, before, after, action='update', user=None):
+    """
+    Audit a queryset.update() that applied the same change to many clients:
+    one entry per client, written with a single bulk_create.
+    """
+    entries = [
+        AuditLog(client_id=client_id, action=action, user=user, before=before, after=after)
+        for client_id in client_ids
+    ]
+    AuditLog.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def log_merges(mapping, user=None):
+    """Audit the duplicates folded away by identity.dedupe(), one 'merge' entry each"""
+    entries = [
+        AuditLog(
+            client_id=client_id, action='merge', user=user,
+            before={'is_deleted': False}, after={'is_deleted': True, 'merged_into': keeper_id},
+        )
+        for client_id, keeper_id in mapping.items()
+    ]
+    AuditLog.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def forget_client(client_id):
+    """Drop queued entries for a client that is being hard-deleted"""
+    batch = current_batch()
+    if batch is not None:
+        batch.deleted_client_ids.add(client_id)
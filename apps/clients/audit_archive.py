@@ -0,0 +1,179 @@
+"""
+Partition maintenance, retention and archiving for client audit logs.
+
+On PostgreSQL clients_auditlog is range-partitioned by month on timestamp,
+so an expired month is archived by dumping one partition and dropping it.
+Other backends keep a plain table; expired months are dumped the same way
+and then deleted in batches. Either way each archived month is recorded in
+AuditLogArchive with a gzipped NDJSON file in the default storage.
+"""
+import gzip
+import json
+import tempfile
+from datetime import date, datetime, time, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AuditLog, AuditLogArchive
+
+
+ARCHIVE_FIELDS = ['id', 'client_id', 'action', 'user_id', 'timestamp', 'before', 'after']
+BATCH_SIZE = 5000
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def add_months(day, months):
+    """First day of the month `months` after the month of `day`"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def as_utc(day):
+    """Midnight UTC of `day`; partition bounds are UTC since Django runs sessions in UTC"""
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def partition_name(period_start):
+    return f'{AuditLog._meta.db_table}_y{period_start:%Y}m{period_start:%m}'
+
+
+def is_partitioned():
+    """True when the audit table is a PostgreSQL partitioned table"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "WHERE c.relname = %s AND c.relnamespace = to_regnamespace(current_schema())::oid",
+            [AuditLog._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def existing_partitions():
+    """Names of the partitions currently attached to the audit table"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [AuditLog._meta.db_table],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(cursor, period_start):
+    """
+    Create and attach the partition for one month. Rows for that month that
+    already landed in the default partition are moved into it first.
+    """
+    quote = connection.ops.quote_name
+    table = AuditLog._meta.db_table
+    name = partition_name(period_start)
+    period_end = add_months(period_start, 1)
+    cursor.execute(f'CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {quote(table + "_default")} '
+        f'WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+        f'INSERT INTO {quote(name)} SELECT * FROM moved',
+        [as_utc(period_start), as_utc(period_end)],
+    )
+    cursor.execute(
+        f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(name)} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [as_utc(period_start), as_utc(period_end)],
+    )
+
+
+def ensure_partitions(months_ahead=2, today=None):
+    """Make sure partitions exist for the current month and the next `months_ahead` months"""
+    if not is_partitioned():
+        return []
+    today = today or timezone.now().date()
+    existing = existing_partitions()
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            period_start = add_months(month_start(today), offset)
+            if partition_name(period_start) not in existing:
+                create_partition(cursor, period_start)
+                created.append(partition_name(period_start))
+    return created
+
+
+def write_archive(period_start, period_end):
+    """Dump one month of audit logs to a gzipped NDJSON file and record it; returns the archive"""
+    rows = AuditLog.objects.filter(
+        timestamp__gte=as_utc(period_start), timestamp__lt=as_utc(period_end)
+    ).order_by().values_list(*ARCHIVE_FIELDS)
+
+    row_count = 0
+    with tempfile.TemporaryFile() as tmp:
+        with gzip.GzipFile(fileobj=tmp, mode='wb') as gz:
+            for row in rows.iterator(chunk_size=BATCH_SIZE):
+                gz.write((json.dumps(dict(zip(ARCHIVE_FIELDS, row)), default=str) + '\n').encode('utf-8'))
+                row_count += 1
+        tmp.seek(0)
+        filename = f'auditlog_{period_start:%Y_%m}.ndjson.gz'
+        archive, _ = AuditLogArchive.objects.get_or_create(
+            period_start=period_start,
+            defaults={'period_end': period_end},
+        )
+        archive.period_end = period_end
+        archive.row_count = row_count
+        archive.file.save(filename, File(tmp, name=filename), save=False)
+        archive.save()
+    return archive
+
+
+def drop_month(period_start, period_end, partitioned):
+    """Remove an archived month from the live table"""
+    if partitioned:
+        name = partition_name(period_start)
+        if name in existing_partitions():
+            quote = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {quote(AuditLog._meta.db_table)} DETACH PARTITION {quote(name)}')
+                cursor.execute(f'DROP TABLE {quote(name)}')
+            return
+        # Month never got its own partition: its rows sit in the default partition
+
+    expired = AuditLog.objects.filter(timestamp__gte=as_utc(period_start), timestamp__lt=as_utc(period_end))
+    while True:
+        ids = list(expired.values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            break
+        AuditLog.objects.filter(pk__in=ids).delete()
+
+
+def archive_expired(retention_months=None, today=None):
+    """
+    Archive and remove every month older than the retention period.
+    Returns the AuditLogArchive records written.
+    """
+    if retention_months is None:
+        retention_months = settings.AUDIT_LOG_RETENTION_MONTHS
+    today = today or timezone.now().date()
+    cutoff = add_months(month_start(today), -retention_months)
+
+    oldest = AuditLog.objects.filter(timestamp__lt=as_utc(cutoff)).order_by('timestamp').values_list('timestamp', flat=True).first()
+    if oldest is None:
+        return []
+
+    partitioned = is_partitioned()
+    archives = []
+    period_start = month_start(oldest.astimezone(dt_timezone.utc).date())
+    while period_start < cutoff:
+        period_end = add_months(period_start, 1)
+        archives.append(write_archive(period_start, period_end))
+        drop_month(period_start, period_end, partitioned)
+        period_start = period_end
+    return archives
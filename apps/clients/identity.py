@@ -0,0 +1,163 @@
+"""
+Normalized client identity.
+
+Clients carry email_normalized (trimmed, lowercased) and phone_normalized
+(E.164) next to the raw values the user typed. Client.save() and the
+importer fill them in. Each has a unique index per tenant over live
+clients, so the duplicate checks on create, import and telecalling visit
+capture are single index lookups. They no longer compare raw strings, where
+"+91 98765 43210" and "098765-43210" never match.
+
+dedupe() folds existing duplicates together with set-based SQL. A window
+function picks the oldest live client of every (tenant, email) and
+(tenant, phone) cluster. Related rows move to that client with one UPDATE
+per relation, and the others are soft-deleted with merged_into pointing at
+it. The functions take the model from the queryset, so migrations can run
+them on historical models.
+"""
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BigIntegerField, Case, Count, Exists, F, OuterRef, Q, Value, When, Window
+from django.db.models.functions import FirstValue
+from django.utils import timezone
+
+
+# Checked in this order; the email pass runs before the phone pass
+IDENTITY_FIELDS = ('email_normalized', 'phone_normalized')
+# Numbers longer than this that start with the default country code already carry it
+NATIONAL_NUMBER_LENGTH = 10
+# Audit logs describe the duplicate's own history and stay with it
+KEPT_RELATIONS = {'clients.AuditLog'}
+BATCH_SIZE = 1000
+
+
+def normalize_email(value):
+    """Trimmed, lowercased email, or None when blank"""
+    value = str(value or '').strip().lower()
+    return value or None
+
+
+def normalize_phone(value, country_code=None):
+    """
+    E.164 form of a phone number ('+919876543210'), or None when it cannot
+    be one. Numbers without '+' or '00' are national numbers of
+    PHONE_DEFAULT_COUNTRY_CODE, with an optional trunk '0'.
+    """
+    value = str(value or '').strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    else:
+        country_code = country_code or settings.PHONE_DEFAULT_COUNTRY_CODE
+        digits = digits.lstrip('0')
+        if not (digits.startswith(country_code) and len(digits) > NATIONAL_NUMBER_LENGTH):
+            digits = country_code + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f'+{digits}'
+
+
+def identity_filter(email=None, phone=None):
+    """Q matching clients by normalized email or phone, or None when neither is usable"""
+    keys = Q()
+    email = normalize_email(email)
+    phone = normalize_phone(phone)
+    if email:
+        keys |= Q(email_normalized=email)
+    if phone:
+        keys |= Q(phone_normalized=phone)
+    return keys or None
+
+
+def matches(tenant, email=None, phone=None, exclude=None):
+    """Live clients of `tenant` sharing the email or phone, oldest first (at most one per key)"""
+    from .models import Client
+
+    keys = identity_filter(email, phone)
+    if keys is None or tenant is None:
+        return Client.objects.none()
+    queryset = Client.objects.filter(keys, tenant=tenant, is_deleted=False)
+    if exclude is not None and exclude.pk is not None:
+        queryset = queryset.exclude(pk=exclude.pk)
+    return queryset.order_by('created_at', 'pk')
+
+
+def find_existing(tenant, email=None, phone=None, exclude=None):
+    """The live client of `tenant` with this email or phone, or None"""
+    return matches(tenant, email, phone, exclude).first()
+
+
+def conflicts(queryset):
+    """Rows of `queryset` whose email or phone is held by another live client of their tenant"""
+    live = queryset.model._base_manager.filter(tenant_id=OuterRef('tenant_id'), is_deleted=False).exclude(
+        pk=OuterRef('pk')
+    )
+    return queryset.filter(
+        Exists(live.filter(email_normalized=OuterRef('email_normalized')))
+        | Exists(live.filter(phone_normalized=OuterRef('phone_normalized')))
+    )
+
+
+def duplicate_pairs(queryset, field):
+    """{duplicate pk: keeper pk} for live rows sharing `field` with an older client of their tenant"""
+    partition = [F('tenant_id'), F(field)]
+    rows = queryset.filter(is_deleted=False, **{f'{field}__isnull': False}).annotate(
+        keeper=Window(FirstValue('pk'), partition_by=partition, order_by=[F('created_at').asc(), F('pk').asc()]),
+        cluster_size=Window(Count('pk'), partition_by=partition),
+    ).filter(cluster_size__gt=1).order_by().values_list('pk', 'keeper')
+    return {pk: keeper for pk, keeper in rows if pk != keeper}
+
+
+def _remap(field, mapping):
+    whens = [When(**{field: old}, then=Value(new)) for old, new in mapping.items()]
+    return Case(*whens, output_field=BigIntegerField())
+
+
+def merge(model, mapping):
+    """Move related rows and tags of duplicates to their keepers and soft-delete the duplicates"""
+    ids = list(mapping)
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(ids), BATCH_SIZE):
+            batch = {pk: mapping[pk] for pk in ids[start:start + BATCH_SIZE]}
+            for relation in model._meta.related_objects:
+                if not relation.one_to_many or relation.related_model._meta.label in KEPT_RELATIONS:
+                    continue
+                name = relation.field.name
+                relation.related_model._base_manager.filter(**{f'{name}__in': batch}).update(
+                    **{name: _remap(name, batch)}
+                )
+
+            through = model.tags.through
+            links = through.objects.filter(client_id__in=batch).values_list('client_id', 'customertag_id')
+            through.objects.bulk_create(
+                [through(client_id=batch[client_id], customertag_id=tag_id) for client_id, tag_id in links],
+                ignore_conflicts=True,
+            )
+
+            model._base_manager.filter(pk__in=batch).update(
+                is_deleted=True, deleted_at=now, updated_at=now, merged_into=_remap('pk', batch)
+            )
+
+
+def dedupe(queryset):
+    """Merge live duplicates in `queryset` by email, then by phone; returns {duplicate pk: keeper pk}"""
+    merged = {}
+    for field in IDENTITY_FIELDS:
+        mapping = duplicate_pairs(queryset, field)
+        merge(queryset.model, mapping)
+        merged.update(mapping)
+
+    # A keeper of the email pass may itself have been merged by the phone pass
+    def root(pk):
+        while pk in merged:
+            pk = merged[pk]
+        return pk
+
+    return {pk: root(pk) for pk in merged}
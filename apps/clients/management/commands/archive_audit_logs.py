@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.clients.audit_archive import archive_expired, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming audit log partitions and archive audit logs past the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-months', type=int, help='Months to keep (defaults to AUDIT_LOG_RETENTION_MONTHS)')
+        parser.add_argument('--months-ahead', type=int, default=2, help='Future monthly partitions to create')
+
+    def handle(self, *args, **options):
+        for name in ensure_partitions(months_ahead=options['months_ahead']):
+            self.stdout.write(f"Created partition {name}")
+
+        for archive in archive_expired(retention_months=options['retention_months']):
+            self.stdout.write(f"{archive.period_start:%Y-%m}: {archive.row_count} rows archived to {archive.file.name}")
+        self.stdout.write(self.style.SUCCESS('Audit logs maintained'))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.tenants.models import Tenant
+from apps.clients.models import Client
+from apps.clients import audit
+from apps.clients.identity import IDENTITY_FIELDS, dedupe, duplicate_pairs
+from shared.cache import bump_on_commit
+
+
+class Command(BaseCommand):
+    help = 'Merge live clients that share a normalized email or phone number into the oldest one'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the duplicates each pass would merge',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        for tenant in tenants:
+            clients = Client.objects.filter(tenant=tenant)
+            if options['dry_run']:
+                counts = ', '.join(
+                    f"{len(duplicate_pairs(clients, field))} by {field}" for field in IDENTITY_FIELDS
+                )
+                self.stdout.write(f"{tenant.slug}: {counts}")
+                continue
+            with transaction.atomic():
+                merged = dedupe(clients)
+                audit.log_merges(merged)
+                bump_on_commit(tenant.id, 'clients')
+            self.stdout.write(f"{tenant.slug}: {len(merged)} duplicates merged")
+
+        self.stdout.write(self.style.SUCCESS('Client deduplication completed'))
@@ -0,0 +1,27 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from apps.clients.tagging import tagging_engine
+
+
+class Command(BaseCommand):
+    help = 'Recompute birthday-week, anniversary-week and age-band tags for all clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+        parser.add_argument('--date', help='Evaluate as of this date (YYYY-MM-DD), defaults to today')
+
+    def handle(self, *args, **options):
+        tenant = None
+        if options['tenant']:
+            tenant = Tenant.objects.filter(slug=options['tenant']).first()
+            if tenant is None:
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        today = date.fromisoformat(options['date']) if options['date'] else None
+        result = tagging_engine.refresh_time_dependent(tenant=tenant, today=today)
+
+        for slug, counts in sorted(result.items()):
+            self.stdout.write(f"{slug}: {counts['added']} added, {counts['removed']} removed")
+        self.stdout.write(self.style.SUCCESS('Time-dependent tags refreshed'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from apps.clients.tagging import tagging_engine
+
+
+class Command(BaseCommand):
+    help = 'Re-apply auto tags to every client of one or all tenants in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Also remove auto-managed tags that no longer apply',
+        )
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        for tenant in tenants:
+            result = tagging_engine.retag_tenant(tenant, prune=options['prune'])
+            self.stdout.write(f"{tenant.name}: {result['added']} tags added, {result['removed']} removed")
+
+        self.stdout.write(self.style.SUCCESS('Re-tagging completed'))
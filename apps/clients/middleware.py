@@ -0,0 +1,20 @@
+from .audit import audit_batch
+
+
+class AuditLogMiddleware:
+    """
+    Collects the client audit entries written while handling a request and
+    stores them with a single bulk_create once the response is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_batch() as batch:
+            response = self.get_response(request)
+            # DRF authenticates inside the view and copies the user back onto the request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                batch.user = user
+        return response
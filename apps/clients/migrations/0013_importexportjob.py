@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0012_alter_appointment_options_appointment_assigned_to_and_more'),
+        ('tenants', '0002_tenant_google_maps_url'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_type', models.CharField(choices=[('import_csv', 'Import CSV'), ('import_json', 'Import JSON'), ('export_csv', 'Export CSV'), ('export_json', 'Export JSON')], max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('source_file', models.FileField(blank=True, null=True, upload_to='client_jobs/uploads/%Y/%m/')),
+                ('result_file', models.FileField(blank=True, null=True, upload_to='client_jobs/exports/%Y/%m/')),
+                ('options', models.JSONField(blank=True, default=dict)),
+                ('total_rows', models.PositiveIntegerField(blank=True, null=True)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('imported_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='client_jobs', to=settings.AUTH_USER_MODEL)),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='client_jobs', to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Import/Export Job',
+                'verbose_name_plural': 'Import/Export Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
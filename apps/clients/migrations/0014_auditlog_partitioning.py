@@ -0,0 +1,134 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:40
+
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_audit_log(apps, schema_editor):
+    """
+    Rebuild clients_auditlog as a table range-partitioned by month on
+    timestamp (PostgreSQL only). The primary key becomes (id, timestamp)
+    because a partitioned table's unique keys must include the partition
+    key; ids keep coming from a sequence, so they stay unique.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    AuditLog = apps.get_model('clients', 'AuditLog')
+    Client = apps.get_model('clients', 'Client')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    quote = schema_editor.quote_name
+    table = AuditLog._meta.db_table
+    legacy = f'{table}_legacy'
+    sequence = f'{table}_part_id_seq'
+
+    schema_editor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}')
+    schema_editor.execute(f'CREATE SEQUENCE {quote(sequence)}')
+    schema_editor.execute(
+        f'CREATE TABLE {quote(table)} ('
+        f'"id" bigint NOT NULL DEFAULT nextval(\'{sequence}\'), '
+        f'"action" varchar(10) NOT NULL, '
+        f'"timestamp" timestamp with time zone NOT NULL, '
+        f'"before" jsonb NULL, '
+        f'"after" jsonb NULL, '
+        f'"client_id" bigint NOT NULL REFERENCES {quote(Client._meta.db_table)} ("id") DEFERRABLE INITIALLY DEFERRED, '
+        f'"user_id" bigint NULL REFERENCES {quote(User._meta.db_table)} ("id") DEFERRABLE INITIALLY DEFERRED, '
+        f'CONSTRAINT {quote(table + "_id_timestamp_pk")} PRIMARY KEY ("id", "timestamp")'
+        f') PARTITION BY RANGE ("timestamp")'
+    )
+    schema_editor.execute(f'CREATE TABLE {quote(table + "_default")} PARTITION OF {quote(table)} DEFAULT')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN("timestamp") FROM {quote(legacy)}')
+        oldest = cursor.fetchone()[0]
+
+    today = timezone.now().date()
+    period_start = add_months(oldest.date() if oldest else today, 0)
+    last = add_months(today, 2)
+    while period_start <= last:
+        period_end = add_months(period_start, 1)
+        name = f'{table}_y{period_start:%Y}m{period_start:%m}'
+        schema_editor.execute(
+            f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} '
+            f"FOR VALUES FROM ('{period_start.isoformat()} 00:00:00+00') TO ('{period_end.isoformat()} 00:00:00+00')"
+        )
+        period_start = period_end
+
+    columns = '"id", "action", "timestamp", "before", "after", "client_id", "user_id"'
+    schema_editor.execute(f'INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(legacy)}')
+    schema_editor.execute(
+        f"SELECT setval('{sequence}', COALESCE((SELECT MAX(\"id\") FROM {quote(table)}), 0) + 1, false)"
+    )
+    schema_editor.execute(f'ALTER SEQUENCE {quote(sequence)} OWNED BY {quote(table)}."id"')
+    schema_editor.execute(f'DROP TABLE {quote(legacy)}')
+    schema_editor.execute(f'CREATE INDEX {quote(table + "_user_id_idx")} ON {quote(table)} ("user_id")')
+
+
+def unpartition_audit_log(apps, schema_editor):
+    """
+    Copy the rows back into a plain clients_auditlog as migration 0011
+    created it. Months already moved out by archive_audit_logs stay in
+    their archive files.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    AuditLog = apps.get_model('clients', 'AuditLog')
+    quote = schema_editor.quote_name
+    table = AuditLog._meta.db_table
+    partitioned = f'{table}_partitioned'
+
+    schema_editor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(partitioned)}')
+    schema_editor.create_model(AuditLog)
+    columns = '"id", "action", "timestamp", "before", "after", "client_id", "user_id"'
+    schema_editor.execute(f'INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(partitioned)}')
+    schema_editor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+        f'COALESCE((SELECT MAX("id") FROM {quote(table)}), 0) + 1, false)'
+    )
+    # Drops the partitions and the id sequence with it
+    schema_editor.execute(f'DROP TABLE {quote(partitioned)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0013_importexportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_audit_log, unpartition_audit_log),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['client', '-timestamp'], name='clients_aud_client_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-timestamp'], name='clients_aud_ts_idx'),
+        ),
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField(unique=True)),
+                ('period_end', models.DateField()),
+                ('file', models.FileField(upload_to='audit_archive/')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Audit Log Archive',
+                'verbose_name_plural': 'Audit Log Archives',
+                'ordering': ['-period_start'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0014_auditlog_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['tenant', '-created_at', '-id'], name='client_tenant_created_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:05
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+SEARCH_INDEXES = [
+    GinIndex(fields=['search_vector'], name='client_search_idx'),
+    GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='client_email_trgm_idx'),
+    GinIndex(OpClass(Upper('phone'), name='gin_trgm_ops'), name='client_phone_trgm_idx'),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    # GIN and pg_trgm are PostgreSQL only; other databases search in memory (shared/search.py)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Client = apps.get_model('clients', 'Client')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Client, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Client = apps.get_model('clients', 'Client')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Client, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0015_client_tenant_created_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='client',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='client', index=index) for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_indexes, remove_search_indexes),
+            ],
+        ),
+    ]
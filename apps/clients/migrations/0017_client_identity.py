@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0016_client_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='phone_normalized',
+            field=models.CharField(editable=False, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_duplicates', to='clients.client'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete'), ('restore', 'Restore'), ('merge', 'Merge')], max_length=10),
+        ),
+    ]
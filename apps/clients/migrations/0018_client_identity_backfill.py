@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Frozen copies of apps.clients.identity.normalize_email / normalize_phone as of
+# this migration, so later changes there can't change what history computes
+NATIONAL_NUMBER_LENGTH = 10
+
+
+def normalize_email(value):
+    value = str(value or '').strip().lower()
+    return value or None
+
+
+def normalize_phone(value):
+    value = str(value or '').strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    else:
+        country_code = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91')
+        digits = digits.lstrip('0')
+        if not (digits.startswith(country_code) and len(digits) > NATIONAL_NUMBER_LENGTH):
+            digits = country_code + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f'+{digits}'
+
+
+def normalize_clients(apps, schema_editor):
+    Client = apps.get_model('clients', 'Client')
+    batch = []
+    for client in Client.objects.only('pk', 'email', 'phone').iterator(chunk_size=2000):
+        client.email_normalized = normalize_email(client.email)
+        client.phone_normalized = normalize_phone(client.phone)
+        batch.append(client)
+        if len(batch) == 2000:
+            Client.objects.bulk_update(batch, ['email_normalized', 'phone_normalized'])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ['email_normalized', 'phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0017_client_identity'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_clients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+REPORT_LIMIT = 20
+
+
+def check_no_live_duplicates(apps, schema_editor):
+    """
+    Refuse to add the unique constraints over live duplicates. build.sh
+    runs `manage.py dedupe_clients` (which writes 'merge' audit entries)
+    before migrating, so this only fails where migrate is run by hand:
+    `manage.py dedupe_clients --dry-run`, then `manage.py dedupe_clients`,
+    then migrate again.
+    """
+    Client = apps.get_model('clients', 'Client')
+    clusters = []
+    for field in ('email_normalized', 'phone_normalized'):
+        clusters += [
+            (field, row['tenant_id'], row[field], row['total'])
+            for row in Client.objects.filter(is_deleted=False, **{f'{field}__isnull': False})
+            .values('tenant_id', field).annotate(total=Count('pk')).filter(total__gt=1).order_by('-total')
+        ]
+    if not clusters:
+        return
+    lines = [
+        f'  tenant {tenant_id}: {total} live clients share {field} {value}'
+        for field, tenant_id, value, total in clusters[:REPORT_LIMIT]
+    ]
+    if len(clusters) > REPORT_LIMIT:
+        lines.append(f'  ... and {len(clusters) - REPORT_LIMIT} more')
+    raise RuntimeError(
+        f'{len(clusters)} groups of live clients share a normalized email or phone:\n'
+        + '\n'.join(lines)
+        + '\nReview them with `manage.py dedupe_clients --dry-run`, merge with '
+        '`manage.py dedupe_clients` (or edit the clients), then run migrate again.'
+    )
+
+
+class Migration(migrations.Migration):
+
+    # dedupe_clients, run when the check below fails, moves visits too
+    dependencies = [
+        ('clients', '0018_client_identity_backfill'),
+        ('telecalling', '0004_customervisit_client'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_no_live_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='client',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('tenant', 'email_normalized'), name='client_tenant_email_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='client',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('tenant', 'phone_normalized'), name='client_tenant_phone_uniq'),
+        ),
+    ]
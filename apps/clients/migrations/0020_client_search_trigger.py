@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:20
+
+from django.db import migrations
+
+from shared.search import search_trigger
+
+
+# Must match the document registered with index_for_search() in clients/signals.py
+DOCUMENT = [('first_name', 'A'), ('last_name', 'A'), ('email', 'B'), ('phone', 'B'), ('notes', 'D')]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0019_client_identity_constraints'),
+    ]
+
+    operations = [
+        search_trigger('clients', 'Client', DOCUMENT),
+    ]
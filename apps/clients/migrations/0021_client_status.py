@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+STATUS = models.CharField(
+    choices=[('lead', 'Lead'), ('prospect', 'Prospect'), ('customer', 'Customer'), ('inactive', 'Inactive')],
+    default='lead',
+    max_length=20,
+)
+
+
+def status_field():
+    # The database operations run against a state that doesn't have the field yet
+    field = STATUS.clone()
+    field.set_attributes_from_name('status')
+    return field
+
+
+def add_status(apps, schema_editor):
+    Client = apps.get_model('clients', 'Client')
+    if schema_editor.connection.vendor == 'sqlite':
+        # SQLite would rebuild the table for a NOT NULL column, recreating the
+        # PostgreSQL-only search indexes from 0016 with it; ADD COLUMN takes a default
+        table = schema_editor.quote_name(Client._meta.db_table)
+        schema_editor.execute(f"ALTER TABLE {table} ADD COLUMN \"status\" varchar(20) NOT NULL DEFAULT 'lead'")
+        return
+    schema_editor.add_field(Client, status_field())
+
+
+def remove_status(apps, schema_editor):
+    Client = apps.get_model('clients', 'Client')
+    if schema_editor.connection.vendor == 'sqlite':
+        table = schema_editor.quote_name(Client._meta.db_table)
+        schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN "status"')
+        return
+    schema_editor.remove_field(Client, status_field())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0020_client_search_trigger'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(model_name='client', name='status', field=STATUS),
+            ],
+            database_operations=[
+                migrations.RunPython(add_status, remove_status),
+            ],
+        ),
+    ]
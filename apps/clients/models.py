@@ -1,8 +1,10 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from django.db.models.signals import pre_save, post_save, pre_delete
-from django.dispatch import receiver
+import copy
 import json
 import datetime
 from decimal import Decimal
@@ -94,6 +96,7 @@ class Client(models.Model):
 
     # Lead Information
     lead_source = models.CharField(max_length=50, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.LEAD)
     assigned_to = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_clients')
 
     # Notes
@@ -120,6 +123,16 @@ class Client(models.Model):
     # Tags relationship
     tags = models.ManyToManyField('CustomerTag', related_name='clients', blank=True)
 
+    # Search document, maintained by shared/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Normalized identity, set on save (see identity.py)
+    email_normalized = models.CharField(max_length=254, null=True, editable=False)
+    phone_normalized = models.CharField(max_length=16, null=True, editable=False)
+    merged_into = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='merged_duplicates'
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -132,10 +145,72 @@ class Client(models.Model):
         verbose_name_plural = _('Clients')
         ordering = ['-created_at']
         unique_together = ['email', 'tenant']
+        indexes = [
+            # Keyset pagination of the client list (shared/pagination.py)
+            models.Index(fields=['tenant', '-created_at', '-id'], name='client_tenant_created_idx'),
+            GinIndex(fields=['search_vector'], name='client_search_idx'),
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='client_email_trgm_idx'),
+            GinIndex(OpClass(Upper('phone'), name='gin_trgm_ops'), name='client_phone_trgm_idx'),
+        ]
+        constraints = [
+            # One live client per email and per phone number in a tenant
+            models.UniqueConstraint(
+                fields=['tenant', 'email_normalized'], condition=models.Q(is_deleted=False),
+                name='client_tenant_email_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['tenant', 'phone_normalized'], condition=models.Q(is_deleted=False),
+                name='client_tenant_phone_uniq',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the values as loaded so saves can tell which fields changed
+        instance._remember_loaded_values(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.normalize_identity()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'email', 'phone'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'email_normalized', 'phone_normalized'}
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the old values; later saves diff against this one
+        self._remember_loaded_values(
+            (field.attname, getattr(self, field.attname)) for field in self._meta.concrete_fields
+        )
+
+    def normalize_identity(self):
+        from .identity import normalize_email, normalize_phone
+        self.email_normalized = normalize_email(self.email)
+        self.phone_normalized = normalize_phone(self.phone)
+
+    def _remember_loaded_values(self, items):
+        # JSON values are copied so in-place edits still show up as changes
+        self._loaded_values = {
+            name: copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+            for name, value in items
+        }
+
+    def get_changed_fields(self):
+        """
+        Names of fields that differ from the values loaded from the database.
+        Returns None when the original values are unknown (e.g. unsaved instance).
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        changed = set()
+        for field in self._meta.concrete_fields:
+            if field.attname in loaded and loaded[field.attname] != getattr(self, field.attname):
+                changed.add(field.name)
+        return changed
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -527,6 +602,7 @@ class AuditLog(models.Model):
         ('update', 'Update'),
         ('delete', 'Delete'),
         ('restore', 'Restore'),
+        ('merge', 'Merge'),
     ]
     client = models.ForeignKey('Client', on_delete=models.CASCADE, related_name='audit_logs')
     action = models.CharField(max_length=10, choices=ACTION_CHOICES)
@@ -535,47 +611,93 @@ class AuditLog(models.Model):
     before = models.JSONField(null=True, blank=True)
     after = models.JSONField(null=True, blank=True)
 
+    class Meta:
+        # On PostgreSQL the table is range-partitioned by month on timestamp
+        # (see migration 0014 and audit_archive.py)
+        indexes = [
+            models.Index(fields=['client', '-timestamp'], name='clients_aud_client_ts_idx'),
+            models.Index(fields=['-timestamp'], name='clients_aud_ts_idx'),
+        ]
+
     def __str__(self):
         return f"{self.get_action_display()} by {self.user} on {self.timestamp}"
 
 
-@receiver(pre_save, sender=Client)
-def log_client_update(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old = Client.objects.get(pk=instance.pk)
-            before = {field.name: serialize_field(getattr(old, field.name)) for field in instance._meta.fields}
-        except Client.DoesNotExist:
-            before = None
-        instance._auditlog_before = before
-    else:
-        instance._auditlog_before = None
-
-@receiver(post_save, sender=Client)
-def create_audit_log_on_save(sender, instance, created, **kwargs):
-    from .models import AuditLog
-    user = getattr(instance, '_auditlog_user', None)
-    before = getattr(instance, '_auditlog_before', None)
-    after = {field.name: serialize_field(getattr(instance, field.name)) for field in instance._meta.fields}
-    action = 'create' if created else 'update'
-    if before != after:
-        AuditLog.objects.create(
-            client=instance,
-            action=action,
-            user=user,
-            before=before,
-            after=after
-        )
+class AuditLogArchive(models.Model):
+    """
+    One month of audit logs moved out of the live table into a compressed
+    NDJSON file in storage once it passed the retention period.
+    """
+    period_start = models.DateField(unique=True)
+    period_end = models.DateField()
+    file = models.FileField(upload_to='audit_archive/')
+    row_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
 
-@receiver(pre_delete, sender=Client)
-def create_audit_log_on_delete(sender, instance, **kwargs):
-    from .models import AuditLog
-    user = getattr(instance, '_auditlog_user', None)
-    before = {field.name: serialize_field(getattr(instance, field.name)) for field in instance._meta.fields}
-    AuditLog.objects.create(
-        client=instance,
-        action='delete',
-        user=user,
-        before=before,
-        after=None
-    )
+    class Meta:
+        verbose_name = _('Audit Log Archive')
+        verbose_name_plural = _('Audit Log Archives')
+        ordering = ['-period_start']
+
+    def __str__(self):
+        return f"Audit logs {self.period_start:%Y-%m} ({self.row_count} rows)"
+
+
+class ImportExportJob(models.Model):
+    """
+    Background client import/export job processed by a Celery worker.
+    """
+    class JobType(models.TextChoices):
+        IMPORT_CSV = 'import_csv', _('Import CSV')
+        IMPORT_JSON = 'import_json', _('Import JSON')
+        EXPORT_CSV = 'export_csv', _('Export CSV')
+        EXPORT_JSON = 'export_json', _('Export JSON')
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        RUNNING = 'running', _('Running')
+        COMPLETED = 'completed', _('Completed')
+        FAILED = 'failed', _('Failed')
+
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='client_jobs')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='client_jobs')
+    job_type = models.CharField(max_length=20, choices=JobType.choices)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+
+    # Files live in the default storage (S3 via django-storages in production)
+    source_file = models.FileField(upload_to='client_jobs/uploads/%Y/%m/', blank=True, null=True)
+    result_file = models.FileField(upload_to='client_jobs/exports/%Y/%m/', blank=True, null=True)
+    options = models.JSONField(default=dict, blank=True)
+
+    # Progress
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    imported_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True, null=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Import/Export Job')
+        verbose_name_plural = _('Import/Export Jobs')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_import(self):
+        return self.job_type in [self.JobType.IMPORT_CSV, self.JobType.IMPORT_JSON]
+
+    @property
+    def progress(self):
+        """Percentage of rows processed, when the total is known"""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, round(self.processed_rows * 100 / self.total_rows))
@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, CustomerTag, AuditLog
+from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, CustomerTag, AuditLog, ImportExportJob
 from apps.tenants.models import Tenant
 from .models import Purchase
+from .identity import normalize_email, normalize_phone, matches
 
 
 class ClientSerializer(serializers.ModelSerializer):
@@ -72,7 +73,7 @@ class ClientSerializer(serializers.ModelSerializer):
             'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
             'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
             'reason_for_visit', 'age_of_end_user', 'next_follow_up', 'summary_notes',
-            'customer_interests', 'created_at', 'updated_at',
+            'customer_interests', 'status', 'created_at', 'updated_at',
             # Frontend field mappings
             'name', 'leadSource', 'reasonForVisit', 'ageOfEndUser', 'source', 
             'nextFollowUp', 'summaryNotes', 'assigned_to',
@@ -228,6 +229,10 @@ class ClientSerializer(serializers.ModelSerializer):
             else:
                 print("No tags provided or empty list")
         
+        # Tags were replaced wholesale, so every auto-tag rule has to run again on save
+        if tag_slugs is not None or tags is not None:
+            instance._retag_all = True
+        
         # Call parent update method for other fields
         result = super().update(instance, validated_data)
         print(f"=== UPDATE METHOD COMPLETED ===")
@@ -248,6 +253,25 @@ class ClientSerializer(serializers.ModelSerializer):
         # For now, let's skip email validation to get the basic functionality working
         return value
     
+    def validate_identity(self, data):
+        """
+        Reject an email or phone number already held by another live client of
+        the tenant, compared in normalized form (see identity.py).
+        """
+        instance = getattr(self, 'instance', None)
+        request = self.context.get('request')
+        tenant = instance.tenant if instance is not None else getattr(getattr(request, 'user', None), 'tenant', None)
+        email = data.get('email')
+        phone = data.get('phone')
+        errors = {}
+        for existing in matches(tenant, email=email, phone=phone, exclude=instance):
+            if email and existing.email_normalized == normalize_email(email):
+                errors['email'] = f"Customer with this email already exists (id {existing.pk})"
+            if phone and existing.phone_normalized == normalize_phone(phone):
+                errors['phone'] = f"Customer with this phone number already exists (id {existing.pk})"
+        if errors:
+            raise serializers.ValidationError(errors)
+
     def to_internal_value(self, data):
         """
         Override to handle tenant field before validation.
@@ -296,6 +320,7 @@ class ClientSerializer(serializers.ModelSerializer):
             # This is an update operation
             print("=== UPDATE OPERATION - SKIPPING REQUIRED FIELD VALIDATION ===")
         
+        self.validate_identity(data)
         print("=== VALIDATION PASSED ===")
         print(f"Final data after validation: {data}")
         return data
@@ -370,4 +395,26 @@ class AuditLogSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField()
     class Meta:
         model = AuditLog
-        fields = '__all__' 
\ No newline at end of file
+        fields = '__all__'
+
+
+class ImportExportJobSerializer(serializers.ModelSerializer):
+    created_by = serializers.StringRelatedField()
+    progress = serializers.IntegerField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportExportJob
+        fields = [
+            'id', 'job_type', 'status', 'progress', 'total_rows', 'processed_rows',
+            'imported_count', 'errors', 'error_message', 'options', 'created_by',
+            'created_at', 'started_at', 'finished_at', 'download_url',
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.status != ImportExportJob.Status.COMPLETED or not obj.result_file:
+            return None
+        request = self.context.get('request')
+        url = f'/api/clients/client-jobs/{obj.pk}/download/'
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,326 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+
+from shared.cache import bump_on_commit
+
+from .models import Client, CustomerTag, AuditLog
+from . import audit
+from .identity import normalize_email
+from .tagging import tagging_engine
+
+
+# Column order shared by the CSV export and the import template
+EXPORT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone', 'customer_type',
+    'address', 'city', 'state', 'country', 'postal_code',
+    'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
+    'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
+    'mother_tongue', 'reason_for_visit', 'age_of_end_user', 'saving_scheme',
+    'catchment_area', 'next_follow_up', 'summary_notes', 'status',
+    'created_at', 'updated_at', 'tags'
+]
+
+
+class Echo:
+    """File-like object whose write() hands the value back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+class ClientExportService:
+    """
+    Streaming export of clients.
+
+    Rows are read through a server-side cursor in chunks and tags are
+    prefetched once per chunk, so memory use stays flat regardless of how
+    many clients a tenant has.
+    """
+
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def iter_clients(queryset, chunk_size=None, on_progress=None):
+        """
+        Iterate over clients chunk by chunk with their tags prefetched.
+
+        on_progress(count) is called after every chunk and once at the end.
+        """
+        chunk_size = chunk_size or ClientExportService.CHUNK_SIZE
+        queryset = queryset.prefetch_related(
+            Prefetch('tags', queryset=CustomerTag.objects.only('id', 'slug', 'name', 'category'))
+        )
+        count = 0
+        for client in queryset.iterator(chunk_size=chunk_size):
+            yield client
+            count += 1
+            if on_progress and count % chunk_size == 0:
+                on_progress(count)
+        if on_progress:
+            on_progress(count)
+
+    @staticmethod
+    def client_to_row(client):
+        """Flatten a client into a CSV row keyed by EXPORT_FIELDS"""
+        row = {}
+        for field in EXPORT_FIELDS:
+            if field == 'date_of_birth' and client.date_of_birth:
+                row[field] = client.date_of_birth.strftime('%Y-%m-%d')
+            elif field == 'anniversary_date' and client.anniversary_date:
+                row[field] = client.anniversary_date.strftime('%Y-%m-%d')
+            elif field in ['created_at', 'updated_at']:
+                row[field] = getattr(client, field).strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                value = getattr(client, field, '')
+                row[field] = str(value) if value is not None else ''
+
+        # Tags come from the prefetch cache, not a query per row
+        row['tags'] = ', '.join([tag.name for tag in client.tags.all()])
+        return row
+
+    @staticmethod
+    def stream_csv(queryset, chunk_size=None, on_progress=None):
+        """Yield the CSV export line by line, header first"""
+        writer = csv.DictWriter(Echo(), fieldnames=EXPORT_FIELDS)
+        yield writer.writeheader()
+        for client in ClientExportService.iter_clients(queryset, chunk_size, on_progress):
+            yield writer.writerow(ClientExportService.client_to_row(client))
+
+    @staticmethod
+    def stream_json(queryset, serializer_class, context=None, chunk_size=None, on_progress=None):
+        """Yield the export as a JSON array, one serialized client per chunk of output"""
+        yield '['
+        first = True
+        for client in ClientExportService.iter_clients(queryset, chunk_size, on_progress):
+            data = serializer_class(client, context=context).data
+            yield ('' if first else ',') + '\n' + json.dumps(data, default=str)
+            first = False
+        yield '\n]\n'
+
+    @staticmethod
+    def stream_ndjson(queryset, serializer_class, context=None, chunk_size=None, on_progress=None):
+        """Yield the export as newline-delimited JSON, one client per line"""
+        for client in ClientExportService.iter_clients(queryset, chunk_size, on_progress):
+            data = serializer_class(client, context=context).data
+            yield json.dumps(data, default=str) + '\n'
+
+
+# Plain text columns accepted by the importers
+IMPORT_TEXT_FIELDS = [
+    'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'country',
+    'postal_code', 'preferred_metal', 'preferred_stone', 'ring_size',
+    'budget_range', 'lead_source', 'notes', 'community', 'mother_tongue',
+    'reason_for_visit', 'age_of_end_user', 'saving_scheme', 'catchment_area',
+    'next_follow_up', 'summary_notes',
+]
+
+IMPORT_DATE_FIELDS = ['date_of_birth', 'anniversary_date']
+
+
+def chunked(iterable, size):
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ClientImportService:
+    """
+    Batched client import.
+
+    Normalized emails and phone numbers of the tenant's clients are loaded
+    once into sets (see identity.py), rows are validated in chunks without
+    touching the database, and each chunk is written with bulk_create for
+    clients, tag links, auto tags and audit logs. Signals are bypassed, so
+    one chunk costs a fixed handful of queries.
+    """
+
+    CHUNK_SIZE = 1000
+
+    def __init__(self, tenant, user=None, chunk_size=None):
+        self.tenant = tenant
+        self.user = user
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.imported_count = 0
+        self.errors = []
+
+        # Include soft-deleted clients for emails: (email, tenant) is unique at the DB level.
+        # Phones are only unique among live clients.
+        self.existing_emails = set()
+        self.existing_phones = set()
+        for email, phone, is_deleted in Client.objects.filter(tenant=tenant).values_list(
+            'email_normalized', 'phone_normalized', 'is_deleted'
+        ):
+            self.existing_emails.add(email)
+            if phone and not is_deleted:
+                self.existing_phones.add(phone)
+
+        # Tags can be referenced by slug or by (case-insensitive) name
+        self.tag_ids = {}
+        for tag_id, slug, name in CustomerTag.objects.filter(is_active=True).values_list('id', 'slug', 'name'):
+            self.tag_ids[slug] = tag_id
+            self.tag_ids[name.strip().lower()] = tag_id
+
+    def run(self, rows, start=1, atomic=True, on_progress=None):
+        """
+        Import an iterable of row dicts; `start` is the number of the first row.
+
+        With atomic=False every chunk commits on its own, so progress reported
+        through on_progress(processed_rows) is visible to other connections.
+        """
+        if atomic:
+            with transaction.atomic():
+                self._run_chunks(rows, start, on_progress)
+        else:
+            self._run_chunks(rows, start, on_progress, per_chunk_atomic=True)
+        return self.result()
+
+    def _run_chunks(self, rows, start, on_progress, per_chunk_atomic=False):
+        processed = 0
+        for chunk in chunked(enumerate(rows, start=start), self.chunk_size):
+            if per_chunk_atomic:
+                with transaction.atomic():
+                    self.import_chunk(chunk)
+            else:
+                self.import_chunk(chunk)
+            processed += len(chunk)
+            if on_progress:
+                on_progress(processed)
+
+    def result(self):
+        return {
+            'message': f'Import completed. {self.imported_count} customers imported successfully.',
+            'imported_count': self.imported_count,
+            'errors': self.errors,
+        }
+
+    def import_chunk(self, chunk):
+        """Validate a list of (row_num, row) pairs and bulk insert the valid ones"""
+        clients = []
+        client_tags = []
+        for row_num, row in chunk:
+            try:
+                client, tag_ids = self.build_client(row)
+            except ValidationError as e:
+                self.errors.append(f'Row {row_num}: {self.format_error(e)}')
+                continue
+            except Exception as e:
+                self.errors.append(f'Row {row_num}: {str(e)}')
+                continue
+            self.existing_emails.add(client.email_normalized)
+            if client.phone_normalized:
+                self.existing_phones.add(client.phone_normalized)
+            clients.append(client)
+            client_tags.append(tag_ids)
+
+        if not clients:
+            return
+
+        Client.objects.bulk_create(clients, batch_size=self.chunk_size)
+
+        through = Client.tags.through
+        links = [
+            through(client_id=client.pk, customertag_id=tag_id)
+            for client, tag_ids in zip(clients, client_tags)
+            for tag_id in tag_ids
+        ]
+        if links:
+            through.objects.bulk_create(links, batch_size=self.chunk_size, ignore_conflicts=True)
+
+        # bulk_create skips post_save, so apply auto tags for the whole chunk here
+        tagging_engine.tag_clients(clients)
+
+        AuditLog.objects.bulk_create(
+            [audit.create_entry(client, self.user) for client in clients],
+            batch_size=self.chunk_size
+        )
+        # ...and skips the dashboard cache invalidation hooked to it
+        bump_on_commit(self.tenant.id, 'clients')
+
+        self.imported_count += len(clients)
+
+    def build_client(self, row):
+        """Turn a raw row into an unsaved, validated Client plus the ids of its tags"""
+        if not isinstance(row, dict):
+            raise ValidationError('Row must be an object')
+
+        email = str(row.get('email') or '').strip()
+        if not email:
+            raise ValidationError('Email is required')
+        if normalize_email(email) in self.existing_emails:
+            raise ValidationError(f'Customer with email {email} already exists')
+
+        data = {field: str(row.get(field) or '').strip() for field in IMPORT_TEXT_FIELDS}
+        if not data['first_name'] and not data['last_name'] and row.get('name'):
+            name_parts = str(row['name']).strip().split(' ', 1)
+            data['first_name'] = name_parts[0]
+            data['last_name'] = name_parts[1] if len(name_parts) > 1 else ''
+        if not data['first_name'] and not data['last_name']:
+            raise ValidationError('Name is required')
+
+        for field in IMPORT_DATE_FIELDS:
+            value = str(row.get(field) or '').strip()
+            if value:
+                try:
+                    data[field] = datetime.strptime(value[:10], '%Y-%m-%d').date()
+                except ValueError:
+                    pass  # Skip invalid date
+
+        interests = row.get('customer_interests')
+        if isinstance(interests, list):
+            data['customer_interests'] = interests
+
+        client = Client(
+            email=email,
+            customer_type=str(row.get('customer_type') or 'individual').strip(),
+            status=str(row.get('status') or Client.Status.LEAD).strip().lower(),
+            tenant=self.tenant,
+            **data
+        )
+        # bulk_create skips save(), which fills these in
+        client.normalize_identity()
+        if client.phone_normalized in self.existing_phones:
+            raise ValidationError(f'Customer with phone {client.phone} already exists')
+        # Field-level validation (status choices included); uniqueness was checked against the preloaded set
+        client.full_clean(exclude=['tenant', 'assigned_to', 'tags'], validate_unique=False, validate_constraints=False)
+
+        return client, self.resolve_tags(row.get('tags'))
+
+    def resolve_tags(self, value):
+        """Map a tags cell (comma-separated string or exported list) to tag ids, skipping unknown tags"""
+        if not value:
+            return set()
+        if isinstance(value, str):
+            keys = [tag.strip() for tag in value.split(',')]
+        elif isinstance(value, list):
+            keys = []
+            for tag in value:
+                if isinstance(tag, dict):
+                    keys.append(str(tag.get('slug') or tag.get('name') or ''))
+                else:
+                    keys.append(str(tag))
+        else:
+            return set()
+
+        tag_ids = set()
+        for key in keys:
+            key = key.strip()
+            tag_id = self.tag_ids.get(key) or self.tag_ids.get(key.lower())
+            if tag_id:
+                tag_ids.add(tag_id)
+        return tag_ids
+
+    @staticmethod
+    def format_error(error):
+        if hasattr(error, 'message_dict'):
+            return '; '.join(f'{field}: {", ".join(messages)}' for field, messages in error.message_dict.items())
+        return ', '.join(error.messages)
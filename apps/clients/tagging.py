@@ -0,0 +1,447 @@
+"""
+Rule-based auto-tagging for clients.
+
+Rules are declared as data in TAG_RULES and compiled once into a
+TaggingEngine. The engine evaluates plain field values (a dict), so the same
+rules serve single saves, where only rules whose inputs changed are
+re-evaluated, and bulk re-tagging of a whole tenant straight from
+values_list() rows without building model instances.
+"""
+from abc import ABC, abstractmethod
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Client, CustomerTag
+
+
+TAG_ID_CACHE_KEY = 'clients:tag-slug-map'
+TAG_ID_CACHE_TIMEOUT = 300
+
+
+def _normalize(value):
+    return str(value).strip().lower() if value is not None else ''
+
+
+class Rule(ABC):
+    """A tagging rule: reads `fields` and returns the tag slugs that apply"""
+    fields = ()
+
+    @abstractmethod
+    def evaluate(self, values, today):
+        """The slugs that apply to `values` ({field: value}) on `today`"""
+
+    @property
+    @abstractmethod
+    def slugs(self):
+        """Every slug this rule can produce"""
+
+
+class MappingRule(Rule):
+    """Maps the normalized (trimmed, lower-cased) value of a field to a slug"""
+
+    def __init__(self, field, mapping):
+        self.fields = (field,)
+        self.field = field
+        self.mapping = mapping
+
+    def evaluate(self, values, today):
+        slug = self.mapping.get(_normalize(values.get(self.field)))
+        return {slug} if slug else set()
+
+    @property
+    def slugs(self):
+        return set(self.mapping.values())
+
+
+class PresenceRule(Rule):
+    """Adds a slug whenever the field has a value"""
+
+    def __init__(self, field, slug):
+        self.fields = (field,)
+        self.field = field
+        self.slug = slug
+
+    def evaluate(self, values, today):
+        return {self.slug} if values.get(self.field) else set()
+
+    @property
+    def slugs(self):
+        return {self.slug}
+
+
+class InterestRule(Rule):
+    """Product interest tags from customer_interests, plus a tag for mixed interests"""
+
+    def __init__(self, field, mapping, mixed_slug):
+        self.fields = (field,)
+        self.field = field
+        self.mapping = mapping
+        self.mixed_slug = mixed_slug
+
+    def evaluate(self, values, today):
+        interests = values.get(self.field) or []
+        if not isinstance(interests, list):
+            return set()
+        result = set()
+        for interest in interests:
+            if isinstance(interest, dict):
+                category = _normalize(interest.get('mainCategory', ''))
+            else:
+                category = _normalize(interest)
+            slug = self.mapping.get(category)
+            if slug:
+                result.add(slug)
+        if len(interests) > 1:
+            result.add(self.mixed_slug)
+        return result
+
+    @property
+    def slugs(self):
+        return set(self.mapping.values()) | {self.mixed_slug}
+
+
+class ThresholdRule(Rule):
+    """Picks the first slug whose threshold the numeric field exceeds"""
+
+    def __init__(self, field, thresholds):
+        self.fields = (field,)
+        self.field = field
+        self.thresholds = thresholds  # [(minimum, slug), ...], highest first
+
+    def evaluate(self, values, today):
+        value = values.get(self.field)
+        if not value:
+            return set()
+        for minimum, slug in self.thresholds:
+            if value > minimum:
+                return {slug}
+        return set()
+
+    @property
+    def slugs(self):
+        return {slug for _, slug in self.thresholds}
+
+
+def age_on(born, today):
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def years_before(today, years):
+    """Same day `years` years earlier; Feb 29 falls back to Feb 28 in non-leap years"""
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:
+        return today.replace(year=today.year - years, day=28)
+
+
+class AgeBandRule(Rule):
+    """Demographic tag from the age computed off a date field"""
+    time_dependent = True
+
+    def __init__(self, field, bands):
+        self.fields = (field,)
+        self.field = field
+        self.bands = bands  # [(min_age, max_age or None, slug), ...]
+
+    def evaluate(self, values, today):
+        born = values.get(self.field)
+        if not born:
+            return set()
+        age = age_on(born, today)
+        for min_age, max_age, slug in self.bands:
+            if age >= min_age and (max_age is None or age <= max_age):
+                return {slug}
+        return set()
+
+    @property
+    def slugs(self):
+        return {slug for _, _, slug in self.bands}
+
+    def conditions(self, today):
+        """
+        slug -> Q matching the same clients as evaluate(), as plain date ranges:
+        age >= n exactly when the birth date is on or before `today` n years ago.
+        """
+        conditions = {}
+        for min_age, max_age, slug in self.bands:
+            condition = Q(**{f'{self.field}__lte': years_before(today, min_age)})
+            if max_age is not None:
+                condition &= Q(**{f'{self.field}__gt': years_before(today, max_age + 1)})
+            conditions[slug] = condition
+        return conditions
+
+
+class DateWindowRule(Rule):
+    """Event tag when the day of a yearly date falls within `days` of today in the same month"""
+    time_dependent = True
+
+    def __init__(self, field, slug, days=7):
+        self.fields = (field,)
+        self.field = field
+        self.slug = slug
+        self.days = days
+
+    def evaluate(self, values, today):
+        value = values.get(self.field)
+        if value and value.month == today.month and abs(value.day - today.day) <= self.days:
+            return {self.slug}
+        return set()
+
+    @property
+    def slugs(self):
+        return {self.slug}
+
+    def conditions(self, today):
+        """slug -> Q matching the same clients as evaluate()"""
+        return {self.slug: Q(**{
+            f'{self.field}__month': today.month,
+            f'{self.field}__day__gte': today.day - self.days,
+            f'{self.field}__day__lte': today.day + self.days,
+        })}
+
+
+TAG_RULES = [
+    # 1. Purchase Intent / Visit Reason
+    MappingRule('reason_for_visit', {
+        'wedding': 'wedding-buyer',
+        'gifting': 'gifting',
+        'self-purchase': 'self-purchase',
+        'repair': 'repair-customer',
+        'browse': 'browsing-prospect',
+    }),
+    # 2. Product Interest
+    InterestRule('customer_interests', {
+        'diamond': 'diamond-interested',
+        'gold': 'gold-interested',
+        'polki': 'polki-interested',
+    }, mixed_slug='mixed-buyer'),
+    # 3. Revenue-Based Segmentation (only active once Client has a total_spend field)
+    ThresholdRule('total_spend', [
+        (100000, 'high-value'),
+        (30000, 'mid-value'),
+    ]),
+    # 4. Demographic + Age
+    AgeBandRule('date_of_birth', [
+        (18, 25, 'young-adult'),
+        (26, 35, 'millennial-shopper'),
+        (36, 45, 'middle-age-shopper'),
+        (46, None, 'senior-shopper'),
+    ]),
+    # 5. Lead Source
+    MappingRule('lead_source', {
+        'instagram': 'social-lead',
+        'facebook': 'facebook-lead',
+        'google': 'google-lead',
+        'referral': 'referral',
+        'walk-in': 'walk-in',
+        'other': 'other-source',
+    }),
+    # 6. CRM Status
+    MappingRule('status', {
+        'customer': 'converted-customer',
+        'prospect': 'interested-lead',
+        'inactive': 'not-interested',
+    }),
+    PresenceRule('next_follow_up', 'needs-follow-up'),
+    # 7. Community / Relationship
+    MappingRule('community', {
+        'hindu': 'hindu',
+        'muslim': 'muslim',
+        'jain': 'jain',
+        'parsi': 'parsi',
+        'buddhist': 'buddhist',
+        'cross community': 'cross-community',
+    }),
+    # 8. Event-Driven
+    DateWindowRule('date_of_birth', 'birthday-week'),
+    DateWindowRule('anniversary_date', 'anniversary-week'),
+]
+
+
+def get_tag_ids():
+    """slug -> id map of active tags, cached and cleared whenever a tag changes"""
+    tag_ids = cache.get(TAG_ID_CACHE_KEY)
+    if tag_ids is None:
+        tag_ids = dict(CustomerTag.objects.filter(is_active=True).values_list('slug', 'id'))
+        cache.set(TAG_ID_CACHE_KEY, tag_ids, TAG_ID_CACHE_TIMEOUT)
+    return tag_ids
+
+
+def clear_tag_ids():
+    cache.delete(TAG_ID_CACHE_KEY)
+
+
+class TaggingEngine:
+    """
+    Compiled set of tagging rules.
+
+    Rules reading fields the Client model does not have are dropped at
+    compile time, so they cost nothing at evaluation time.
+    """
+
+    BATCH_SIZE = 2000
+
+    def __init__(self, rules=None):
+        field_names = {field.name for field in Client._meta.concrete_fields}
+        self.rules = [
+            rule for rule in (rules if rules is not None else TAG_RULES)
+            if all(field in field_names for field in rule.fields)
+        ]
+        self.fields = sorted({field for rule in self.rules for field in rule.fields})
+        self.slugs = set().union(*(rule.slugs for rule in self.rules)) if self.rules else set()
+        self.time_dependent_rules = [rule for rule in self.rules if getattr(rule, 'time_dependent', False)]
+
+    def evaluate(self, values, today=None, rules=None):
+        """Return the slugs produced by `rules` (all rules by default) for a dict of field values"""
+        today = today or date.today()
+        slugs = set()
+        for rule in (self.rules if rules is None else rules):
+            slugs |= rule.evaluate(values, today)
+        return slugs
+
+    def rules_for(self, changed_fields):
+        """Rules that read at least one of the changed fields"""
+        return [rule for rule in self.rules if any(field in changed_fields for field in rule.fields)]
+
+    def values_of(self, instance):
+        return {field: getattr(instance, field) for field in self.fields}
+
+    def apply(self, instance, created=False):
+        """
+        Re-tag a saved client.
+
+        New clients get every rule. For updates only the rules whose input
+        fields changed since the instance was loaded are re-evaluated; tags
+        those rules produced for the old values but no longer produce are
+        removed.
+        """
+        retag_all = created or getattr(instance, '_retag_all', False)
+        instance._retag_all = False
+        changed = None if retag_all else instance.get_changed_fields()
+        if changed is None:
+            rules = self.rules
+            old_slugs = set()
+        else:
+            rules = self.rules_for(changed)
+            if not rules:
+                return
+            loaded = instance._loaded_values
+            old_values = {field: loaded.get(field) for field in self.fields}
+            old_slugs = self.evaluate(old_values, rules=rules)
+
+        new_slugs = self.evaluate(self.values_of(instance), rules=rules)
+        tag_ids = get_tag_ids()
+        to_add = [tag_ids[slug] for slug in new_slugs if slug in tag_ids]
+        to_remove = [tag_ids[slug] for slug in old_slugs - new_slugs if slug in tag_ids]
+        if to_remove:
+            instance.tags.remove(*to_remove)
+        if to_add:
+            instance.tags.add(*to_add)
+
+    def tag_clients(self, clients):
+        """Add auto tags to freshly created clients with one bulk insert"""
+        tag_ids = get_tag_ids()
+        through = Client.tags.through
+        links = [
+            through(client_id=client.pk, customertag_id=tag_ids[slug])
+            for client in clients
+            for slug in self.evaluate(self.values_of(client))
+            if slug in tag_ids
+        ]
+        through.objects.bulk_create(links, batch_size=self.BATCH_SIZE, ignore_conflicts=True)
+        return len(links)
+
+    def retag_queryset(self, queryset, prune=False, today=None):
+        """
+        Re-tag every client in `queryset` in a few statements.
+
+        Rule inputs are streamed with values_list(), evaluated in memory and
+        missing links are inserted in batches. With prune=True, auto-managed
+        tags the rules no longer produce are deleted as well.
+        """
+        today = today or date.today()
+        tag_ids = get_tag_ids()
+        managed_ids = {tag_ids[slug] for slug in self.slugs if slug in tag_ids}
+        through = Client.tags.through
+
+        existing = {}
+        for client_id, tag_id in through.objects.filter(
+            client__in=queryset.values('pk'), customertag_id__in=managed_ids
+        ).values_list('client_id', 'customertag_id').iterator(chunk_size=self.BATCH_SIZE):
+            existing.setdefault(client_id, set()).add(tag_id)
+
+        to_add = []
+        to_remove = []
+        for row in queryset.values_list('pk', *self.fields).iterator(chunk_size=self.BATCH_SIZE):
+            client_id, values = row[0], dict(zip(self.fields, row[1:]))
+            wanted = {tag_ids[slug] for slug in self.evaluate(values, today) if slug in tag_ids}
+            current = existing.get(client_id, set())
+            to_add.extend(through(client_id=client_id, customertag_id=tag_id) for tag_id in wanted - current)
+            if prune:
+                to_remove.extend((client_id, tag_id) for tag_id in current - wanted)
+
+        through.objects.bulk_create(to_add, batch_size=self.BATCH_SIZE, ignore_conflicts=True)
+        removed = delete_links(to_remove, self.BATCH_SIZE)
+        return {'added': len(to_add), 'removed': removed}
+
+    def retag_tenant(self, tenant, prune=False):
+        return self.retag_queryset(Client.objects.filter(tenant=tenant, is_deleted=False), prune=prune)
+
+    def refresh_time_dependent(self, tenant=None, today=None):
+        """
+        Recompute birthday/anniversary-week and age-band tags in SQL.
+
+        For each time-dependent tag the matching clients are selected with
+        date filters, missing links are inserted from an id-only query and
+        stale links are removed with a single DELETE. No model instances
+        are loaded, so this scales to every tenant at once.
+        """
+        today = today or date.today()
+        tag_ids = get_tag_ids()
+        through = Client.tags.through
+        clients = Client.objects.all()
+        if tenant is not None:
+            clients = clients.filter(tenant=tenant)
+
+        result = {}
+        for rule in self.time_dependent_rules:
+            for slug, condition in rule.conditions(today).items():
+                tag_id = tag_ids.get(slug)
+                if not tag_id:
+                    continue
+                wanted = clients.filter(condition, is_deleted=False)
+
+                missing = wanted.exclude(tags=tag_id).values_list('pk', flat=True)
+                links = [
+                    through(client_id=client_id, customertag_id=tag_id)
+                    for client_id in missing.iterator(chunk_size=self.BATCH_SIZE)
+                ]
+                through.objects.bulk_create(links, batch_size=self.BATCH_SIZE, ignore_conflicts=True)
+
+                stale = through.objects.filter(customertag_id=tag_id).exclude(client_id__in=wanted.values('pk'))
+                if tenant is not None:
+                    stale = stale.filter(client__tenant=tenant)
+                removed = stale.delete()[0]
+
+                result[slug] = {'added': len(links), 'removed': removed}
+        return result
+
+
+def delete_links(pairs, batch_size=2000):
+    """Delete (client_id, tag_id) pairs from the tags through table, one DELETE per tag and batch"""
+    through = Client.tags.through
+    by_tag = {}
+    for client_id, tag_id in pairs:
+        by_tag.setdefault(tag_id, []).append(client_id)
+    removed = 0
+    for tag_id, client_ids in by_tag.items():
+        for start in range(0, len(client_ids), batch_size):
+            removed += through.objects.filter(
+                customertag_id=tag_id, client_id__in=client_ids[start:start + batch_size]
+            ).delete()[0]
+    return removed
+
+
+tagging_engine = TaggingEngine()
@@ -0,0 +1,141 @@
+import codecs
+import csv
+import json
+import logging
+import tempfile
+
+from celery import shared_task
+from django.core.files import File
+from django.utils import timezone
+
+from .models import Client, ImportExportJob
+from .serializers import ClientSerializer
+from .services import ClientExportService, ClientImportService
+from .tagging import tagging_engine
+
+logger = logging.getLogger(__name__)
+
+
+def _update_job(job_id, **fields):
+    """Write job progress with a single UPDATE so the request path can poll it"""
+    ImportExportJob.objects.filter(pk=job_id).update(**fields)
+
+
+def _fail_job(job_id, error):
+    logger.exception('Client import/export job %s failed', job_id)
+    _update_job(
+        job_id,
+        status=ImportExportJob.Status.FAILED,
+        error_message=str(error),
+        finished_at=timezone.now(),
+    )
+
+
+def _read_import_rows(job, source):
+    """Return (rows, number of the first row) for the uploaded file"""
+    if job.job_type == ImportExportJob.JobType.IMPORT_CSV:
+        return csv.DictReader(codecs.iterdecode(source, 'utf-8-sig')), 2
+    if source.name.endswith('.ndjson'):
+        lines = codecs.iterdecode(source, 'utf-8-sig')
+        return (json.loads(line) for line in lines if line.strip()), 1
+    rows = json.loads(source.read().decode('utf-8-sig'))
+    if not isinstance(rows, list):
+        raise ValueError('JSON file should contain an array of customer objects')
+    return rows, 1
+
+
+@shared_task
+def run_import_job(job_id):
+    """Import the job's uploaded file chunk by chunk, reporting progress on the job"""
+    job = ImportExportJob.objects.select_related('tenant', 'created_by').get(pk=job_id)
+    _update_job(job.pk, status=ImportExportJob.Status.RUNNING, started_at=timezone.now())
+
+    try:
+        importer = ClientImportService(tenant=job.tenant, user=job.created_by)
+
+        def on_progress(processed_rows):
+            _update_job(job.pk, processed_rows=processed_rows, imported_count=importer.imported_count)
+
+        with job.source_file.open('rb') as source:
+            rows, start = _read_import_rows(job, source)
+            result = importer.run(rows, start=start, atomic=False, on_progress=on_progress)
+    except Exception as e:
+        _fail_job(job.pk, e)
+        return None
+
+    _update_job(
+        job.pk,
+        status=ImportExportJob.Status.COMPLETED,
+        imported_count=result['imported_count'],
+        errors=result['errors'],
+        finished_at=timezone.now(),
+    )
+    return result['imported_count']
+
+
+@shared_task
+def run_export_job(job_id):
+    """Write the tenant's clients to a file in storage, reporting progress on the job"""
+    job = ImportExportJob.objects.select_related('tenant').get(pk=job_id)
+    queryset = Client.objects.filter(tenant=job.tenant, is_deleted=False)
+    _update_job(
+        job.pk,
+        status=ImportExportJob.Status.RUNNING,
+        started_at=timezone.now(),
+        total_rows=queryset.count(),
+    )
+
+    def on_progress(processed_rows):
+        _update_job(job.pk, processed_rows=processed_rows)
+
+    try:
+        if job.job_type == ImportExportJob.JobType.EXPORT_CSV:
+            stream = ClientExportService.stream_csv(queryset, on_progress=on_progress)
+            extension = 'csv'
+        elif job.options.get('ndjson'):
+            stream = ClientExportService.stream_ndjson(queryset, ClientSerializer, on_progress=on_progress)
+            extension = 'ndjson'
+        else:
+            stream = ClientExportService.stream_json(queryset, ClientSerializer, on_progress=on_progress)
+            extension = 'json'
+
+        with tempfile.TemporaryFile() as tmp:
+            for piece in stream:
+                tmp.write(piece.encode('utf-8'))
+            tmp.seek(0)
+            filename = f'customers_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+            job.result_file.save(filename, File(tmp, name=filename), save=False)
+    except Exception as e:
+        _fail_job(job.pk, e)
+        return None
+
+    _update_job(
+        job.pk,
+        status=ImportExportJob.Status.COMPLETED,
+        result_file=job.result_file.name,
+        finished_at=timezone.now(),
+    )
+    return job.result_file.name
+
+
+@shared_task
+def refresh_time_dependent_tags():
+    """Nightly: move birthday/anniversary-week and age-band tags to the clients they apply to today"""
+    return tagging_engine.refresh_time_dependent()
+
+
+@shared_task
+def maintain_audit_logs():
+    """Nightly: create upcoming audit log partitions and archive months past retention"""
+    from .audit_archive import archive_expired, ensure_partitions
+
+    created = ensure_partitions()
+    archived = archive_expired()
+    return {'partitions_created': created, 'months_archived': [str(a.period_start) for a in archived]}
+
+
+def enqueue_job(job):
+    """Dispatch the job to the matching Celery task"""
+    if job.is_import:
+        return run_import_job.delay(job.pk)
+    return run_export_job.delay(job.pk)
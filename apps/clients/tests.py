@@ -1,3 +1,490 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from . import audit, tasks
+from .identity import dedupe, duplicate_pairs, find_existing, merge, normalize_email, normalize_phone
+from .models import AuditLog, Client, CustomerTag, ImportExportJob, Purchase
+from .serializers import ClientSerializer
+from .tagging import MappingRule, Rule, TaggingEngine, tagging_engine
+from .services import ClientExportService, ClientImportService
+
+
+def drop_identity_constraints():
+    """
+    Live duplicates can't be written once the unique constraints exist; drop
+    them for this test (rolled back with it) to stand in for a database
+    that predates migration 0019, which is what dedupe() cleans up.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('DROP INDEX client_tenant_email_uniq')
+        cursor.execute('DROP INDEX client_tenant_phone_uniq')
+
+
+class NormalizationTests(TestCase):
+    def test_phone_formats_of_one_number_match(self):
+        for value in ['+91 98765 43210', '98765 43210', '098765-43210', '919876543210', '0091 9876543210']:
+            self.assertEqual(normalize_phone(value, '91'), '+919876543210', value)
+
+    def test_international_number_keeps_its_country_code(self):
+        self.assertEqual(normalize_phone('+1 (415) 555-2671', '91'), '+14155552671')
+
+    @override_settings(PHONE_DEFAULT_COUNTRY_CODE='44')
+    def test_national_numbers_use_the_default_country_code(self):
+        self.assertEqual(normalize_phone('020 7946 0958'), '+442079460958')
+
+    def test_unusable_phone_values(self):
+        for value in [None, '', '   ', 'n/a', '123']:
+            self.assertIsNone(normalize_phone(value, '91'), value)
+
+    def test_email_is_trimmed_and_lowercased(self):
+        self.assertEqual(normalize_email('  Asha.Rao@Example.COM '), 'asha.rao@example.com')
+        self.assertIsNone(normalize_email('  '))
+
+
+class IdentityTestCase(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.other_tenant = Tenant.objects.create(name='Silver House', slug='silver-house')
+
+    def make_client(self, email, phone=None, tenant=None, **fields):
+        return Client.objects.create(
+            tenant=tenant or self.tenant, email=email, phone=phone, first_name='Asha', **fields
+        )
+
+
+class ClientIdentityTests(IdentityTestCase):
+    def test_save_stores_normalized_identity(self):
+        client = self.make_client('Asha@Example.com', '98765 43210')
+        client.refresh_from_db()
+        self.assertEqual(client.email_normalized, 'asha@example.com')
+        self.assertEqual(client.phone_normalized, '+919876543210')
+
+    def test_save_with_update_fields_refreshes_identity(self):
+        client = self.make_client('asha@example.com', '9876543210')
+        client.phone = '+91 91234 56789'
+        client.save(update_fields=['phone'])
+        client.refresh_from_db()
+        self.assertEqual(client.phone_normalized, '+919123456789')
+
+    def test_find_existing_matches_across_formats_within_the_tenant(self):
+        client = self.make_client('asha@example.com', '+91 98765 43210')
+        self.make_client('ravi@example.com', '9123456789', tenant=self.other_tenant)
+
+        self.assertEqual(find_existing(self.tenant, phone='098765-43210'), client)
+        self.assertEqual(find_existing(self.tenant, email='ASHA@example.com '), client)
+        self.assertIsNone(find_existing(self.tenant, phone='9123456789'))
+        self.assertIsNone(find_existing(self.tenant, email='asha@example.com', exclude=client))
+
+    def test_find_existing_ignores_deleted_clients(self):
+        self.make_client('asha@example.com', '9876543210', is_deleted=True)
+        self.assertIsNone(find_existing(self.tenant, phone='9876543210'))
+
+
+class MergeTests(IdentityTestCase):
+    def test_merge_moves_related_rows_and_tags_and_keeps_audit_history(self):
+        keeper = self.make_client('asha@example.com', '9876543210')
+        duplicate = self.make_client('asha.rao@example.com', '9123456789')
+        purchase = Purchase.objects.create(
+            client=duplicate, product_name='Ring', amount=1000, purchase_date=date(2026, 1, 5)
+        )
+        tag = CustomerTag.objects.create(name='Wedding', slug='wedding')
+        duplicate.tags.add(tag)
+        entry = AuditLog.objects.create(client=duplicate, action='update', before={}, after={})
+
+        merge(Client, {duplicate.pk: keeper.pk})
+
+        duplicate.refresh_from_db()
+        self.assertTrue(duplicate.is_deleted)
+        self.assertEqual(duplicate.merged_into_id, keeper.pk)
+        purchase.refresh_from_db()
+        self.assertEqual(purchase.client_id, keeper.pk)
+        self.assertEqual(list(keeper.tags.all()), [tag])
+        entry.refresh_from_db()
+        self.assertEqual(entry.client_id, duplicate.pk)
+
+    def test_dedupe_merges_email_and_phone_clusters_into_the_oldest_client(self):
+        drop_identity_constraints()
+        oldest = self.make_client('asha@example.com', '9876543210')
+        same_email = self.make_client('ASHA@example.com', '9000000001')
+        same_phone = self.make_client('other@example.com', '+91 98765 43210')
+        unrelated = self.make_client('ravi@example.com', '9123456789')
+        elsewhere = self.make_client('asha@example.com', '9876543210', tenant=self.other_tenant)
+
+        merged = dedupe(Client.objects.filter(tenant=self.tenant))
+
+        self.assertEqual(merged, {same_email.pk: oldest.pk, same_phone.pk: oldest.pk})
+        live = set(Client.objects.filter(is_deleted=False).values_list('pk', flat=True))
+        self.assertEqual(live, {oldest.pk, unrelated.pk, elsewhere.pk})
+
+    def test_duplicate_pairs_skips_deleted_clients(self):
+        drop_identity_constraints()
+        self.make_client('asha@example.com')
+        self.make_client('Asha@example.com', is_deleted=True)
+        self.assertEqual(duplicate_pairs(Client.objects.all(), 'email_normalized'), {})
+
+
+class ImportDuplicateTests(IdentityTestCase):
+    def test_import_rejects_existing_and_repeated_identities(self):
+        self.make_client('asha@example.com', '9876543210')
+        rows = [
+            {'email': 'ASHA@example.com', 'first_name': 'Asha'},
+            {'email': 'new@example.com', 'first_name': 'Asha', 'phone': '+91 98765 43210'},
+            {'email': 'ravi@example.com', 'first_name': 'Ravi', 'phone': '91234 56789'},
+            {'email': 'ravi.k@example.com', 'first_name': 'Ravi', 'phone': '09123456789'},
+            {'email': 'Ravi@Example.com', 'first_name': 'Ravi'},
+        ]
+
+        result = ClientImportService(self.tenant).run(rows)
+
+        self.assertEqual(result['imported_count'], 1)
+        self.assertEqual(len(result['errors']), 4)
+        self.assertTrue(result['errors'][0].startswith('Row 1: Customer with email'))
+        self.assertTrue(result['errors'][1].startswith('Row 2: Customer with phone'))
+        self.assertTrue(result['errors'][2].startswith('Row 4: Customer with phone'))
+        self.assertTrue(result['errors'][3].startswith('Row 5: Customer with email'))
+        imported = Client.objects.get(email='ravi@example.com')
+        self.assertEqual(imported.phone_normalized, '+919123456789')
+
+
+class BatchedImportTests(IdentityTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        CustomerTag.objects.create(name='VIP', slug='vip')
+        CustomerTag.objects.create(name='Referral', slug='referral')
+
+    def test_chunks_write_clients_tags_and_audit_logs_in_bulk(self):
+        rows = [
+            {'email': f'client{n}@example.com', 'first_name': f'Client {n}', 'tags': 'VIP', 'lead_source': 'referral'}
+            for n in range(5)
+        ]
+        service = ClientImportService(self.tenant, chunk_size=2)
+
+        # Four inserts per chunk whatever its size (clients, tag links, auto tags,
+        # audit logs), one auto tag lookup and the transaction's savepoint pair
+        with self.assertNumQueries(3 * 4 + 1 + 2):
+            result = service.run(rows)
+
+        self.assertEqual(result['imported_count'], 5)
+        imported = Client.objects.filter(tenant=self.tenant)
+        self.assertEqual(imported.count(), 5)
+        self.assertEqual(Client.tags.through.objects.filter(client__in=imported).count(), 10)
+        self.assertEqual(AuditLog.objects.filter(client__in=imported, action='create').count(), 5)
+
+    def test_status_is_imported_and_validated(self):
+        rows = [
+            {'email': 'asha@example.com', 'first_name': 'Asha', 'status': 'Customer'},
+            {'email': 'ravi@example.com', 'first_name': 'Ravi'},
+            {'email': 'meera@example.com', 'first_name': 'Meera', 'status': 'vip'},
+        ]
+
+        result = ClientImportService(self.tenant).run(rows)
+
+        self.assertEqual(result['imported_count'], 2)
+        self.assertEqual(len(result['errors']), 1)
+        self.assertTrue(result['errors'][0].startswith('Row 3: status'), result['errors'])
+        self.assertEqual(
+            dict(Client.objects.values_list('email', 'status')),
+            {'asha@example.com': 'customer', 'ravi@example.com': 'lead'},
+        )
+
+
+class SerializerIdentityTests(IdentityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='sales', password='x', role='inhouse_sales', tenant=self.tenant
+        )
+        self.context = {'request': SimpleNamespace(user=self.user)}
+
+    def test_create_rejects_identity_of_another_client(self):
+        existing = self.make_client('asha@example.com', '9876543210')
+        serializer = ClientSerializer(
+            data={'email': 'Asha@Example.com', 'phone': '+91 98765 43210', 'first_name': 'Asha'},
+            context=self.context,
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn(f'id {existing.pk}', str(serializer.errors['email']))
+        self.assertIn(f'id {existing.pk}', str(serializer.errors['phone']))
+
+    def test_update_may_keep_its_own_identity(self):
+        client = self.make_client('asha@example.com', '9876543210')
+        serializer = ClientSerializer(
+            client, data={'phone': '+91 98765 43210'}, partial=True, context=self.context
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class RestoreConflictTests(IdentityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='manager', password='x', role='manager', tenant=self.tenant
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_restore_is_refused_while_a_live_client_holds_the_identity(self):
+        deleted = self.make_client('asha@example.com', '9876543210', is_deleted=True)
+        live = self.make_client('ASHA@example.com', '9000000001')
+
+        response = self.api.post(f'/api/clients/clients/{deleted.pk}/restore/')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['existing_client'], live.pk)
+        deleted.refresh_from_db()
+        self.assertTrue(deleted.is_deleted)
+
+    def test_bulk_restore_skips_conflicting_clients(self):
+        conflicting = self.make_client('asha@example.com', '9876543210', is_deleted=True)
+        restorable = self.make_client('ravi@example.com', '9123456789', is_deleted=True)
+        self.make_client('other@example.com', '+91 98765 43210')
+
+        response = self.api.post(
+            '/api/clients/clients/bulk-restore/', {'ids': [conflicting.pk, restorable.pk]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['restored_count'], 1)
+        self.assertEqual(response.data['conflicting_ids'], [conflicting.pk])
+
+
+class StreamingExportTests(IdentityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api = APIClient()
+        self.api.force_authenticate(
+            User.objects.create_user(username='owner', password='x', role='business_admin', tenant=self.tenant)
+        )
+        vip = CustomerTag.objects.create(name='VIP', slug='vip')
+        for n in range(5):
+            self.make_client(f'client{n}@example.com', last_name=f'{n}').tags.add(vip)
+        self.make_client('other@example.com', tenant=self.other_tenant)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_streams_the_tenants_clients_with_their_tags(self):
+        rows = list(csv.DictReader(io.StringIO(self.read(self.api.get('/api/clients/clients/export/csv/')))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual({row['tags'] for row in rows}, {'VIP'})
+
+    def test_json_and_ndjson_stream_the_same_clients(self):
+        array = json.loads(self.read(self.api.get('/api/clients/clients/export/json/')))
+        lines = self.read(self.api.get('/api/clients/clients/export/json/', {'ndjson': 'true'})).splitlines()
+        self.assertEqual(len(array), 5)
+        self.assertEqual([json.loads(line)['email'] for line in lines], [client['email'] for client in array])
+
+    def test_tags_are_fetched_once_per_chunk(self):
+        queryset = Client.objects.filter(tenant=self.tenant)
+        # One query for the clients, then one tag prefetch per chunk of two
+        with self.assertNumQueries(1 + 3):
+            lines = list(ClientExportService.stream_csv(queryset, chunk_size=2))
+        self.assertEqual(len(lines), 6)
+
+
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+# Tasks run inline once the submitting request commits
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, IMPORT_EXPORT_JOBS_ENABLED=True, STORAGES=IN_MEMORY_STORAGES)
+class ImportExportJobTests(IdentityTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(
+            username='owner', password='x', role='business_admin', tenant=self.tenant
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+        self.statuses = []
+        update_job = tasks._update_job
+
+        def record(job_id, **fields):
+            if 'status' in fields:
+                self.statuses.append(fields['status'])
+            update_job(job_id, **fields)
+
+        patcher = mock.patch.object(tasks, '_update_job', side_effect=record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, path, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(path, data or {}, format='multipart')
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data['status'], ImportExportJob.Status.PENDING)
+        return ImportExportJob.objects.get(pk=response.data['id'])
+
+    def test_export_job_writes_the_clients_to_storage(self):
+        self.make_client('asha@example.com', '9876543210')
+        self.make_client('ravi@example.com', tenant=self.other_tenant)
+
+        job = self.submit('/api/clients/clients/export/csv/')
+
+        self.assertEqual(self.statuses, ['running', 'completed'])
+        self.assertEqual(job.status, ImportExportJob.Status.COMPLETED)
+        self.assertEqual((job.total_rows, job.processed_rows), (1, 1))
+        with job.result_file.open('rb') as artifact:
+            rows = list(csv.DictReader(io.StringIO(artifact.read().decode())))
+        self.assertEqual([row['email'] for row in rows], ['asha@example.com'])
+
+        response = self.api.get(f'/api/clients/client-jobs/{job.pk}/')
+        self.assertEqual(response.data['progress'], 100)
+        self.assertTrue(response.data['download_url'].endswith(f'/client-jobs/{job.pk}/download/'))
+
+    def test_ndjson_export_job(self):
+        self.make_client('asha@example.com')
+        job = self.submit('/api/clients/clients/export/json/?ndjson=true')
+        with job.result_file.open('rb') as artifact:
+            lines = artifact.read().decode().splitlines()
+        self.assertTrue(job.result_file.name.endswith('.ndjson'))
+        self.assertEqual([json.loads(line)['email'] for line in lines], ['asha@example.com'])
+
+    def test_import_job_reports_progress_and_row_errors(self):
+        self.make_client('asha@example.com')
+        upload = SimpleUploadedFile(
+            'clients.csv',
+            b'email,first_name,phone\nasha@example.com,Asha,\nravi@example.com,Ravi,9123456789\n',
+            content_type='text/csv',
+        )
+
+        job = self.submit('/api/clients/clients/import/csv/?async=true', {'file': upload})
+
+        self.assertEqual(self.statuses, ['running', 'completed'])
+        self.assertEqual((job.processed_rows, job.imported_count), (2, 1))
+        self.assertEqual(len(job.errors), 1)
+        self.assertTrue(job.errors[0].startswith('Row 2: Customer with email'))
+        self.assertTrue(Client.objects.filter(tenant=self.tenant, email='ravi@example.com').exists())
+
+    def test_unreadable_import_fails_the_job(self):
+        upload = SimpleUploadedFile('clients.json', b'{"email": "asha@example.com"}', content_type='application/json')
+
+        job = self.submit('/api/clients/clients/import/json/?async=true', {'file': upload})
+
+        self.assertEqual(self.statuses, ['running', 'failed'])
+        self.assertEqual(job.status, ImportExportJob.Status.FAILED)
+        self.assertIn('array of customer objects', job.error_message)
+
+    def test_get_cannot_submit_an_export_job(self):
+        response = self.api.get('/api/clients/clients/export/csv/?async=true')
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(ImportExportJob.objects.exists())
+
+    @override_settings(IMPORT_EXPORT_JOBS_ENABLED=False)
+    def test_jobs_are_refused_without_shared_storage(self):
+        response = self.api.post('/api/clients/clients/export/csv/')
+        self.assertEqual(response.status_code, 503)
+
+
+class TaggingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        for slug in ('wedding-buyer', 'gifting', 'referral', 'vip'):
+            CustomerTag.objects.create(name=slug, slug=slug)
+
+    def slugs(self, client):
+        return set(client.tags.values_list('slug', flat=True))
+
+    def test_rules_must_implement_evaluate_and_slugs(self):
+        class Incomplete(Rule):
+            def evaluate(self, values, today):
+                return set()
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_engine_drops_rules_over_missing_fields(self):
+        engine = TaggingEngine([MappingRule('lead_source', {'referral': 'referral'}), MappingRule('no_such_field', {})])
+        self.assertEqual(engine.fields, ['lead_source'])
+        self.assertEqual(engine.evaluate({'lead_source': ' Referral '}), {'referral'})
+
+    def test_save_retags_only_rules_whose_fields_changed(self):
+        client = Client.objects.create(
+            tenant=self.tenant, email='asha@example.com', reason_for_visit='wedding', lead_source='referral'
+        )
+        client.tags.add(CustomerTag.objects.get(slug='vip'))
+        self.assertEqual(self.slugs(client), {'wedding-buyer', 'referral', 'vip'})
+
+        client = Client.objects.get(pk=client.pk)
+        client.reason_for_visit = 'gifting'
+        client.save()
+
+        self.assertEqual(self.slugs(client), {'gifting', 'referral', 'vip'})
+
+    def test_retag_queryset_adds_missing_tags_and_prunes_stale_ones(self):
+        client = Client.objects.create(tenant=self.tenant, email='asha@example.com', lead_source='referral')
+        Client.objects.filter(pk=client.pk).update(lead_source=None, reason_for_visit='wedding')
+        client.tags.add(CustomerTag.objects.get(slug='vip'))
+
+        result = tagging_engine.retag_queryset(Client.objects.filter(pk=client.pk), prune=True)
+
+        self.assertEqual(result, {'added': 1, 'removed': 1})
+        self.assertEqual(self.slugs(client), {'wedding-buyer', 'vip'})
+
+
+class AuditTrailTests(IdentityTestCase):
+    def entries(self, client):
+        return list(AuditLog.objects.filter(client=client).order_by('pk').values_list('action', 'before', 'after'))
+
+    def test_update_logs_only_the_fields_that_changed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            client = self.make_client('asha@example.com', city='Pune')
+        client = Client.objects.get(pk=client.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            client.city = 'Mumbai'
+            client.notes = 'Prefers polki'
+            client.save()
+
+        (create, *_), update = self.entries(client)
+        self.assertEqual(create, 'create')
+        self.assertEqual(update, ('update', {'city': 'Pune', 'notes': None}, {'city': 'Mumbai', 'notes': 'Prefers polki'}))
+
+    def test_saving_without_changes_logs_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            client = self.make_client('asha@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            Client.objects.get(pk=client.pk).save()
+        self.assertEqual(len(self.entries(client)), 1)
+
+    def test_rolled_back_changes_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            client = self.make_client('asha@example.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                client.city = 'Mumbai'
+                client.save()
+                raise RuntimeError
+        self.assertEqual(len(self.entries(client)), 1)
+
+    def test_batch_writes_its_entries_with_one_insert(self):
+        ids = [self.make_client(f'client{n}@example.com').pk for n in range(3)]
+        with self.captureOnCommitCallbacks() as callbacks:
+            for client in Client.objects.filter(pk__in=ids):
+                client.city = 'Pune'
+                client.save()
+
+        with self.assertNumQueries(1):
+            with audit.audit_batch():
+                for callback in callbacks:
+                    callback()
+
+        self.assertEqual(AuditLog.objects.filter(client_id__in=ids, action='update').count(), 3)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ClientViewSet, ClientInteractionViewSet, AppointmentViewSet, FollowUpViewSet, TaskViewSet, AnnouncementViewSet, PurchaseViewSet, AuditLogViewSet
+from .views import ClientViewSet, ClientInteractionViewSet, AppointmentViewSet, FollowUpViewSet, TaskViewSet, AnnouncementViewSet, PurchaseViewSet, AuditLogViewSet, ImportExportJobViewSet
 
 router = DefaultRouter()
 router.register(r'clients', ClientViewSet, basename='client')
@@ -11,14 +11,15 @@ router.register(r'tasks', TaskViewSet, basename='task')
 router.register(r'announcements', AnnouncementViewSet, basename='announcement')
 router.register(r'purchases', PurchaseViewSet, basename='purchase')
 router.register(r'audit-logs', AuditLogViewSet, basename='auditlog')
+router.register(r'client-jobs', ImportExportJobViewSet, basename='importexportjob')
 
 urlpatterns = [
     path('clients/trash/', ClientViewSet.as_view({'get': 'trash'}), name='client-trash'),
     path('clients/<int:pk>/restore/', ClientViewSet.as_view({'post': 'restore'}), name='client-restore'),
     
     # Import/Export URLs
-    path('clients/export/csv/', ClientViewSet.as_view({'get': 'export_csv'}), name='client-export-csv'),
-    path('clients/export/json/', ClientViewSet.as_view({'get': 'export_json'}), name='client-export-json'),
+    path('clients/export/csv/', ClientViewSet.as_view({'get': 'export_csv', 'post': 'export_csv'}), name='client-export-csv'),
+    path('clients/export/json/', ClientViewSet.as_view({'get': 'export_json', 'post': 'export_json'}), name='client-export-json'),
     path('clients/import/csv/', ClientViewSet.as_view({'post': 'import_csv'}), name='client-import-csv'),
     path('clients/import/json/', ClientViewSet.as_view({'post': 'import_json'}), name='client-import-json'),
     path('clients/template/download/', ClientViewSet.as_view({'get': 'download_template'}), name='client-download-template'),
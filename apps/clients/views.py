@@ -5,17 +5,24 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from django.db.models import Q
-from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, Purchase, AuditLog, serialize_field
-from .serializers import ClientSerializer, ClientInteractionSerializer, AppointmentSerializer, FollowUpSerializer, TaskSerializer, AnnouncementSerializer, PurchaseSerializer, AuditLogSerializer
+from .models import Client, ClientInteraction, Appointment, FollowUp, Task, Announcement, Purchase, AuditLog, ImportExportJob
+from .services import ClientExportService, ClientImportService
+from .tasks import enqueue_job
+from . import audit
+from . import identity
+from .serializers import ClientSerializer, ClientInteractionSerializer, AppointmentSerializer, FollowUpSerializer, TaskSerializer, AnnouncementSerializer, PurchaseSerializer, AuditLogSerializer, ImportExportJobSerializer
 from apps.users.permissions import IsRoleAllowed
+from shared.cache import bump_on_commit
+from shared.pagination import CreatedAtCursorPagination, cap_rows
 from rest_framework import mixins
 from rest_framework import permissions
 import csv
 import io
 import json
 from datetime import datetime
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
 from django.db import transaction
+from django.conf import settings
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 
@@ -34,6 +41,7 @@ class ClientViewSet(viewsets.ModelViewSet):
     serializer_class = ClientSerializer
     permission_classes = [IsRoleAllowed.for_roles(['inhouse_sales','manager','business_admin'])]
     parser_classes = [JSONParser, MultiPartParser, FormParser]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         """Filter clients by tenant for authenticated users and exclude soft-deleted clients"""
@@ -99,26 +107,6 @@ class ClientViewSet(viewsets.ModelViewSet):
         print(f"Request data: {request.data}")
         return Response({"message": "Test endpoint working", "data": request.data})
     
-    def list(self, request, *args, **kwargs):
-        """List clients with debugging"""
-        print("=== DJANGO VIEW - LIST METHOD START ===")
-        print(f"Request user: {request.user}")
-        print(f"Request authenticated: {request.user.is_authenticated}")
-        if request.user.is_authenticated:
-            print(f"User tenant: {request.user.tenant}")
-        
-        queryset = self.get_queryset()
-        print(f"Queryset count: {queryset.count()}")
-        print(f"Queryset SQL: {queryset.query}")
-        
-        serializer = self.get_serializer(queryset, many=True)
-        response_data = serializer.data
-        print(f"Response data count: {len(response_data)}")
-        
-        response = Response(response_data)
-        print("=== DJANGO VIEW - LIST METHOD END ===")
-        return response
-
     def perform_update(self, serializer):
         print(f"=== CLIENT VIEW PERFORM UPDATE ===")
         print(f"Request data: {self.request.data}")
@@ -127,8 +115,7 @@ class ClientViewSet(viewsets.ModelViewSet):
         print(f"Request content type: {self.request.content_type}")
         print(f"Request headers: {dict(self.request.headers)}")
         
-        instance = self.get_object()
-        instance._auditlog_user = self.request.user
+        serializer.instance._auditlog_user = self.request.user
         result = serializer.save()
         print(f"=== UPDATE COMPLETED ===")
         return result
@@ -173,89 +160,162 @@ class ClientViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(tenant=user_tenant)
             else:
                 queryset = Client.objects.none()
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Live clients of the tenant with this ?email= or ?phone=, matched in
+        normalized form. Used before creating clients and capturing visits.
+        """
+        email = request.query_params.get('email')
+        phone = request.query_params.get('phone')
+        if not email and not phone:
+            return Response({'error': 'email or phone is required'}, status=status.HTTP_400_BAD_REQUEST)
+        email_normalized = identity.normalize_email(email)
+        phone_normalized = identity.normalize_phone(phone)
+        results = [
+            {
+                'id': client.pk,
+                'name': client.full_name,
+                'email': client.email,
+                'phone': client.phone,
+                'matched_on': [
+                    field for field, matched in (
+                        ('email', email_normalized and client.email_normalized == email_normalized),
+                        ('phone', phone_normalized and client.phone_normalized == phone_normalized),
+                    ) if matched
+                ],
+            }
+            for client in identity.matches(request.user.tenant, email=email, phone=phone)
+        ]
+        return Response({'email': email_normalized, 'phone': phone_normalized, 'matches': results})
+
     @action(detail=True, methods=['post'], url_path='restore')
     def restore(self, request, pk=None):
         client = self.get_object()
         if client.is_deleted:
+            existing = identity.find_existing(client.tenant, email=client.email, phone=client.phone, exclude=client)
+            if existing is not None:
+                return Response(
+                    {'error': 'another customer has this email or phone', 'existing_client': existing.pk},
+                    status=status.HTTP_409_CONFLICT
+                )
             client.is_deleted = False
             client.deleted_at = None
             client._auditlog_user = request.user
+            # The save is logged as a restore instead of a plain update
+            client._audit_action = 'restore'
             client.save()
-            # Audit log for restore
-            from .models import AuditLog
-            AuditLog.objects.create(
-                client=client,
-                action='restore',
-                user=request.user,
-                before=None,
-                after={field.name: serialize_field(getattr(client, field.name)) for field in client._meta.fields}
-            )
             return Response({'status': 'client restored'})
         return Response({'error': 'client is not deleted'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-restore')
+    def bulk_restore(self, request):
+        """Restore several soft-deleted clients with one UPDATE and one audit insert"""
+        ids = request.data.get('ids') or []
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if not request.user.tenant:
+            return Response({'error': 'User has no tenant'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            queryset = Client.objects.select_for_update().filter(
+                tenant=request.user.tenant, is_deleted=True, pk__in=ids
+            )
+            # Clients whose email or phone was taken by a live client stay deleted
+            conflicting_ids = list(identity.conflicts(queryset).values_list('pk', flat=True))
+            client_ids = list(queryset.exclude(pk__in=conflicting_ids).values_list('pk', flat=True))
+            Client.objects.filter(pk__in=client_ids).update(
+                is_deleted=False, deleted_at=None, updated_at=timezone.now()
+            )
+            audit.log_bulk_change(
+                client_ids,
+                before={'is_deleted': True},
+                after={'is_deleted': False, 'deleted_at': None},
+                action='restore',
+                user=request.user
+            )
+            bump_on_commit(request.user.tenant.id, 'clients')
+        return Response({
+            'status': 'clients restored',
+            'restored_count': len(client_ids),
+            'conflicting_ids': conflicting_ids,
+        })
+
     @action(detail=True, methods=['delete'], url_path='permanent')
     def permanent_delete(self, request, pk=None):
         client = self.get_object()
         if client.is_deleted:
-            client._auditlog_user = request.user
-            from .models import AuditLog
-            before = {field.name: serialize_field(getattr(client, field.name)) for field in client._meta.fields}
-            AuditLog.objects.create(
-                client=client,
-                action='delete',
-                user=request.user,
-                before=before,
-                after=None
-            )
+            # Audit logs cascade with the client, so there is nothing left to log
             client.delete()
             return Response({'status': 'client permanently deleted'})
         return Response({'error': 'client must be soft-deleted first'}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['get'], permission_classes=[ImportExportPermission])
+    @staticmethod
+    def _flag(request, name):
+        value = request.query_params.get(name) or request.data.get(name) or ''
+        return str(value).lower() in ['1', 'true', 'yes']
+
+    def _wants_async(self, request):
+        """Imports run as background jobs when ?async=true is passed"""
+        return self._flag(request, 'async')
+
+    @staticmethod
+    def _export_job_requires_post():
+        return Response(
+            {'error': 'Submit export jobs with POST; GET streams the export directly'},
+            status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    def _submit_job(self, request, job_type, upload=None, options=None):
+        """Create an ImportExportJob and hand it to a Celery worker once committed"""
+        if not request.user.tenant:
+            return Response({'error': 'User has no tenant'}, status=status.HTTP_400_BAD_REQUEST)
+        if not settings.IMPORT_EXPORT_JOBS_ENABLED:
+            # The worker could not read files saved to this service's local disk
+            return Response(
+                {'error': 'Background jobs need shared file storage (AWS_STORAGE_BUCKET_NAME)'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        job = ImportExportJob(
+            tenant=request.user.tenant,
+            created_by=request.user,
+            job_type=job_type,
+            options=options or {},
+        )
+        if upload is not None:
+            job.source_file.save(upload.name, upload, save=False)
+        job.save()
+        transaction.on_commit(lambda: enqueue_job(job))
+        return Response(
+            ImportExportJobSerializer(job, context=self.get_serializer_context()).data,
+            status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=False, methods=['get', 'post'], permission_classes=[ImportExportPermission])
     def export_csv(self, request):
-        """Export customers to CSV - only for business admin and managers"""
+        """Export customers to CSV - only for business admin and managers.
+
+        GET streams the file; POST submits a background export job whose
+        status and file are read from client-jobs/<id>/.
+        """
         try:
+            if request.method == 'POST':
+                return self._submit_job(request, ImportExportJob.JobType.EXPORT_CSV)
+            if self._wants_async(request):
+                return self._export_job_requires_post()
+            
             queryset = self.get_queryset()
             
-            # Create CSV response
-            response = HttpResponse(content_type='text/csv')
+            # Stream the CSV so large tenants never get buffered in memory
+            response = StreamingHttpResponse(
+                ClientExportService.stream_csv(queryset),
+                content_type='text/csv'
+            )
             response['Content-Disposition'] = f'attachment; filename="customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
             
-            # Define CSV fields
-            fieldnames = [
-                'first_name', 'last_name', 'email', 'phone', 'customer_type',
-                'address', 'city', 'state', 'country', 'postal_code',
-                'date_of_birth', 'anniversary_date', 'preferred_metal', 'preferred_stone',
-                'ring_size', 'budget_range', 'lead_source', 'notes', 'community',
-                'mother_tongue', 'reason_for_visit', 'age_of_end_user', 'saving_scheme',
-                'catchment_area', 'next_follow_up', 'summary_notes', 'status',
-                'created_at', 'updated_at', 'tags'
-            ]
-            
-            writer = csv.DictWriter(response, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for client in queryset:
-                row = {}
-                for field in fieldnames:
-                    if field == 'date_of_birth' and client.date_of_birth:
-                        row[field] = client.date_of_birth.strftime('%Y-%m-%d')
-                    elif field == 'anniversary_date' and client.anniversary_date:
-                        row[field] = client.anniversary_date.strftime('%Y-%m-%d')
-                    elif field in ['created_at', 'updated_at']:
-                        row[field] = getattr(client, field).strftime('%Y-%m-%d %H:%M:%S')
-                    else:
-                        value = getattr(client, field, '')
-                        row[field] = str(value) if value is not None else ''
-                
-                # Add tags as comma-separated string
-                row['tags'] = ', '.join([tag.name for tag in client.tags.all()])
-                
-                writer.writerow(row)
-            
             return response
             
         except Exception as e:
@@ -264,18 +324,34 @@ class ClientViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    @action(detail=False, methods=['get'], permission_classes=[ImportExportPermission])
+    @action(detail=False, methods=['get', 'post'], permission_classes=[ImportExportPermission])
     def export_json(self, request):
-        """Export customers to JSON - only for business admin and managers"""
+        """Export customers to JSON - only for business admin and managers.
+        
+        Pass ?ndjson=true to get newline-delimited JSON instead of a JSON array.
+        GET streams the file; POST submits a background export job.
+        """
         try:
+            ndjson = self._flag(request, 'ndjson')
+            if request.method == 'POST':
+                return self._submit_job(request, ImportExportJob.JobType.EXPORT_JSON, options={'ndjson': ndjson})
+            if self._wants_async(request):
+                return self._export_job_requires_post()
+            
             queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
+            context = self.get_serializer_context()
             
-            response = HttpResponse(
-                json.dumps(serializer.data, indent=2, default=str),
-                content_type='application/json'
-            )
-            response['Content-Disposition'] = f'attachment; filename="customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json"'
+            if ndjson:
+                stream = ClientExportService.stream_ndjson(queryset, self.get_serializer_class(), context)
+                content_type = 'application/x-ndjson'
+                extension = 'ndjson'
+            else:
+                stream = ClientExportService.stream_json(queryset, self.get_serializer_class(), context)
+                content_type = 'application/json'
+                extension = 'json'
+            
+            response = StreamingHttpResponse(stream, content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="customers_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}"'
             
             return response
             
@@ -304,96 +380,16 @@ class ClientViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Read CSV file
-            decoded_file = csv_file.read().decode('utf-8')
-            csv_data = csv.DictReader(io.StringIO(decoded_file))
+            if self._wants_async(request):
+                return self._submit_job(request, ImportExportJob.JobType.IMPORT_CSV, upload=csv_file)
             
-            imported_count = 0
-            errors = []
+            # Read the upload line by line instead of decoding it into one string
+            csv_data = csv.DictReader(io.TextIOWrapper(csv_file.file, encoding='utf-8-sig', newline=''))
             
-            with transaction.atomic():
-                for row_num, row in enumerate(csv_data, start=2):  # Start from 2 to account for header
-                    try:
-                        # Clean and validate data
-                        email = row.get('email', '').strip()
-                        if not email:
-                            errors.append(f'Row {row_num}: Email is required')
-                            continue
-                        
-                        # Check if customer already exists
-                        if Client.objects.filter(email=email, tenant=request.user.tenant, is_deleted=False).exists():
-                            errors.append(f'Row {row_num}: Customer with email {email} already exists')
-                            continue
-                        
-                        # Prepare data for creation
-                        client_data = {
-                            'first_name': row.get('first_name', '').strip(),
-                            'last_name': row.get('last_name', '').strip(),
-                            'email': email,
-                            'phone': row.get('phone', '').strip(),
-                            'customer_type': row.get('customer_type', 'individual'),
-                            'address': row.get('address', '').strip(),
-                            'city': row.get('city', '').strip(),
-                            'state': row.get('state', '').strip(),
-                            'country': row.get('country', '').strip(),
-                            'postal_code': row.get('postal_code', '').strip(),
-                            'preferred_metal': row.get('preferred_metal', '').strip(),
-                            'preferred_stone': row.get('preferred_stone', '').strip(),
-                            'ring_size': row.get('ring_size', '').strip(),
-                            'budget_range': row.get('budget_range', '').strip(),
-                            'lead_source': row.get('lead_source', '').strip(),
-                            'notes': row.get('notes', '').strip(),
-                            'community': row.get('community', '').strip(),
-                            'mother_tongue': row.get('mother_tongue', '').strip(),
-                            'reason_for_visit': row.get('reason_for_visit', '').strip(),
-                            'age_of_end_user': row.get('age_of_end_user', '').strip(),
-                            'saving_scheme': row.get('saving_scheme', '').strip(),
-                            'catchment_area': row.get('catchment_area', '').strip(),
-                            'next_follow_up': row.get('next_follow_up', '').strip(),
-                            'summary_notes': row.get('summary_notes', '').strip(),
-                            'status': row.get('status', 'lead'),
-                            'tenant': request.user.tenant.id if request.user.tenant else None,
-                        }
-                        
-                        # Handle date fields
-                        if row.get('date_of_birth'):
-                            try:
-                                client_data['date_of_birth'] = datetime.strptime(row['date_of_birth'], '%Y-%m-%d').date()
-                            except ValueError:
-                                pass  # Skip invalid date
-                        
-                        if row.get('anniversary_date'):
-                            try:
-                                client_data['anniversary_date'] = datetime.strptime(row['anniversary_date'], '%Y-%m-%d').date()
-                            except ValueError:
-                                pass  # Skip invalid date
-                        
-                        # Create client
-                        serializer = self.get_serializer(data=client_data)
-                        if serializer.is_valid():
-                            client = serializer.save()
-                            
-                            # Handle tags if present
-                            tags_str = row.get('tags', '').strip()
-                            if tags_str:
-                                tag_names = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
-                                for tag_name in tag_names:
-                                    # You might want to create tags if they don't exist
-                                    # For now, we'll skip tag creation
-                                    pass
-                            
-                            imported_count += 1
-                        else:
-                            errors.append(f'Row {row_num}: {serializer.errors}')
-                    
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: {str(e)}')
+            importer = ClientImportService(tenant=request.user.tenant, user=request.user)
+            result = importer.run(csv_data, start=2)  # Start from 2 to account for header
             
-            return Response({
-                'message': f'Import completed. {imported_count} customers imported successfully.',
-                'imported_count': imported_count,
-                'errors': errors
-            }, status=status.HTTP_200_OK)
+            return Response(result, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response(
@@ -403,7 +399,7 @@ class ClientViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'], permission_classes=[ImportExportPermission])
     def import_json(self, request):
-        """Import customers from JSON - only for business admin and managers"""
+        """Import customers from JSON or NDJSON - only for business admin and managers"""
         try:
             if 'file' not in request.FILES:
                 return Response(
@@ -414,84 +410,32 @@ class ClientViewSet(viewsets.ModelViewSet):
             json_file = request.FILES['file']
             
             # Validate file type
-            if not json_file.name.endswith('.json'):
+            if not json_file.name.endswith(('.json', '.ndjson')):
                 return Response(
                     {'error': 'Please upload a JSON file'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Read JSON file
-            json_data = json.loads(json_file.read().decode('utf-8'))
+            if self._wants_async(request):
+                return self._submit_job(request, ImportExportJob.JobType.IMPORT_JSON, upload=json_file)
             
-            if not isinstance(json_data, list):
-                return Response(
-                    {'error': 'JSON file should contain an array of customer objects'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            imported_count = 0
-            errors = []
+            if json_file.name.endswith('.ndjson'):
+                # One customer object per line, as produced by export_json?ndjson=true
+                lines = io.TextIOWrapper(json_file.file, encoding='utf-8-sig')
+                json_data = (json.loads(line) for line in lines if line.strip())
+            else:
+                json_data = json.loads(json_file.read().decode('utf-8'))
+                
+                if not isinstance(json_data, list):
+                    return Response(
+                        {'error': 'JSON file should contain an array of customer objects'}, 
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
             
-            with transaction.atomic():
-                for row_num, customer_data in enumerate(json_data, start=1):
-                    try:
-                        # Clean and validate data
-                        email = customer_data.get('email', '').strip()
-                        if not email:
-                            errors.append(f'Row {row_num}: Email is required')
-                            continue
-                        
-                        # Check if customer already exists
-                        if Client.objects.filter(email=email, tenant=request.user.tenant, is_deleted=False).exists():
-                            errors.append(f'Row {row_num}: Customer with email {email} already exists')
-                            continue
-                        
-                        # Prepare data for creation
-                        client_data = {
-                            'first_name': customer_data.get('first_name', '').strip(),
-                            'last_name': customer_data.get('last_name', '').strip(),
-                            'email': email,
-                            'phone': customer_data.get('phone', '').strip(),
-                            'customer_type': customer_data.get('customer_type', 'individual'),
-                            'address': customer_data.get('address', '').strip(),
-                            'city': customer_data.get('city', '').strip(),
-                            'state': customer_data.get('state', '').strip(),
-                            'country': customer_data.get('country', '').strip(),
-                            'postal_code': customer_data.get('postal_code', '').strip(),
-                            'preferred_metal': customer_data.get('preferred_metal', '').strip(),
-                            'preferred_stone': customer_data.get('preferred_stone', '').strip(),
-                            'ring_size': customer_data.get('ring_size', '').strip(),
-                            'budget_range': customer_data.get('budget_range', '').strip(),
-                            'lead_source': customer_data.get('lead_source', '').strip(),
-                            'notes': customer_data.get('notes', '').strip(),
-                            'community': customer_data.get('community', '').strip(),
-                            'mother_tongue': customer_data.get('mother_tongue', '').strip(),
-                            'reason_for_visit': customer_data.get('reason_for_visit', '').strip(),
-                            'age_of_end_user': customer_data.get('age_of_end_user', '').strip(),
-                            'saving_scheme': customer_data.get('saving_scheme', '').strip(),
-                            'catchment_area': customer_data.get('catchment_area', '').strip(),
-                            'next_follow_up': customer_data.get('next_follow_up', '').strip(),
-                            'summary_notes': customer_data.get('summary_notes', '').strip(),
-                            'status': customer_data.get('status', 'lead'),
-                            'tenant': request.user.tenant.id if request.user.tenant else None,
-                        }
-                        
-                        # Create client
-                        serializer = self.get_serializer(data=client_data)
-                        if serializer.is_valid():
-                            client = serializer.save()
-                            imported_count += 1
-                        else:
-                            errors.append(f'Row {row_num}: {serializer.errors}')
-                    
-                    except Exception as e:
-                        errors.append(f'Row {row_num}: {str(e)}')
+            importer = ClientImportService(tenant=request.user.tenant, user=request.user)
+            result = importer.run(json_data, start=1)
             
-            return Response({
-                'message': f'Import completed. {imported_count} customers imported successfully.',
-                'imported_count': imported_count,
-                'errors': errors
-            }, status=status.HTTP_200_OK)
+            return Response(result, status=status.HTTP_200_OK)
             
         except Exception as e:
             return Response(
@@ -690,7 +634,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(date=today)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -699,7 +643,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(date__gte=today, status=Appointment.Status.SCHEDULED)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -708,7 +652,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(date__lt=today, status=Appointment.Status.SCHEDULED)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
 
@@ -798,7 +742,7 @@ class FollowUpViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(due_date__lt=today, status=FollowUp.Status.PENDING)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -807,7 +751,7 @@ class FollowUpViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(due_date=today, status=FollowUp.Status.PENDING)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -816,7 +760,7 @@ class FollowUpViewSet(viewsets.ModelViewSet):
         from django.utils import timezone
         today = timezone.now().date()
         queryset = self.get_queryset().filter(due_date__gte=today, status=FollowUp.Status.PENDING)
-        serializer = self.get_serializer(queryset, many=True)
+        serializer = self.get_serializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
 
@@ -864,12 +808,21 @@ class PurchaseViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(client_id=client_id)
         return queryset
 
+class AuditLogCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination over (timestamp, id): each page is an index range scan
+    on the partitioned audit table instead of an ever-growing OFFSET.
+    """
+    ordering = ('-timestamp', '-id')
+
+
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = AuditLogSerializer
     permission_classes = [IsRoleAllowed.for_roles(['inhouse_sales','business_admin','manager'])]
+    pagination_class = AuditLogCursorPagination
 
     def get_queryset(self):
-        queryset = AuditLog.objects.all().order_by('-timestamp')
+        queryset = AuditLog.objects.select_related('user')
         client_id = self.request.query_params.get('client')
         user = self.request.user
         if user.is_authenticated and user.is_manager:
@@ -881,3 +834,27 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         if client_id:
             queryset = queryset.filter(client_id=client_id)
         return queryset
+
+
+class ImportExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and artifacts of background client import/export jobs"""
+    serializer_class = ImportExportJobSerializer
+    permission_classes = [ImportExportPermission]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_authenticated and user.tenant:
+            return ImportExportJob.objects.filter(tenant=user.tenant).select_related('created_by')
+        return ImportExportJob.objects.none()
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the finished export file"""
+        job = self.get_object()
+        if job.status != ImportExportJob.Status.COMPLETED or not job.result_file:
+            return Response({'error': 'Export file is not ready'}, status=status.HTTP_400_BAD_REQUEST)
+        return FileResponse(
+            job.result_file.open('rb'),
+            as_attachment=True,
+            filename=job.result_file.name.rsplit('/', 1)[-1]
+        )
@@ -109,6 +109,14 @@ class Escalation(models.Model):
     def __str__(self):
         return f"{self.title} - {self.client.name} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can detect transitions without re-reading the row
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
+
     def save(self, *args, **kwargs):
         # Set due date based on SLA when escalation is created
         if not self.pk and not self.due_date:
@@ -116,8 +124,11 @@ class Escalation(models.Model):
         
         # Update timestamps when status changes
         if self.pk:
-            old_instance = Escalation.objects.get(pk=self.pk)
-            if old_instance.status != self.status:
+            old_status = getattr(self, '_loaded_status', None)
+            if old_status is None:
+                # Instance wasn't loaded from the database (or status was deferred)
+                old_status = Escalation.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            if old_status != self.status:
                 if self.status == self.Status.IN_PROGRESS and not self.assigned_at:
                     self.assigned_at = timezone.now()
                 elif self.status == self.Status.RESOLVED and not self.resolved_at:
@@ -126,6 +137,7 @@ class Escalation(models.Model):
                     self.closed_at = timezone.now()
         
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
 
     @property
     def is_overdue(self):
@@ -0,0 +1,4 @@
+from shared.cache import invalidate_on_save
+from .models import Escalation
+
+invalidate_on_save(Escalation, 'escalation')
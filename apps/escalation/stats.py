@@ -0,0 +1,93 @@
+"""
+Escalation metrics evaluated in the database.
+
+Overdue, resolution-time and SLA checks are expressed as filters and
+expressions so that EscalationStatsView needs one aggregate query for the
+headline numbers and one grouped query for every breakdown, instead of
+loading escalations into Python. Interval arithmetic differs by backend:
+PostgreSQL multiplies an integer by an interval, while backends without a
+native duration type store durations as microseconds.
+"""
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Value
+from django.utils import timezone
+
+from .models import Escalation
+
+
+Status = Escalation.Status
+OPEN_STATUSES = [Status.OPEN, Status.IN_PROGRESS, Status.PENDING_CUSTOMER]
+DONE_STATUSES = [Status.RESOLVED, Status.CLOSED]
+
+
+def overdue_q(now=None):
+    """Escalations past their due date that are not resolved or closed (Escalation.is_overdue)"""
+    return Q(due_date__lt=now or timezone.now()) & ~Q(status__in=DONE_STATUSES)
+
+
+def resolution_time():
+    """resolved_at - created_at as a duration (Escalation.time_to_resolution)"""
+    return ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+
+
+def sla_deadline(connection):
+    """created_at + sla_hours"""
+    if connection.features.has_native_duration_field:
+        hour = Value(timedelta(hours=1), output_field=DurationField())
+    else:
+        hour = Value(3600 * 10**6)
+    return F('created_at') + ExpressionWrapper(F('sla_hours') * hour, output_field=DurationField())
+
+
+def sla_met_q(connection):
+    """Resolved within sla_hours of creation (Escalation.sla_compliance)"""
+    return Q(resolved_at__lte=sla_deadline(connection))
+
+
+def escalation_stats(queryset, now=None):
+    """Headline numbers and breakdowns for a queryset of escalations, in two queries"""
+    now = now or timezone.now()
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    resolved = Q(status__in=DONE_STATUSES, resolved_at__isnull=False)
+
+    totals = queryset.order_by().aggregate(
+        total=Count('id'),
+        open=Count('id', filter=Q(status__in=OPEN_STATUSES)),
+        overdue=Count('id', filter=overdue_q(now)),
+        resolved_today=Count('id', filter=Q(
+            status__in=DONE_STATUSES,
+            resolved_at__gte=today_start,
+            resolved_at__lt=today_start + timedelta(days=1),
+        )),
+        resolved_count=Count('id', filter=resolved),
+        sla_met=Count('id', filter=resolved & sla_met_q(connections[queryset.db])),
+        avg_resolution=Avg(resolution_time(), filter=resolved),
+    )
+
+    by_priority = {priority: 0 for priority, _ in Escalation.Priority.choices}
+    by_category = {category: 0 for category, _ in Escalation.Category.choices}
+    by_status = {status: 0 for status, _ in Escalation.Status.choices}
+    groups = queryset.order_by().values('priority', 'category', 'status').annotate(count=Count('id'))
+    for row in groups:
+        by_priority[row['priority']] = by_priority.get(row['priority'], 0) + row['count']
+        by_category[row['category']] = by_category.get(row['category'], 0) + row['count']
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+
+    resolved_count = totals['resolved_count']
+    avg_resolution = totals['avg_resolution']
+    avg_hours = avg_resolution.total_seconds() / 3600 if avg_resolution else 0
+    sla_rate = totals['sla_met'] / resolved_count * 100 if resolved_count else 0
+
+    return {
+        'total_escalations': totals['total'],
+        'open_escalations': totals['open'],
+        'overdue_escalations': totals['overdue'],
+        'resolved_today': totals['resolved_today'],
+        'avg_resolution_time': round(avg_hours, 2),
+        'sla_compliance_rate': round(sla_rate, 2),
+        'escalations_by_priority': by_priority,
+        'escalations_by_category': by_category,
+        'escalations_by_status': by_status,
+    }
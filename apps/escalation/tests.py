@@ -1,3 +1,57 @@
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.clients.models import Client
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from .models import Escalation
+
+
+class EscalationStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.admin = User.objects.create_user(
+            username='owner', password='x', role='business_admin', tenant=self.tenant
+        )
+        self.client_record = Client.objects.create(tenant=self.tenant, email='asha@example.com', first_name='Asha')
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def make_escalation(self, resolved_after=None, **fields):
+        escalation = Escalation.objects.create(
+            title='Late delivery', description='Details', client=self.client_record,
+            created_by=self.admin, tenant=self.tenant, sla_hours=24, **fields
+        )
+        if resolved_after is not None:
+            Escalation.objects.filter(pk=escalation.pk).update(
+                status=Escalation.Status.RESOLVED, resolved_at=escalation.created_at + resolved_after
+            )
+        return escalation
+
+    def test_stats_count_sla_compliance_and_overdue_in_the_database(self):
+        self.make_escalation(resolved_after=timedelta(hours=10))
+        self.make_escalation(resolved_after=timedelta(hours=30))
+        self.make_escalation(due_date=timezone.now() - timedelta(hours=1), priority=Escalation.Priority.HIGH)
+        self.make_escalation()
+
+        response = self.api.get('/api/escalation/stats/')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['total_escalations'], 4)
+        self.assertEqual(response.data['open_escalations'], 2)
+        self.assertEqual(response.data['overdue_escalations'], 1)
+        self.assertEqual(response.data['sla_compliance_rate'], 50.0)
+        self.assertEqual(response.data['avg_resolution_time'], 20.0)
+        self.assertEqual(response.data['escalations_by_priority']['high'], 1)
+        self.assertEqual(response.data['escalations_by_status']['resolved'], 2)
 
-# Create your tests here.
+    def test_stats_without_escalations(self):
+        response = self.api.get('/api/escalation/stats/')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['total_escalations'], 0)
+        self.assertEqual(response.data['sla_compliance_rate'], 0)
@@ -5,12 +5,14 @@ from django.utils import timezone
 from django.db.models import Q, Count, Avg
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Escalation, EscalationNote, EscalationTemplate
+from .stats import escalation_stats
 from .serializers import (
     EscalationSerializer, EscalationCreateSerializer, EscalationUpdateSerializer,
     EscalationNoteSerializer, EscalationNoteCreateSerializer,
     EscalationTemplateSerializer, EscalationStatsSerializer
 )
 from apps.users.permissions import IsRoleAllowed
+from shared.cache import cached_payload, user_scope
 
 
 class EscalationListView(generics.ListCreateAPIView):
@@ -258,80 +260,28 @@ class EscalationStatsView(generics.GenericAPIView):
                     (Q(created_by=user) | Q(assigned_to=user))
                 )
 
-            # Calculate basic statistics
-            total_escalations = queryset.count()
-            open_escalations = queryset.filter(status__in=['open', 'in_progress', 'pending_customer']).count()
-            
-            # Count overdue escalations
-            overdue_escalations = 0
-            for escalation in queryset:
-                if escalation.is_overdue:
-                    overdue_escalations += 1
-            
-            # Resolved today
-            today = timezone.now().date()
-            resolved_today = queryset.filter(
-                status__in=['resolved', 'closed'],
-                resolved_at__date=today
-            ).count()
-
-            # Average resolution time
-            resolved_escalations = queryset.filter(status__in=['resolved', 'closed'])
-            total_resolution_time = 0
-            resolved_count = 0
-            
-            for escalation in resolved_escalations:
-                if escalation.time_to_resolution is not None:
-                    total_resolution_time += escalation.time_to_resolution
-                    resolved_count += 1
-            
-            avg_resolution_time = (total_resolution_time / resolved_count) if resolved_count > 0 else 0
-
-            # SLA compliance rate
-            sla_compliant = 0
-            for escalation in resolved_escalations:
-                if escalation.sla_compliance:
-                    sla_compliant += 1
-            
-            sla_compliance_rate = (sla_compliant / resolved_count * 100) if resolved_count > 0 else 0
-
-            # Breakdowns
-            escalations_by_priority = {}
-            escalations_by_category = {}
-            escalations_by_status = {}
-            
-            for priority, _ in Escalation.Priority.choices:
-                count = queryset.filter(priority=priority).count()
-                escalations_by_priority[priority] = count
-                
-            for category, _ in Escalation.Category.choices:
-                count = queryset.filter(category=category).count()
-                escalations_by_category[category] = count
-                
-            for status, _ in Escalation.Status.choices:
-                count = queryset.filter(status=status).count()
-                escalations_by_status[status] = count
-
-            stats = {
-                'total_escalations': total_escalations,
-                'open_escalations': open_escalations,
-                'overdue_escalations': overdue_escalations,
-                'resolved_today': resolved_today,
-                'avg_resolution_time': round(avg_resolution_time, 2),
-                'sla_compliance_rate': round(sla_compliance_rate, 2),
-                'escalations_by_priority': escalations_by_priority,
-                'escalations_by_category': escalations_by_category,
-                'escalations_by_status': escalations_by_status,
-            }
-
-            serializer = EscalationStatsSerializer(stats)
-            return Response(serializer.data)
+            # Business admins share the tenant-wide payload, everyone else sees their own slice
+            variant = '' if user.is_platform_admin or user.is_business_admin else f'user:{user.pk}'
+            stats = cached_payload(
+                user_scope(user), 'escalation-stats', ('escalation',),
+                lambda: self._build_stats(queryset),
+                variant=variant,
+            )
+            return Response(stats)
         except Exception as e:
             return Response(
                 {'error': f'Error calculating stats: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _build_stats(self, queryset):
+        # Overdue, resolution time, SLA compliance and every breakdown are
+        # evaluated in the database (see stats.py)
+        stats = escalation_stats(queryset)
+
+        serializer = EscalationStatsSerializer(stats)
+        return serializer.data
+
 
 class MyEscalationsView(generics.ListAPIView):
     """
@@ -0,0 +1,6 @@
+from shared.cache import invalidate_on_save
+from .models import Feedback, FeedbackSurvey, FeedbackSubmission
+
+invalidate_on_save(Feedback, 'feedback')
+invalidate_on_save(FeedbackSurvey, 'feedback')
+invalidate_on_save(FeedbackSubmission, 'feedback', tenant_id=lambda submission: submission.survey.tenant_id)
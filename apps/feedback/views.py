@@ -14,6 +14,7 @@ from .serializers import (
     FeedbackStatsSerializer, FeedbackSurveyStatsSerializer
 )
 from apps.users.permissions import IsRoleAllowed
+from shared.cache import ALL_TENANTS, cached_payload, tenant_scope
 
 
 class FeedbackListView(generics.ListCreateAPIView):
@@ -281,81 +282,9 @@ class FeedbackStatsView(generics.GenericAPIView):
                 # If user has no tenant, show all feedback (or you could show none)
                 queryset = Feedback.objects.all()
 
-            print(f"Queryset count: {queryset.count()}")
-            print(f"All feedback count: {Feedback.objects.count()}")
-
-            # Calculate statistics with error handling
-            total_feedback = queryset.count()
-            positive_feedback = queryset.filter(overall_rating__gte=4).count()
-            negative_feedback = queryset.filter(overall_rating__lte=2).count()
-            neutral_feedback = queryset.filter(overall_rating=3).count()
-            
-            print(f"Stats calculated: total={total_feedback}, positive={positive_feedback}, negative={negative_feedback}, neutral={neutral_feedback}")
-            
-            avg_overall_rating = queryset.aggregate(
-                avg_rating=Avg('overall_rating')
-            )['avg_rating'] or 0
-
-            # Breakdowns with error handling
-            try:
-                feedback_by_category = dict(queryset.values_list('category').annotate(count=Count('id')))
-            except Exception as e:
-                print(f"Error in category breakdown: {e}")
-                feedback_by_category = {}
-                
-            try:
-                feedback_by_status = dict(queryset.values_list('status').annotate(count=Count('id')))
-            except Exception as e:
-                print(f"Error in status breakdown: {e}")
-                feedback_by_status = {}
-                
-            try:
-                feedback_by_sentiment = dict(queryset.values_list('sentiment').annotate(count=Count('id')))
-            except Exception as e:
-                print(f"Error in sentiment breakdown: {e}")
-                feedback_by_sentiment = {}
-
-            # Recent feedback with error handling
-            try:
-                recent_feedback = list(queryset.order_by('-created_at')[:5].values(
-                    'id', 'title', 'overall_rating', 'created_at', 'client__first_name', 'client__last_name'
-                ))
-                # Format the client name properly
-                for feedback in recent_feedback:
-                    first_name = feedback.get('client__first_name', '')
-                    last_name = feedback.get('client__last_name', '')
-                    feedback['client_name'] = f"{first_name} {last_name}".strip()
-                    # Remove the individual name fields to keep the response clean
-                    feedback.pop('client__first_name', None)
-                    feedback.pop('client__last_name', None)
-            except Exception as e:
-                print(f"Error in recent feedback: {e}")
-                recent_feedback = []
-
-            # Top issues (negative feedback categories) with error handling
-            try:
-                top_issues = list(queryset.filter(overall_rating__lte=2).values('category').annotate(
-                    count=Count('id')
-                ).order_by('-count')[:5])
-            except Exception as e:
-                print(f"Error in top issues: {e}")
-                top_issues = []
-
-            stats = {
-                'total_feedback': total_feedback,
-                'positive_feedback': positive_feedback,
-                'negative_feedback': negative_feedback,
-                'neutral_feedback': neutral_feedback,
-                'avg_overall_rating': round(avg_overall_rating, 2),
-                'feedback_by_category': feedback_by_category,
-                'feedback_by_status': feedback_by_status,
-                'feedback_by_sentiment': feedback_by_sentiment,
-                'recent_feedback': recent_feedback,
-                'top_issues': top_issues,
-            }
-
-            serializer = FeedbackStatsSerializer(stats)
-            return Response(serializer.data)
+            scope = ALL_TENANTS if user.is_platform_admin or not getattr(user, 'tenant', None) else user.tenant.pk
+            data = cached_payload(scope, 'feedback-stats', ('feedback',), lambda: self._build_stats(queryset))
+            return Response(data)
             
         except Exception as e:
             print(f"Error in FeedbackStatsView: {e}")
@@ -369,6 +298,83 @@ class FeedbackStatsView(generics.GenericAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _build_stats(self, queryset):
+        print(f"Queryset count: {queryset.count()}")
+        print(f"All feedback count: {Feedback.objects.count()}")
+
+        # Calculate statistics with error handling
+        total_feedback = queryset.count()
+        positive_feedback = queryset.filter(overall_rating__gte=4).count()
+        negative_feedback = queryset.filter(overall_rating__lte=2).count()
+        neutral_feedback = queryset.filter(overall_rating=3).count()
+        
+        print(f"Stats calculated: total={total_feedback}, positive={positive_feedback}, negative={negative_feedback}, neutral={neutral_feedback}")
+        
+        avg_overall_rating = queryset.aggregate(
+            avg_rating=Avg('overall_rating')
+        )['avg_rating'] or 0
+
+        # Breakdowns with error handling
+        try:
+            feedback_by_category = dict(queryset.values_list('category').annotate(count=Count('id')))
+        except Exception as e:
+            print(f"Error in category breakdown: {e}")
+            feedback_by_category = {}
+            
+        try:
+            feedback_by_status = dict(queryset.values_list('status').annotate(count=Count('id')))
+        except Exception as e:
+            print(f"Error in status breakdown: {e}")
+            feedback_by_status = {}
+            
+        try:
+            feedback_by_sentiment = dict(queryset.values_list('sentiment').annotate(count=Count('id')))
+        except Exception as e:
+            print(f"Error in sentiment breakdown: {e}")
+            feedback_by_sentiment = {}
+
+        # Recent feedback with error handling
+        try:
+            recent_feedback = list(queryset.order_by('-created_at')[:5].values(
+                'id', 'title', 'overall_rating', 'created_at', 'client__first_name', 'client__last_name'
+            ))
+            # Format the client name properly
+            for feedback in recent_feedback:
+                first_name = feedback.get('client__first_name', '')
+                last_name = feedback.get('client__last_name', '')
+                feedback['client_name'] = f"{first_name} {last_name}".strip()
+                # Remove the individual name fields to keep the response clean
+                feedback.pop('client__first_name', None)
+                feedback.pop('client__last_name', None)
+        except Exception as e:
+            print(f"Error in recent feedback: {e}")
+            recent_feedback = []
+
+        # Top issues (negative feedback categories) with error handling
+        try:
+            top_issues = list(queryset.filter(overall_rating__lte=2).values('category').annotate(
+                count=Count('id')
+            ).order_by('-count')[:5])
+        except Exception as e:
+            print(f"Error in top issues: {e}")
+            top_issues = []
+
+        stats = {
+            'total_feedback': total_feedback,
+            'positive_feedback': positive_feedback,
+            'negative_feedback': negative_feedback,
+            'neutral_feedback': neutral_feedback,
+            'avg_overall_rating': round(avg_overall_rating, 2),
+            'feedback_by_category': feedback_by_category,
+            'feedback_by_status': feedback_by_status,
+            'feedback_by_sentiment': feedback_by_sentiment,
+            'recent_feedback': recent_feedback,
+            'top_issues': top_issues,
+        }
+
+        serializer = FeedbackStatsSerializer(stats)
+        return serializer.data
+
 
 class FeedbackSurveyStatsView(generics.GenericAPIView):
     """
@@ -387,6 +393,14 @@ class FeedbackSurveyStatsView(generics.GenericAPIView):
             survey_queryset = FeedbackSurvey.objects.filter(tenant=user.tenant)
             submission_queryset = FeedbackSubmission.objects.filter(survey__tenant=user.tenant)
 
+        scope = ALL_TENANTS if user.is_platform_admin else tenant_scope(user.tenant)
+        data = cached_payload(
+            scope, 'feedback-survey-stats', ('feedback',),
+            lambda: self._build_stats(survey_queryset, submission_queryset),
+        )
+        return Response(data)
+
+    def _build_stats(self, survey_queryset, submission_queryset):
         # Calculate statistics
         total_surveys = survey_queryset.count()
         active_surveys = survey_queryset.filter(is_active=True).count()
@@ -427,7 +441,7 @@ class FeedbackSurveyStatsView(generics.GenericAPIView):
         }
 
         serializer = FeedbackSurveyStatsSerializer(stats)
-        return Response(serializer.data)
+        return serializer.data
 
 
 class PublicFeedbackView(generics.ListAPIView):
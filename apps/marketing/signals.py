@@ -1,5 +1,6 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from shared.cache import invalidate_on_save
 from .models import (
     MarketingCampaign, MessageTemplate, EcommercePlatform, 
     CustomerSegment, MarketingEvent
@@ -98,4 +99,8 @@ def track_low_performance(sender, instance, **kwargs):
             tenant=instance.tenant,
             store=instance.store,
             event_data={'conversion_rate': instance.conversion_rate}
-        ) 
\ No newline at end of file
+        ) 
+
+invalidate_on_save(MarketingCampaign, 'marketing')
+invalidate_on_save(CustomerSegment, 'marketing')
+invalidate_on_save(EcommercePlatform, 'marketing')
@@ -20,6 +20,7 @@ from .serializers import (
     CampaignListSerializer, TemplateListSerializer, PlatformListSerializer
 )
 from apps.users.permissions import IsRoleAllowed
+from shared.cache import cached_payload, tenant_scope
 from apps.clients.models import Client
 from apps.stores.models import Store
 
@@ -206,9 +207,14 @@ class MarketingDashboardView(APIView):
     permission_classes = [IsRoleAllowed.for_roles(['marketing', 'business_admin'])]
 
     def get(self, request):
-        user = request.user
-        tenant = user.tenant
-        
+        tenant = request.user.tenant
+        data = cached_payload(
+            tenant_scope(tenant), 'marketing-overview', ('marketing',),
+            lambda: self._build_payload(tenant),
+        )
+        return Response(data)
+
+    def _build_payload(self, tenant):
         # Get campaign statistics
         campaigns = MarketingCampaign.objects.filter(tenant=tenant)
         total_campaigns = campaigns.count()
@@ -233,7 +239,7 @@ class MarketingDashboardView(APIView):
         }
         
         serializer = MarketingDashboardSerializer(data)
-        return Response(serializer.data)
+        return serializer.data
 
 
 class CampaignMetricsView(APIView):
@@ -241,9 +247,14 @@ class CampaignMetricsView(APIView):
     permission_classes = [IsRoleAllowed.for_roles(['marketing', 'business_admin'])]
 
     def get(self, request):
-        user = request.user
-        tenant = user.tenant
-        
+        tenant = request.user.tenant
+        data = cached_payload(
+            tenant_scope(tenant), 'marketing-campaigns', ('marketing',),
+            lambda: self._build_payload(tenant),
+        )
+        return Response(data)
+
+    def _build_payload(self, tenant):
         campaigns = MarketingCampaign.objects.filter(tenant=tenant)
         
         # Get real campaign data or generate realistic mock data
@@ -272,7 +283,7 @@ class CampaignMetricsView(APIView):
             campaign_data = self._generate_mock_campaign_data()
         
         serializer = CampaignMetricsSerializer(campaign_data, many=True)
-        return Response(serializer.data)
+        return serializer.data
     
     def _generate_mock_campaign_data(self):
         """Generate realistic mock campaign data"""
@@ -320,9 +331,14 @@ class SegmentOverviewView(APIView):
     permission_classes = [IsRoleAllowed.for_roles(['marketing', 'business_admin'])]
 
     def get(self, request):
-        user = request.user
-        tenant = user.tenant
-        
+        tenant = request.user.tenant
+        data = cached_payload(
+            tenant_scope(tenant), 'marketing-segments', ('marketing',),
+            lambda: self._build_payload(tenant),
+        )
+        return Response(data)
+
+    def _build_payload(self, tenant):
         segments = CustomerSegment.objects.filter(tenant=tenant)
         
         # Get real segment data or generate realistic mock data
@@ -343,7 +359,7 @@ class SegmentOverviewView(APIView):
             segment_data = self._generate_mock_segment_data()
         
         serializer = SegmentOverviewSerializer(segment_data, many=True)
-        return Response(serializer.data)
+        return serializer.data
     
     def _generate_mock_segment_data(self):
         """Generate realistic mock segment data"""
@@ -511,9 +527,14 @@ class WhatsAppMetricsView(APIView):
     permission_classes = [IsRoleAllowed.for_roles(['marketing', 'business_admin'])]
 
     def get(self, request):
-        user = request.user
-        tenant = user.tenant
-        
+        tenant = request.user.tenant
+        data = cached_payload(
+            tenant_scope(tenant), 'marketing-whatsapp', ('marketing',),
+            lambda: self._build_payload(tenant),
+        )
+        return Response(data)
+
+    def _build_payload(self, tenant):
         # Get WhatsApp campaigns
         whatsapp_campaigns = MarketingCampaign.objects.filter(
             tenant=tenant,
@@ -594,7 +615,7 @@ class WhatsAppMetricsView(APIView):
         }
         
         serializer = WhatsAppMetricsSerializer(data)
-        return Response(serializer.data)
+        return serializer.data
 
 
 # List Views for Components
@@ -0,0 +1,52 @@
+"""
+Catalog read model.
+
+Category.product_count is a denormalized counter. Signals keep it current
+with F() UPDATEs as products are created, deleted or moved between
+categories. recount_categories() recomputes it for writes that bypass
+signals: queryset.update(), bulk_create and raw SQL. Product lists annotate
+their variant counts, so a catalog page is a fixed number of queries
+however many SKUs the tenant has.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Category, Product, ProductVariant
+
+
+def _adjust(category_id, delta):
+    if category_id is not None:
+        Category.objects.filter(pk=category_id).update(product_count=F('product_count') + delta)
+
+
+def product_saved(product, created):
+    """Count a new product into its category, or move it between categories"""
+    old = None if created else getattr(product, '_loaded_category_id', product.category_id)
+    if old != product.category_id:
+        _adjust(old, -1)
+        _adjust(product.category_id, 1)
+    product._loaded_category_id = product.category_id
+
+
+def product_deleted(product):
+    # Count from the row as stored; a pending in-memory category change was never counted
+    _adjust(getattr(product, '_loaded_category_id', product.category_id), -1)
+
+
+def recount_categories(categories=None):
+    """Recompute product_count from the products table; returns categories updated"""
+    categories = Category.objects.all() if categories is None else categories
+    counts = Product.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(
+        total=Count('pk')
+    ).values('total')
+    return categories.update(product_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+def with_variant_counts(queryset):
+    """Products with their category and a variant_total annotation"""
+    variants = ProductVariant.objects.filter(product=OuterRef('pk')).order_by().values('product').annotate(
+        total=Count('pk')
+    ).values('total')
+    return queryset.select_related('category').annotate(
+        variant_total=Coalesce(Subquery(variants, output_field=IntegerField()), Value(0)),
+    )
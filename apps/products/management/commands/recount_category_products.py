@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from apps.products.models import Category
+from apps.products.catalog import recount_categories
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized product counts of categories (after bulk imports or raw SQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        for tenant in tenants:
+            updated = recount_categories(Category.objects.filter(tenant=tenant))
+            self.stdout.write(f"{tenant.slug}: {updated} categories recounted")
+        self.stdout.write(self.style.SUCCESS('Category product counts rebuilt'))
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:10
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_products(apps, schema_editor):
+    Category = apps.get_model('products', 'Category')
+    Product = apps.get_model('products', 'Product')
+    counts = Product.objects.filter(category=OuterRef('pk')).order_by().values('category').annotate(
+        total=Count('pk')
+    ).values('total')
+    Category.objects.update(product_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Products in this category, maintained by catalog.py'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['tenant', '-created_at', '-id'], name='product_tenant_created_idx'),
+        ),
+        migrations.RunPython(count_products, migrations.RunPython.noop),
+    ]
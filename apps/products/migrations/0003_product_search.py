@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:05
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+SEARCH_INDEXES = [
+    GinIndex(fields=['search_vector'], name='product_search_idx'),
+    GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm_idx'),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    # GIN and pg_trgm are PostgreSQL only; other databases search in memory (shared/search.py)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Product, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Product = apps.get_model('products', 'Product')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Product, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_category_product_count'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='product', index=index) for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_indexes, remove_search_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:20
+
+from django.db import migrations
+
+from shared.search import search_trigger
+
+
+# Must match the document registered with index_for_search() in products/signals.py
+DOCUMENT = [('name', 'A'), ('sku', 'A'), ('tags', 'B'), ('description', 'C')]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_search'),
+    ]
+
+    operations = [
+        search_trigger('products', 'Product', DOCUMENT),
+    ]
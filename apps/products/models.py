@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 
 
@@ -25,6 +28,11 @@ class Category(models.Model):
     
     # Metadata
     is_active = models.BooleanField(default=True)
+    product_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text=_('Products in this category, maintained by catalog.py')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -111,6 +119,9 @@ class Product(models.Model):
         related_name='products'
     )
     
+    # Search document, maintained by shared/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -120,10 +131,24 @@ class Product(models.Model):
         verbose_name_plural = _('Products')
         ordering = ['-created_at']
         unique_together = ['sku', 'tenant']
+        indexes = [
+            # Keyset pagination of the catalog (shared/pagination.py)
+            models.Index(fields=['tenant', '-created_at', '-id'], name='product_tenant_created_idx'),
+            GinIndex(fields=['search_vector'], name='product_search_idx'),
+            GinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='product_sku_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored category so the category counters can follow moves
+        if 'category_id' in field_names:
+            instance._loaded_category_id = values[field_names.index('category_id')]
+        return instance
+
     @property
     def is_in_stock(self):
         return self.quantity > 0 and self.status == self.Status.ACTIVE
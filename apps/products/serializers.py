@@ -3,15 +3,11 @@ from .models import Product, Category, ProductVariant
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    product_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Category
         fields = '__all__'
-        read_only_fields = ['tenant', 'created_at', 'updated_at']
-    
-    def get_product_count(self, obj):
-        return obj.products.count()
+        # product_count is a maintained counter, see catalog.py
+        read_only_fields = ['tenant', 'product_count', 'created_at', 'updated_at']
 
 
 class ProductVariantSerializer(serializers.ModelSerializer):
@@ -41,7 +37,7 @@ class ProductSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_vector']
         read_only_fields = ['tenant', 'created_at', 'updated_at']
     
     def get_is_in_stock(self, obj):
@@ -57,6 +53,9 @@ class ProductSerializer(serializers.ModelSerializer):
         return obj.profit_margin
     
     def get_variant_count(self, obj):
+        # Annotated by catalog.with_variant_counts() on the read endpoints
+        if hasattr(obj, 'variant_total'):
+            return obj.variant_total
         return obj.variants.count()
 
 
@@ -65,7 +64,7 @@ class ProductDetailSerializer(ProductSerializer):
     category_details = CategorySerializer(source='category', read_only=True)
     
     class Meta(ProductSerializer.Meta):
-        fields = '__all__'
+        exclude = ['search_vector']
 
 
 class ProductListSerializer(serializers.ModelSerializer):
@@ -74,13 +73,14 @@ class ProductListSerializer(serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(read_only=True)
     is_in_stock = serializers.SerializerMethodField()
     current_price = serializers.SerializerMethodField()
+    variant_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'sku', 'category', 'category_name', 'selling_price', 
             'current_price', 'quantity', 'status', 'is_in_stock', 
-            'is_featured', 'is_bestseller', 'created_at'
+            'is_featured', 'is_bestseller', 'variant_count', 'created_at'
         ]
         read_only_fields = ['tenant', 'created_at', 'updated_at']
     
@@ -89,3 +89,8 @@ class ProductListSerializer(serializers.ModelSerializer):
     
     def get_current_price(self, obj):
         return obj.current_price
+    
+    def get_variant_count(self, obj):
+        if hasattr(obj, 'variant_total'):
+            return obj.variant_total
+        return obj.variants.count()
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from shared.cache import invalidate_on_save
+from shared.search import index_for_search
+from .catalog import product_deleted, product_saved
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+def update_category_count(sender, instance, created, raw=False, **kwargs):
+    """Keep Category.product_count current as products are added or recategorized"""
+    if raw:
+        return
+    product_saved(instance, created)
+
+
+@receiver(post_delete, sender=Product)
+def uncount_deleted_product(sender, instance, **kwargs):
+    product_deleted(instance)
+
+
+invalidate_on_save(Product, 'products')
+index_for_search(
+    Product,
+    document=[('name', 'A'), ('sku', 'A'), ('tags', 'B'), ('description', 'C')],
+    identifiers=['sku'],
+)
@@ -1,3 +1,78 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from .catalog import recount_categories
+from .models import Category, Product, ProductVariant
+
+
+class CatalogCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.rings = Category.objects.create(name='Rings', tenant=self.tenant)
+        self.chains = Category.objects.create(name='Chains', tenant=self.tenant)
+
+    def product(self, sku, category=None):
+        return Product.objects.create(
+            name=sku, sku=sku, category=category, cost_price=1, selling_price=2, tenant=self.tenant
+        )
+
+    def counts(self):
+        categories = Category.objects.filter(pk__in=[self.rings.pk, self.chains.pk]).order_by('name')
+        return [category.product_count for category in categories]
+
+    def test_creating_moving_and_deleting_products_adjust_the_counts(self):
+        ring = self.product('R-1', self.rings)
+        self.product('R-2', self.rings)
+        self.assertEqual(self.counts(), [0, 2])
+
+        ring.category = self.chains
+        ring.save()
+        self.assertEqual(self.counts(), [1, 1])
+
+        ring.delete()
+        self.assertEqual(self.counts(), [0, 1])
+
+    def test_deleting_counts_from_the_stored_category(self):
+        ring = self.product('R-1', self.rings)
+        ring.category = self.chains
+        ring.delete()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_recount_repairs_writes_that_bypass_signals(self):
+        self.product('R-1', self.rings)
+        Product.objects.filter(sku='R-1').update(category=self.chains)
+        self.assertEqual(self.counts(), [0, 1])
+
+        self.assertEqual(recount_categories(), 2)
+        self.assertEqual(self.counts(), [1, 0])
+
+    def test_product_list_queries_do_not_grow_with_the_catalog(self):
+        api = APIClient()
+        api.force_authenticate(
+            User.objects.create_user(username='owner', password='x', role='business_admin', tenant=self.tenant)
+        )
+
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = api.get('/api/products/list/')
+            self.assertEqual(response.status_code, 200)
+            return len(queries), response.data['results']
+
+        ring = self.product('R-1', self.rings)
+        ProductVariant.objects.create(product=ring, sku='R-1-S', name='Small')
+        few, _ = list_queries()
+
+        for n in range(2, 6):
+            product = self.product(f'R-{n}', self.chains)
+            ProductVariant.objects.create(product=product, sku=f'R-{n}-S', name='Small')
+            ProductVariant.objects.create(product=product, sku=f'R-{n}-L', name='Large')
+        many, results = list_queries()
+
+        self.assertEqual(many, few)
+        self.assertEqual(sorted(row['variant_count'] for row in results), [1, 2, 2, 2, 2])
@@ -1,31 +1,27 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Q, F
+from django.db.models import Sum, Count, F
 from django.utils import timezone
 from datetime import timedelta
 
 from .models import Product, Category, ProductVariant
 from .serializers import ProductSerializer, ProductListSerializer, ProductDetailSerializer, CategorySerializer, ProductVariantSerializer
 from apps.users.permissions import IsRoleAllowed
-
-
-class CustomProductPagination(PageNumberPagination):
-    page_size = 50
-    page_size_query_param = 'page_size'
-    max_page_size = 200
+from shared.pagination import CappedListMixin, CreatedAtCursorPagination
+from .catalog import with_variant_counts
 
 
 class ProductListView(generics.ListAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductListSerializer
     permission_classes = [IsAuthenticated, IsRoleAllowed.for_roles(['business_admin', 'manager', 'inhouse_sales', 'tele_calling', 'marketing'])]
-    pagination_class = CustomProductPagination
+    # Keyset pages: deep pages of a large catalog cost the same as the first
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
-        queryset = Product.objects.filter(tenant=self.request.user.tenant)
+        queryset = with_variant_counts(Product.objects.filter(tenant=self.request.user.tenant))
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -37,13 +33,6 @@ class ProductListView(generics.ListAPIView):
         if category_id:
             queryset = queryset.filter(category_id=category_id)
         
-        # Search by name or SKU
-        search = self.request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(sku__icontains=search)
-            )
-        
         # Filter by stock level
         stock_filter = self.request.query_params.get('stock')
         if stock_filter == 'low':
@@ -69,7 +58,7 @@ class ProductDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsRoleAllowed.for_roles(['business_admin', 'manager', 'inhouse_sales', 'tele_calling', 'marketing'])]
     
     def get_queryset(self):
-        return Product.objects.filter(tenant=self.request.user.tenant)
+        return with_variant_counts(Product.objects.filter(tenant=self.request.user.tenant)).prefetch_related('variants')
 
 
 class ProductUpdateView(generics.UpdateAPIView):
@@ -127,14 +116,13 @@ class ProductStatsView(generics.GenericAPIView):
         })
 
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(CappedListMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated, IsRoleAllowed.for_roles(['business_admin', 'manager', 'inhouse_sales', 'tele_calling', 'marketing'])]
     pagination_class = None  # Disable pagination for categories
     
     def get_queryset(self):
-        # Temporarily return all categories for debugging
         return Category.objects.filter(tenant=self.request.user.tenant)
 
 
@@ -258,7 +246,7 @@ class ProductsDebugView(APIView):
         })
 
 
-class ProductsByCategoryView(generics.ListAPIView):
+class ProductsByCategoryView(CappedListMixin, generics.ListAPIView):
     """Get products for a specific category"""
     serializer_class = ProductListSerializer
     permission_classes = [IsAuthenticated, IsRoleAllowed.for_roles(['business_admin', 'manager', 'inhouse_sales', 'tele_calling', 'marketing'])]
@@ -266,7 +254,7 @@ class ProductsByCategoryView(generics.ListAPIView):
     
     def get_queryset(self):
         category_id = self.kwargs.get('category_id')
-        return Product.objects.filter(
+        return with_variant_counts(Product.objects.filter(
             tenant=self.request.user.tenant,
             category_id=category_id
-        ).order_by('-created_at')
+        )).order_by('-created_at')
@@ -0,0 +1,63 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Avg, F, Max, Min, Sum
+from django.test.utils import CaptureQueriesContext
+from apps.tenants.models import Tenant
+from apps.sales.models import SalesPipeline
+from apps.sales.pipeline_stats import pipeline_stats
+
+
+def per_stage_queries(tenant):
+    """The previous dashboard pattern: separate aggregate queries per stage"""
+    pipelines = SalesPipeline.objects.filter(tenant=tenant)
+    for stage_code, _ in SalesPipeline.Stage.choices:
+        stage = pipelines.filter(stage=stage_code)
+        stage.count()
+        stage.aggregate(total=Sum('expected_value'))
+        if stage.exists():
+            stage.aggregate(avg_days=Avg(F('updated_at') - F('created_at')))
+            stage.count()
+    pipelines.filter(stage='closed_won').count()
+    pipelines.filter(stage='closed_lost').count()
+    deals = pipelines.filter(expected_value__gt=0)
+    if deals.exists():
+        deals.aggregate(avg=Avg('expected_value'))
+        deals.aggregate(max=Max('expected_value'))
+        deals.aggregate(min=Min('expected_value'))
+
+
+def single_query(tenant):
+    stats = pipeline_stats(tenant)
+    stats.stage_summary()
+    stats.velocity()
+    stats.win_loss()
+    stats.deal_size()
+
+
+class Command(BaseCommand):
+    help = 'Compare query count and time of per-stage pipeline aggregates against pipeline_stats()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to the tenant with the most pipelines)')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per strategy')
+
+    def handle(self, *args, **options):
+        if options['tenant']:
+            tenant = Tenant.objects.filter(slug=options['tenant']).first()
+        else:
+            tenant = max(Tenant.objects.all(), key=lambda t: t.pipelines.count(), default=None)
+        if tenant is None:
+            self.stdout.write(self.style.ERROR('No tenant to benchmark'))
+            return
+
+        pipelines = SalesPipeline.objects.filter(tenant=tenant).count()
+        self.stdout.write(f"Tenant {tenant.slug}: {pipelines} pipelines, {len(SalesPipeline.Stage.choices)} stages")
+        for label, strategy in (('per-stage queries', per_stage_queries), ('pipeline_stats()', single_query)):
+            with CaptureQueriesContext(connection) as queries:
+                strategy(tenant)
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                strategy(tenant)
+            elapsed = (time.perf_counter() - started) / options['repeat'] * 1000
+            self.stdout.write(f"{label:>18}: {len(queries):3d} queries, {elapsed:.2f} ms per run")
@@ -0,0 +1,117 @@
+"""
+Pipeline analytics for a tenant in a single grouped query.
+
+Every per-stage count/value/velocity figure, the win/loss split and the
+deal-size statistics are computed from one SELECT ... GROUP BY stage with
+filtered aggregates, instead of a count and a sum query per stage. Used by
+the analytics, sales and tenant dashboards.
+"""
+from decimal import Decimal
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum
+
+from .models import SalesPipeline
+
+
+Stage = SalesPipeline.Stage
+
+
+def _rate(part, whole, digits=2):
+    return round(part / whole * 100, digits) if whole else 0
+
+
+class PipelineStats:
+    """Aggregated pipeline figures; build with pipeline_stats()"""
+
+    def __init__(self, rows):
+        self.rows = {row['stage']: row for row in rows}
+
+    def _get(self, stage, key, default=0):
+        row = self.rows.get(stage)
+        value = row[key] if row else None
+        return default if value is None else value
+
+    def count(self, stage):
+        return self._get(stage, 'count')
+
+    def value(self, stage):
+        return self._get(stage, 'total_value', Decimal('0'))
+
+    @property
+    def total_count(self):
+        return sum(row['count'] for row in self.rows.values())
+
+    def stages(self):
+        """{stage: {'name', 'count', 'value'}} for every stage, empty ones included"""
+        return {
+            code: {'name': name, 'count': self.count(code), 'value': float(self.value(code))}
+            for code, name in Stage.choices
+        }
+
+    def stage_summary(self):
+        """stages() plus each stage's share of all pipelines, in percent"""
+        summary = self.stages()
+        total = self.total_count
+        for stage in summary.values():
+            stage['percentage'] = _rate(stage['count'], total, 1)
+        return summary
+
+    def stage_distribution(self):
+        """[{'stage', 'count', 'total_value'}] for stages that have pipelines, ordered by stage"""
+        return [
+            {'stage': code, 'count': row['count'], 'total_value': row['total_value']}
+            for code, row in sorted(self.rows.items())
+        ]
+
+    def velocity(self):
+        """Average age (updated_at - created_at) of the pipelines in each non-empty stage"""
+        return {
+            code: {
+                'stage_name': name,
+                'avg_days': self.rows[code]['avg_age'].days if self.rows[code]['avg_age'] else 0,
+                'count': self.count(code),
+            }
+            for code, name in Stage.choices
+            if self.count(code)
+        }
+
+    def win_loss(self):
+        won = self.count(Stage.CLOSED_WON)
+        lost = self.count(Stage.CLOSED_LOST)
+        total = won + lost
+        return {
+            'total_deals': total,
+            'won_deals': won,
+            'lost_deals': lost,
+            'win_rate': _rate(won, total),
+            'loss_rate': _rate(lost, total),
+        }
+
+    def deal_size(self):
+        """Average/max/min expected value over deals with a positive expected value"""
+        rows = [row for row in self.rows.values() if row['deal_count']]
+        deal_count = sum(row['deal_count'] for row in rows)
+        if not deal_count:
+            return {'avg_deal_size': 0.0, 'max_deal_size': 0.0, 'min_deal_size': 0.0}
+        return {
+            'avg_deal_size': float(sum(row['deal_total'] for row in rows) / deal_count),
+            'max_deal_size': float(max(row['deal_max'] for row in rows)),
+            'min_deal_size': float(min(row['deal_min'] for row in rows)),
+        }
+
+
+def pipeline_stats(tenant, queryset=None):
+    """Compute PipelineStats for a tenant (or a pre-filtered SalesPipeline queryset) in one query"""
+    if queryset is None:
+        queryset = SalesPipeline.objects.filter(tenant=tenant)
+    positive = Q(expected_value__gt=0)
+    rows = queryset.values('stage').annotate(
+        count=Count('id'),
+        total_value=Sum('expected_value'),
+        avg_age=Avg(ExpressionWrapper(F('updated_at') - F('created_at'), output_field=DurationField())),
+        deal_count=Count('id', filter=positive),
+        deal_total=Sum('expected_value', filter=positive),
+        deal_max=Max('expected_value', filter=positive),
+        deal_min=Min('expected_value', filter=positive),
+    ).order_by()
+    return PipelineStats(rows)
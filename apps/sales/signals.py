@@ -0,0 +1,6 @@
+from shared.cache import invalidate_on_save
+from .models import Sale, SaleItem, SalesPipeline
+
+invalidate_on_save(Sale, 'sales')
+invalidate_on_save(SaleItem, 'sales', tenant_id=lambda item: item.sale.tenant_id)
+invalidate_on_save(SalesPipeline, 'sales')
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from decimal import Decimal
 from .models import Sale, SaleItem, SalesPipeline
 from .serializers import SaleSerializer, SaleItemSerializer, SalesPipelineSerializer
+from .pipeline_stats import pipeline_stats
 
 
 class SaleListView(generics.ListAPIView):
@@ -208,31 +209,8 @@ class PipelineDashboardView(generics.GenericAPIView):
         try:
             tenant = request.user.tenant
             
-            # Pipeline summary by stage
-            stage_summary = {}
-            for stage_code, stage_name in SalesPipeline.Stage.choices:
-                pipelines = SalesPipeline.objects.filter(
-                    tenant=tenant,
-                    stage=stage_code
-                )
-                
-                count = pipelines.count()
-                value = pipelines.aggregate(
-                    total=Sum('expected_value')
-                )['total'] or Decimal('0')
-                
-                stage_summary[stage_code] = {
-                    'name': stage_name,
-                    'count': count,
-                    'value': float(value),
-                    'percentage': 0  # Will be calculated below
-                }
-            
-            # Calculate percentages
-            total_pipelines = sum(stage['count'] for stage in stage_summary.values())
-            if total_pipelines > 0:
-                for stage in stage_summary.values():
-                    stage['percentage'] = round((stage['count'] / total_pipelines) * 100, 1)
+            # Pipeline summary by stage (count, value and share of all pipelines)
+            stage_summary = pipeline_stats(tenant).stage_summary()
             
             # Recent activities
             recent_pipelines = SalesPipeline.objects.filter(
@@ -7,6 +7,7 @@ from .models import Store, StoreUserMap
 from .serializers import StoreSerializer, StoreUserMapSerializer
 from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
+from shared.pagination import cap_rows
 
 # Create your views here.
 
@@ -60,7 +61,7 @@ class StoreViewSet(viewsets.ModelViewSet):
     def get_team(self, request, pk=None):
         store = self.get_object()
         team = StoreUserMap.objects.filter(store=store)
-        serializer = StoreUserMapSerializer(team, many=True)
+        serializer = StoreUserMapSerializer(cap_rows(team), many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'], url_path='dashboard')
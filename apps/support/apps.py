@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class SupportConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.support'
-    verbose_name = 'Support System' 
\ No newline at end of file
+    verbose_name = 'Support System'
+
+    def ready(self):
+        import apps.support.signals
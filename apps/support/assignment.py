@@ -0,0 +1,110 @@
+"""
+Automatic assignment of support tickets to platform admins.
+
+A strategy picks one admin for a ticket from the candidate queryset;
+SUPPORT_ASSIGNMENT_STRATEGY selects which one runs. assign_ticket() takes a
+transaction-scoped advisory lock first, so concurrent ticket creations
+assign one at a time and each sees the load left by the previous one
+instead of all choosing the same least-loaded admin.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+
+from .models import SupportTicket, SupportSettings
+
+
+User = get_user_model()
+OPEN_STATUSES = [SupportTicket.Status.OPEN, SupportTicket.Status.IN_PROGRESS, SupportTicket.Status.REOPENED]
+# Arbitrary constant identifying the ticket assignment lock in pg_advisory_xact_lock
+ASSIGNMENT_LOCK_ID = 7_240_101
+
+
+class LeastLoadedStrategy:
+    """The admin with the fewest open assigned tickets (lowest id on ties)"""
+
+    def choose(self, ticket, candidates):
+        return candidates.annotate(
+            open_tickets=Count('assigned_tickets', filter=Q(assigned_tickets__status__in=OPEN_STATUSES))
+        ).order_by('open_tickets', 'pk').first()
+
+
+class RoundRobinStrategy:
+    """
+    Each admin in turn, regardless of load. The turn is kept per tenant in
+    SupportSettings.assignment_cursor, so every web process shares it;
+    tenants without settings always start from the first admin.
+    """
+
+    def choose(self, ticket, candidates):
+        ids = list(candidates.order_by('pk').values_list('pk', flat=True))
+        if not ids:
+            return None
+        support_settings = SupportSettings.objects.filter(tenant_id=ticket.tenant_id)
+        # assign_ticket() holds the assignment lock, so reading back our own increment is safe
+        if support_settings.update(assignment_cursor=F('assignment_cursor') + 1):
+            turn = support_settings.values_list('assignment_cursor', flat=True).get() - 1
+        else:
+            turn = 0
+        return candidates.get(pk=ids[turn % len(ids)])
+
+
+class CategoryStrategy(LeastLoadedStrategy):
+    """
+    Least loaded among the admins listed for the ticket's category in
+    SUPPORT_ASSIGNMENT_SKILLS ({category: [username, ...]}); falls back to
+    every admin when the category has no one listed.
+    """
+
+    def choose(self, ticket, candidates):
+        usernames = settings.SUPPORT_ASSIGNMENT_SKILLS.get(ticket.category)
+        if usernames:
+            specialists = candidates.filter(username__in=usernames)
+            if specialists.exists():
+                candidates = specialists
+        return super().choose(ticket, candidates)
+
+
+STRATEGIES = {
+    'least_loaded': LeastLoadedStrategy,
+    'round_robin': RoundRobinStrategy,
+    'category': CategoryStrategy,
+}
+
+
+def get_strategy(name=None):
+    name = name or settings.SUPPORT_ASSIGNMENT_STRATEGY
+    try:
+        return STRATEGIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown support assignment strategy '{name}'")
+
+
+def _lock_assignments(candidates):
+    """Serialize assignments until the surrounding transaction ends"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ASSIGNMENT_LOCK_ID])
+    else:
+        list(candidates.select_for_update().values_list('pk', flat=True))
+
+
+def assign_ticket(ticket, strategy=None):
+    """Assign the ticket to the admin the strategy picks; returns the admin or None"""
+    strategy = strategy or get_strategy()
+    candidates = User.objects.filter(role='platform_admin', is_active=True)
+    with transaction.atomic():
+        _lock_assignments(candidates)
+        admin = strategy.choose(ticket, candidates)
+        if admin is None:
+            return None
+        ticket.assigned_to = admin
+        ticket.save(update_fields=['assigned_to', 'updated_at'])
+    return admin
+
+
+def auto_assign_enabled(tenant):
+    """Tenants opt in through SupportSettings.auto_assign_tickets"""
+    support_settings = SupportSettings.objects.filter(tenant=tenant).only('auto_assign_tickets').first()
+    return bool(support_settings and support_settings.auto_assign_tickets)
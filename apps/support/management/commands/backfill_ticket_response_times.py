@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from apps.support.models import SupportTicket
+from apps.support.stats import backfill_response_times
+from shared.cache import bump
+
+
+class Command(BaseCommand):
+    help = 'Fill first response / resolution times of existing support tickets from their messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+
+    def handle(self, *args, **options):
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        for tenant in tenants:
+            responses, resolutions = backfill_response_times(SupportTicket.objects.filter(tenant=tenant))
+            if responses or resolutions:
+                bump(tenant.pk, 'support')
+            self.stdout.write(f"{tenant.slug}: {responses} first responses, {resolutions} resolutions filled")
+        self.stdout.write(self.style.SUCCESS('Ticket response times backfilled'))
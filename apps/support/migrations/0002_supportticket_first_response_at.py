@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportticket',
+            name='first_response_at',
+            field=models.DateTimeField(blank=True, help_text='When a platform admin first replied (set from the ticket messages)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['tenant', 'first_response_at'], name='support_ticket_response_idx'),
+        ),
+    ]
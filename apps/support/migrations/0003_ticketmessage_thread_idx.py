@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0002_supportticket_first_response_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticketmessage',
+            index=models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_message_thread_idx'),
+        ),
+    ]
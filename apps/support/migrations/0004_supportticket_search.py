@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:05
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+SEARCH_INDEXES = [
+    GinIndex(fields=['search_vector'], name='support_ticket_search_idx'),
+    GinIndex(OpClass(Upper('ticket_id'), name='gin_trgm_ops'), name='support_ticket_id_trgm_idx'),
+]
+
+
+def add_search_indexes(apps, schema_editor):
+    # GIN and pg_trgm are PostgreSQL only; other databases search in memory (shared/search.py)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    SupportTicket = apps.get_model('support', 'SupportTicket')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(SupportTicket, index)
+
+
+def remove_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    SupportTicket = apps.get_model('support', 'SupportTicket')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(SupportTicket, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0003_ticketmessage_thread_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='supportticket',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='supportticket', index=index) for index in SEARCH_INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_indexes, remove_search_indexes),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:20
+
+from django.db import migrations
+
+from shared.search import search_trigger
+
+
+# Must match the document registered with index_for_search() in support/signals.py
+DOCUMENT = [('title', 'A'), ('summary', 'B')]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0004_supportticket_search'),
+    ]
+
+    operations = [
+        search_trigger('support', 'SupportTicket', DOCUMENT),
+    ]
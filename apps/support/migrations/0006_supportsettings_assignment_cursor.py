@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0005_supportticket_search_trigger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportsettings',
+            name='assignment_cursor',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
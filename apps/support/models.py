@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -80,17 +83,30 @@ class SupportTicket(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     closed_at = models.DateTimeField(null=True, blank=True)
+    first_response_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('When a platform admin first replied (set from the ticket messages)')
+    )
     
     # Additional fields
     is_urgent = models.BooleanField(default=False, help_text=_('Mark as urgent for quick response'))
     requires_callback = models.BooleanField(default=False, help_text=_('Business admin requested a callback'))
     callback_phone = models.CharField(max_length=15, blank=True, null=True)
     callback_preferred_time = models.CharField(max_length=100, blank=True, null=True)
+    
+    # Search document, maintained by shared/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = _('Support Ticket')
         verbose_name_plural = _('Support Tickets')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', 'first_response_at'], name='support_ticket_response_idx'),
+            GinIndex(fields=['search_vector'], name='support_ticket_search_idx'),
+            GinIndex(OpClass(Upper('ticket_id'), name='gin_trgm_ops'), name='support_ticket_id_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"#{self.ticket_id} - {self.title}"
@@ -126,12 +142,8 @@ class SupportTicket(models.Model):
     @property
     def response_time(self):
         """Calculate time from creation to first platform admin response"""
-        first_response = self.messages.filter(
-            sender__role='platform_admin'
-        ).order_by('created_at').first()
-        
-        if first_response:
-            return first_response.created_at - self.created_at
+        if self.first_response_at:
+            return self.first_response_at - self.created_at
         return None
 
 
@@ -181,6 +193,9 @@ class TicketMessage(models.Model):
         verbose_name = _('Ticket Message')
         verbose_name_plural = _('Ticket Messages')
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['ticket', 'created_at', 'id'], name='ticket_message_thread_idx'),
+        ]
 
     def __str__(self):
         return f"Message from {self.sender.username} on {self.ticket.ticket_id}"
@@ -253,6 +268,8 @@ class SupportSettings(models.Model):
         default=True,
         help_text=_('Automatically assign tickets to available platform admins')
     )
+    # Turns taken by the round_robin assignment strategy for this tenant's tickets
+    assignment_cursor = models.PositiveIntegerField(default=0, editable=False)
     max_response_time_hours = models.PositiveIntegerField(
         default=24,
         help_text=_('Maximum response time in hours for non-critical tickets')
@@ -0,0 +1,37 @@
+"""
+Read models for the support ticket endpoints.
+
+Ticket lists and details no longer load conversations. Message count,
+last message time and first response time are annotated with correlated
+subqueries, so a page of tickets is a fixed handful of queries. The
+conversation itself is read in cursor pages from the ticket's messages
+action.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import TicketMessage
+
+
+def visible_messages(user):
+    """Messages the user may read; internal notes are for platform admins only"""
+    messages = TicketMessage.objects.all()
+    if user.role != 'platform_admin':
+        messages = messages.filter(is_internal=False)
+    return messages
+
+
+def tickets_with_activity(queryset, user):
+    """Tickets annotated with message_total, last_message_at and responded_at"""
+    messages = visible_messages(user).filter(ticket=OuterRef('pk')).order_by()
+    totals = messages.values('ticket').annotate(total=Count('pk')).values('total')
+    # first_response_at is stamped by stats.record_message(); tickets that
+    # predate it and were not backfilled fall back to the messages themselves
+    first_reply = TicketMessage.objects.filter(
+        ticket=OuterRef('pk'), sender__role='platform_admin'
+    ).order_by('created_at').values('created_at')[:1]
+    return queryset.annotate(
+        message_total=Coalesce(Subquery(totals, output_field=IntegerField()), Value(0)),
+        last_message_at=Subquery(messages.order_by('-created_at').values('created_at')[:1]),
+        responded_at=Coalesce('first_response_at', Subquery(first_reply)),
+    )
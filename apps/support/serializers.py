@@ -24,11 +24,23 @@ class TicketMessageSerializer(serializers.ModelSerializer):
             return ''
 
 
+def _message_count(ticket):
+    if hasattr(ticket, 'message_total'):
+        return ticket.message_total
+    return ticket.messages.count()
+
+
+def _last_message_at(ticket):
+    if hasattr(ticket, 'last_message_at'):
+        return ticket.last_message_at
+    return ticket.messages.order_by('-created_at').values_list('created_at', flat=True).first()
+
+
 class SupportTicketSerializer(serializers.ModelSerializer):
+    """Ticket detail; the conversation is paged from the ticket's messages action"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
-    messages = TicketMessageSerializer(many=True, read_only=True)
     message_count = serializers.SerializerMethodField()
     last_message_time = serializers.SerializerMethodField()
     response_time_hours = serializers.SerializerMethodField()
@@ -40,31 +52,23 @@ class SupportTicketSerializer(serializers.ModelSerializer):
             'id', 'ticket_id', 'title', 'summary', 'category', 'priority', 'status',
             'created_by', 'created_by_name', 'assigned_to', 'assigned_to_name',
             'tenant', 'tenant_name', 'created_at', 'updated_at', 'resolved_at', 'closed_at',
-            'is_urgent', 'requires_callback', 'callback_phone', 'callback_preferred_time',
-            'messages', 'message_count', 'last_message_time', 'response_time_hours', 'is_overdue'
+            'first_response_at', 'is_urgent', 'requires_callback', 'callback_phone', 'callback_preferred_time',
+            'message_count', 'last_message_time', 'response_time_hours', 'is_overdue'
         ]
-        read_only_fields = ['ticket_id', 'created_at', 'updated_at', 'resolved_at', 'closed_at']
+        read_only_fields = ['ticket_id', 'created_at', 'updated_at', 'resolved_at', 'closed_at', 'first_response_at']
 
     def get_message_count(self, obj):
-        try:
-            return obj.messages.count()
-        except:
-            return 0
+        return _message_count(obj)
 
     def get_last_message_time(self, obj):
-        try:
-            last_message = obj.messages.order_by('-created_at').first()
-            return last_message.created_at if last_message else obj.created_at
-        except:
-            return obj.created_at
+        return _last_message_at(obj) or obj.created_at
 
     def get_response_time_hours(self, obj):
-        try:
-            if obj.response_time:
-                return round(obj.response_time.total_seconds() / 3600, 2)
-            return None
-        except:
-            return None
+        # responded_at is annotated by queries.tickets_with_activity()
+        responded_at = getattr(obj, 'responded_at', obj.first_response_at)
+        if responded_at:
+            return round((responded_at - obj.created_at).total_seconds() / 3600, 2)
+        return None
 
     def get_is_overdue(self, obj):
         try:
@@ -178,14 +182,7 @@ class SupportTicketSummarySerializer(serializers.ModelSerializer):
         ]
 
     def get_message_count(self, obj):
-        try:
-            return obj.messages.count()
-        except:
-            return 0
+        return _message_count(obj)
 
     def get_last_activity(self, obj):
-        try:
-            last_message = obj.messages.order_by('-created_at').first()
-            return last_message.created_at if last_message else obj.updated_at
-        except:
-            return obj.updated_at 
\ No newline at end of file
+        return _last_message_at(obj) or obj.updated_at 
\ No newline at end of file
@@ -1,9 +1,58 @@
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.db.models import Q
 from .models import SupportTicket, SupportNotification
-from django.db import models
+from shared.notifications import NotificationTemplate, dispatch, dispatch_many, role_recipients
 
 User = get_user_model()
+Type = SupportNotification.NotificationType
+
+TICKET_CREATED = NotificationTemplate(
+    Type.TICKET_CREATED,
+    "New Support Ticket: {ticket.ticket_id}",
+    "New {ticket.priority} priority ticket from {tenant_name}: {ticket.title}",
+)
+TICKET_RESOLVED = NotificationTemplate(
+    Type.TICKET_RESOLVED,
+    "Ticket Resolved: {ticket.ticket_id}",
+    "Issue ID #{ticket.ticket_id} has been marked resolved by Platform Admin. Please confirm if the problem is solved.",
+)
+TICKET_CLOSED = NotificationTemplate(
+    Type.TICKET_CLOSED,
+    "Ticket Closed: {ticket.ticket_id}",
+    "Support ticket #{ticket.ticket_id} has been closed.",
+)
+TICKET_CLOSED_BY = NotificationTemplate(
+    Type.TICKET_CLOSED,
+    "Ticket Closed: {ticket.ticket_id}",
+    "Support ticket #{ticket.ticket_id} has been closed by {creator_name}.",
+)
+TICKET_REOPENED = NotificationTemplate(
+    Type.TICKET_REOPENED,
+    "Ticket Reopened: {ticket.ticket_id}",
+    "Support ticket #{ticket.ticket_id} has been reopened by {creator_name}. Issue persists.",
+)
+MESSAGE_RECEIVED = NotificationTemplate(
+    Type.MESSAGE_RECEIVED,
+    "New Message: {ticket.ticket_id}",
+    "New message from {sender_name}: {preview}...",
+)
+CALLBACK_REQUESTED = NotificationTemplate(
+    Type.CALLBACK_REQUESTED,
+    "Callback Requested: {ticket.ticket_id}",
+    "Business admin {creator_name} has requested a callback for ticket #{ticket.ticket_id}. "
+    "Phone: {ticket.callback_phone}, Preferred time: {ticket.callback_preferred_time}",
+)
+TICKET_OVERDUE = NotificationTemplate(
+    Type.TICKET_UPDATED,
+    "Overdue Ticket: {ticket.ticket_id}",
+    "Support ticket #{ticket.ticket_id} is overdue for {ticket.priority} priority issue. Please assign and respond.",
+)
+
+
+def platform_admins():
+    """Ids of every platform admin (cached, see shared/notifications.py)"""
+    return role_recipients('platform_admin')
 
 
 class SupportTicketService:
@@ -14,124 +63,66 @@ class SupportTicketService:
     @staticmethod
     def notify_platform_admins(ticket):
         """Send notification to all platform admins about new ticket"""
-        platform_admins = User.objects.filter(role='platform_admin')
-        
-        for admin in platform_admins:
-            SupportNotification.objects.create(
-                ticket=ticket,
-                recipient=admin,
-                notification_type=SupportNotification.NotificationType.TICKET_CREATED,
-                title=f"New Support Ticket: {ticket.ticket_id}",
-                message=f"New {ticket.priority} priority ticket from {ticket.tenant.name}: {ticket.title}"
-            )
+        dispatch(
+            SupportNotification, platform_admins(), TICKET_CREATED,
+            {'ticket': ticket, 'tenant_name': ticket.tenant.name}, ticket_id=ticket.pk
+        )
     
     @staticmethod
     def notify_ticket_resolved(ticket):
         """Notify business admin that ticket has been resolved"""
-        SupportNotification.objects.create(
-            ticket=ticket,
-            recipient=ticket.created_by,
-            notification_type=SupportNotification.NotificationType.TICKET_RESOLVED,
-            title=f"Ticket Resolved: {ticket.ticket_id}",
-            message=f"Issue ID #{ticket.ticket_id} has been marked resolved by Platform Admin. Please confirm if the problem is solved."
-        )
+        dispatch(SupportNotification, [ticket.created_by_id], TICKET_RESOLVED, {'ticket': ticket}, ticket_id=ticket.pk)
     
     @staticmethod
     def notify_ticket_closed(ticket):
         """Notify relevant parties when ticket is closed"""
         # Notify business admin
-        SupportNotification.objects.create(
-            ticket=ticket,
-            recipient=ticket.created_by,
-            notification_type=SupportNotification.NotificationType.TICKET_CLOSED,
-            title=f"Ticket Closed: {ticket.ticket_id}",
-            message=f"Support ticket #{ticket.ticket_id} has been closed."
-        )
+        dispatch(SupportNotification, [ticket.created_by_id], TICKET_CLOSED, {'ticket': ticket}, ticket_id=ticket.pk)
         
         # Notify assigned platform admin if different from closer
-        if ticket.assigned_to and ticket.assigned_to != ticket.created_by:
-            SupportNotification.objects.create(
-                ticket=ticket,
-                recipient=ticket.assigned_to,
-                notification_type=SupportNotification.NotificationType.TICKET_CLOSED,
-                title=f"Ticket Closed: {ticket.ticket_id}",
-                message=f"Support ticket #{ticket.ticket_id} has been closed by {ticket.created_by.get_full_name()}."
+        if ticket.assigned_to_id and ticket.assigned_to_id != ticket.created_by_id:
+            dispatch(
+                SupportNotification, [ticket.assigned_to_id], TICKET_CLOSED_BY,
+                {'ticket': ticket, 'creator_name': ticket.created_by.get_full_name()}, ticket_id=ticket.pk
             )
     
     @staticmethod
     def notify_ticket_reopened(ticket):
         """Notify platform admins when ticket is reopened"""
-        platform_admins = User.objects.filter(role='platform_admin')
-        
-        for admin in platform_admins:
-            SupportNotification.objects.create(
-                ticket=ticket,
-                recipient=admin,
-                notification_type=SupportNotification.NotificationType.TICKET_REOPENED,
-                title=f"Ticket Reopened: {ticket.ticket_id}",
-                message=f"Support ticket #{ticket.ticket_id} has been reopened by {ticket.created_by.get_full_name()}. Issue persists."
-            )
+        dispatch(
+            SupportNotification, platform_admins(), TICKET_REOPENED,
+            {'ticket': ticket, 'creator_name': ticket.created_by.get_full_name()}, ticket_id=ticket.pk
+        )
     
     @staticmethod
     def notify_message_received(ticket, message, specific_recipient=None):
         """Notify relevant parties about new message"""
-        if specific_recipient:
-            # Notify specific recipient (usually business admin)
-            SupportNotification.objects.create(
-                ticket=ticket,
-                recipient=specific_recipient,
-                notification_type=SupportNotification.NotificationType.MESSAGE_RECEIVED,
-                title=f"New Message: {ticket.ticket_id}",
-                message=f"New message from {message.sender.get_full_name()}: {message.content[:100]}..."
-            )
-        else:
-            # Notify all platform admins
-            platform_admins = User.objects.filter(role='platform_admin')
-            
-            for admin in platform_admins:
-                SupportNotification.objects.create(
-                    ticket=ticket,
-                    recipient=admin,
-                    notification_type=SupportNotification.NotificationType.MESSAGE_RECEIVED,
-                    title=f"New Message: {ticket.ticket_id}",
-                    message=f"New message from {message.sender.get_full_name()}: {message.content[:100]}..."
-                )
+        # A specific recipient (usually the business admin), otherwise all platform admins
+        recipients = [specific_recipient] if specific_recipient else platform_admins()
+        dispatch(
+            SupportNotification, recipients, MESSAGE_RECEIVED,
+            {
+                'ticket': ticket,
+                'sender_name': message.sender.get_full_name(),
+                'preview': message.content[:100],
+            },
+            ticket_id=ticket.pk
+        )
     
     @staticmethod
     def notify_callback_requested(ticket):
         """Notify platform admins about callback request"""
-        platform_admins = User.objects.filter(role='platform_admin')
-        
-        for admin in platform_admins:
-            SupportNotification.objects.create(
-                ticket=ticket,
-                recipient=admin,
-                notification_type=SupportNotification.NotificationType.CALLBACK_REQUESTED,
-                title=f"Callback Requested: {ticket.ticket_id}",
-                message=f"Business admin {ticket.created_by.get_full_name()} has requested a callback for ticket #{ticket.ticket_id}. Phone: {ticket.callback_phone}, Preferred time: {ticket.callback_preferred_time}"
-            )
+        dispatch(
+            SupportNotification, platform_admins(), CALLBACK_REQUESTED,
+            {'ticket': ticket, 'creator_name': ticket.created_by.get_full_name()}, ticket_id=ticket.pk
+        )
     
     @staticmethod
     def auto_assign_ticket(ticket):
         """Automatically assign ticket to available platform admin"""
-        # Find platform admin with least assigned tickets
-        platform_admins = User.objects.filter(role='platform_admin')
-        
-        if platform_admins.exists():
-            # Get admin with least assigned tickets
-            admin_with_least_tickets = platform_admins.annotate(
-                assigned_count=SupportTicket.objects.filter(
-                    assigned_to=models.F('id'),
-                    status__in=['open', 'in_progress', 'reopened']
-                ).count()
-            ).order_by('assigned_count').first()
-            
-            ticket.assigned_to = admin_with_least_tickets
-            ticket.save()
-            
-            return admin_with_least_tickets
-        
-        return None
+        # Strategy (least loaded by default) and locking live in assignment.py
+        from .assignment import assign_ticket
+        return assign_ticket(ticket)
     
     @staticmethod
     def check_overdue_tickets():
@@ -147,32 +138,22 @@ class SupportTicketService:
         }
         
         now = timezone.now()
-        overdue_tickets = []
-        
+        overdue = Q()
         for priority, hours in time_limits.items():
-            limit_time = now - timedelta(hours=hours)
-            
-            overdue = SupportTicket.objects.filter(
-                priority=priority,
-                status__in=['open', 'in_progress'],
-                created_at__lt=limit_time,
-                assigned_to__isnull=True  # Only unassigned tickets
-            )
-            
-            overdue_tickets.extend(list(overdue))
-        
-        # Send notifications for overdue tickets
-        for ticket in overdue_tickets:
-            platform_admins = User.objects.filter(role='platform_admin')
-            
-            for admin in platform_admins:
-                SupportNotification.objects.create(
-                    ticket=ticket,
-                    recipient=admin,
-                    notification_type=SupportNotification.NotificationType.TICKET_UPDATED,
-                    title=f"Overdue Ticket: {ticket.ticket_id}",
-                    message=f"Support ticket #{ticket.ticket_id} is overdue for {ticket.priority} priority issue. Please assign and respond."
-                )
+            overdue |= Q(priority=priority, created_at__lt=now - timedelta(hours=hours))
+        
+        overdue_tickets = list(SupportTicket.objects.filter(
+            overdue,
+            status__in=['open', 'in_progress'],
+            assigned_to__isnull=True  # Only unassigned tickets
+        ))
+        
+        # Every admin hears about every overdue ticket, written in bulk
+        admins = platform_admins()
+        dispatch_many(SupportNotification, TICKET_OVERDUE, [
+            (admins, {'ticket': ticket}, {'ticket_id': ticket.pk})
+            for ticket in overdue_tickets
+        ])
         
         return overdue_tickets
     
@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from shared.cache import invalidate_on_save
+from shared.push import PLATFORM, publish_many, tenant_channel
+from shared.search import index_for_search
+from .models import SupportTicket, TicketMessage
+from .stats import record_message
+
+
+@receiver(post_save, sender=TicketMessage)
+def record_ticket_response(sender, instance, created, raw=False, **kwargs):
+    """Stamp first response / resolution times on the ticket for the dashboard"""
+    if raw or not created:
+        return
+    record_message(instance)
+
+
+@receiver(post_save, sender=TicketMessage)
+def push_ticket_message(sender, instance, created, raw=False, **kwargs):
+    """Platform admins see every message, the ticket's tenant all but internal notes"""
+    if raw or not created:
+        return
+    data = {
+        'id': instance.pk,
+        'ticket': instance.ticket_id,
+        'sender': instance.sender_id,
+        'message_type': instance.message_type,
+        'is_internal': instance.is_internal,
+    }
+    channels = [PLATFORM] if instance.is_internal else [PLATFORM, tenant_channel(instance.ticket.tenant_id)]
+    publish_many([(channel, 'support.ticketmessage', data) for channel in channels])
+
+
+invalidate_on_save(SupportTicket, 'support')
+invalidate_on_save(TicketMessage, 'support', tenant_id=lambda message: message.ticket.tenant_id)
+index_for_search(SupportTicket, document=[('title', 'A'), ('summary', 'B')], identifiers=['ticket_id'])
@@ -0,0 +1,174 @@
+"""
+Support ticket response metrics.
+
+A ticket's first platform admin reply is stamped on SupportTicket.first_response_at
+when the message is written (and its first resolution message fills resolved_at
+if the status change didn't), so the dashboard can compute averages, percentiles
+and the priority breakdown in one aggregate over the tickets alone.
+percentile_cont only exists on PostgreSQL; other backends (SQLite in tests)
+interpolate the percentiles in Python from the durations instead.
+backfill_response_times() stamps tickets that predate the columns.
+"""
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import (
+    Aggregate, Avg, Count, DurationField, Exists, ExpressionWrapper, F, Min, OuterRef, Q, Subquery,
+)
+from django.utils import timezone
+
+from .models import SupportTicket, TicketMessage
+
+
+Status = SupportTicket.Status
+OPEN_STATUSES = [Status.OPEN, Status.IN_PROGRESS, Status.REOPENED]
+DONE_STATUSES = [Status.RESOLVED, Status.CLOSED]
+# Same notion of a response as SupportTicket.response_time always had
+RESPONDER_ROLE = 'platform_admin'
+RESOLUTION_MESSAGE = 'resolution'
+PERCENTILES = (0.5, 0.9)
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL percentile_cont(fraction) WITHIN GROUP (ORDER BY expression)"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def percentile(values, fraction):
+    """percentile_cont over a sorted list: linear interpolation between the closest ranks"""
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _duration(end, start='created_at'):
+    return ExpressionWrapper(F(end) - F(start), output_field=DurationField())
+
+
+def _hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration else 0
+
+
+def record_message(message):
+    """Stamp the ticket's first response / resolution time from a newly written message"""
+    if message.message_type == RESOLUTION_MESSAGE:
+        SupportTicket.objects.filter(pk=message.ticket_id, resolved_at__isnull=True).update(
+            resolved_at=message.created_at
+        )
+    if message.sender.role == RESPONDER_ROLE:
+        # Conditional update: only the first reply sets it, without reading the ticket first
+        SupportTicket.objects.filter(pk=message.ticket_id, first_response_at__isnull=True).update(
+            first_response_at=message.created_at
+        )
+
+
+def _first_message_at(condition):
+    return Subquery(
+        TicketMessage.objects.filter(condition, ticket=OuterRef('pk'))
+        .order_by()
+        .values('ticket')
+        .annotate(first=Min('created_at'))
+        .values('first')[:1]
+    )
+
+
+def backfill_response_times(queryset=None):
+    """Fill first_response_at / resolved_at from message history; returns (responses, resolutions) updated"""
+    if queryset is None:
+        queryset = SupportTicket.objects.all()
+
+    response = Q(sender__role=RESPONDER_ROLE)
+    responses = queryset.filter(
+        Exists(TicketMessage.objects.filter(response, ticket=OuterRef('pk'))),
+        first_response_at__isnull=True,
+    ).update(first_response_at=_first_message_at(response))
+
+    resolution = Q(message_type=RESOLUTION_MESSAGE)
+    resolutions = queryset.filter(
+        Exists(TicketMessage.objects.filter(resolution, ticket=OuterRef('pk'))),
+        status__in=DONE_STATUSES,
+        resolved_at__isnull=True,
+    ).update(resolved_at=_first_message_at(resolution))
+    return responses, resolutions
+
+
+def _sorted_durations(queryset, duration):
+    return sorted(queryset.order_by().annotate(duration=duration).values_list('duration', flat=True))
+
+
+def ticket_dashboard_stats(queryset, now=None):
+    """Counts, response/resolution averages and percentiles, and the priority breakdown in one query"""
+    now = now or timezone.now()
+    today_start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    responded = Q(first_response_at__isnull=False)
+    resolved = Q(status__in=DONE_STATUSES, resolved_at__isnull=False)
+    response_time = _duration('first_response_at')
+    resolution_time = _duration('resolved_at')
+
+    aggregates = {
+        'total': Count('id'),
+        'open': Count('id', filter=Q(status__in=OPEN_STATUSES)),
+        'resolved_today': Count('id', filter=Q(
+            status=Status.RESOLVED,
+            resolved_at__gte=today_start,
+            resolved_at__lt=today_start + timedelta(days=1),
+        )),
+        'avg_response': Avg(response_time, filter=responded),
+        'avg_resolution': Avg(resolution_time, filter=resolved),
+    }
+    in_database = connections[queryset.db].vendor == 'postgresql'
+    if in_database:
+        for fraction in PERCENTILES:
+            suffix = int(fraction * 100)
+            aggregates[f'response_p{suffix}'] = PercentileCont(
+                response_time, fraction, filter=responded, output_field=DurationField()
+            )
+            aggregates[f'resolution_p{suffix}'] = PercentileCont(
+                resolution_time, fraction, filter=resolved, output_field=DurationField()
+            )
+    for priority, _ in SupportTicket.Priority.choices:
+        aggregates[f'{priority}_count'] = Count('id', filter=Q(priority=priority))
+        aggregates[f'{priority}_response'] = Avg(response_time, filter=responded & Q(priority=priority))
+
+    totals = queryset.order_by().aggregate(**aggregates)
+    if not in_database:
+        durations = {
+            'response': _sorted_durations(queryset.filter(responded), response_time),
+            'resolution': _sorted_durations(queryset.filter(resolved), resolution_time),
+        }
+        for fraction in PERCENTILES:
+            for name, values in durations.items():
+                totals[f'{name}_p{int(fraction * 100)}'] = percentile(values, fraction)
+
+    return {
+        'total_tickets': totals['total'],
+        'open_tickets': totals['open'],
+        'resolved_today': totals['resolved_today'],
+        'avg_response_hours': _hours(totals['avg_response']),
+        'response_hours_percentiles': {
+            f'p{int(fraction * 100)}': _hours(totals[f'response_p{int(fraction * 100)}'])
+            for fraction in PERCENTILES
+        },
+        'avg_resolution_hours': _hours(totals['avg_resolution']),
+        'resolution_hours_percentiles': {
+            f'p{int(fraction * 100)}': _hours(totals[f'resolution_p{int(fraction * 100)}'])
+            for fraction in PERCENTILES
+        },
+        'priority_breakdown': [
+            {
+                'priority': priority,
+                'count': totals[f'{priority}_count'],
+                'avg_response_hours': _hours(totals[f'{priority}_response']),
+            }
+            for priority, _ in SupportTicket.Priority.choices
+            if totals[f'{priority}_count']
+        ],
+    }
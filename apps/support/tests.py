@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from .assignment import CategoryStrategy, LeastLoadedStrategy, RoundRobinStrategy, assign_ticket
+from .models import SupportSettings, SupportTicket
+from .stats import percentile
+
+
+class PercentileTests(TestCase):
+    def test_interpolates_between_closest_ranks(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 0.5), 2.5)
+        self.assertAlmostEqual(percentile([1, 2, 3, 4], 0.9), 3.7)
+        self.assertEqual(percentile([5], 0.9), 5)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.admin = User.objects.create_user(
+            username='owner', password='x', role='business_admin', tenant=self.tenant
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def make_ticket(self, response_hours=None, **fields):
+        ticket = SupportTicket.objects.create(
+            title='Sync fails', summary='Details', created_by=self.admin, tenant=self.tenant, **fields
+        )
+        if response_hours is not None:
+            SupportTicket.objects.filter(pk=ticket.pk).update(
+                first_response_at=ticket.created_at + timedelta(hours=response_hours)
+            )
+        return ticket
+
+    def test_dashboard_stats_reports_response_percentiles(self):
+        for hours in (1, 2, 3, 4):
+            self.make_ticket(response_hours=hours, priority=SupportTicket.Priority.HIGH)
+        self.make_ticket()
+        resolved = self.make_ticket(response_hours=1, status=SupportTicket.Status.RESOLVED)
+        SupportTicket.objects.filter(pk=resolved.pk).update(resolved_at=resolved.created_at + timedelta(hours=6))
+
+        response = self.api.get('/api/support/tickets/dashboard_stats/')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['total_tickets'], 6)
+        self.assertEqual(response.data['open_tickets'], 5)
+        self.assertEqual(response.data['avg_response_hours'], 2.2)
+        self.assertEqual(response.data['response_hours_percentiles'], {'p50': 2, 'p90': 3.6})
+        self.assertEqual(response.data['resolution_hours_percentiles'], {'p50': 6, 'p90': 6})
+        high = next(row for row in response.data['priority_breakdown'] if row['priority'] == 'high')
+        self.assertEqual(high, {'priority': 'high', 'count': 4, 'avg_response_hours': 2.5})
+
+    def test_dashboard_stats_without_responses(self):
+        self.make_ticket()
+        response = self.api.get('/api/support/tickets/dashboard_stats/')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['response_hours_percentiles'], {'p50': 0, 'p90': 0})
+
+    def test_dashboard_stats_is_scoped_to_the_tenant(self):
+        other = Tenant.objects.create(name='Silver House', slug='silver-house')
+        SupportTicket.objects.create(title='Other', summary='x', created_by=self.admin, tenant=other)
+        self.make_ticket()
+        response = self.api.get('/api/support/tickets/dashboard_stats/')
+        self.assertEqual(response.data['total_tickets'], 1)
+
+
+class AssignmentTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.owner = User.objects.create_user(
+            username='owner', password='x', role='business_admin', tenant=self.tenant
+        )
+        self.alice, self.bob, self.carol = [
+            User.objects.create_user(username=name, password='x', role='platform_admin')
+            for name in ('alice', 'bob', 'carol')
+        ]
+
+    def make_ticket(self, **fields):
+        return SupportTicket.objects.create(
+            title='Sync fails', summary='Details', created_by=self.owner, tenant=self.tenant, **fields
+        )
+
+    def test_least_loaded_picks_the_admin_with_fewest_open_tickets(self):
+        self.make_ticket(assigned_to=self.alice)
+        self.make_ticket(assigned_to=self.bob, status=SupportTicket.Status.CLOSED)
+        self.assertEqual(assign_ticket(self.make_ticket(), LeastLoadedStrategy()), self.bob)
+        self.assertEqual(assign_ticket(self.make_ticket(), LeastLoadedStrategy()), self.carol)
+
+    def test_round_robin_turn_is_kept_in_support_settings(self):
+        SupportSettings.objects.create(tenant=self.tenant)
+        chosen = [assign_ticket(self.make_ticket(), RoundRobinStrategy()) for _ in range(4)]
+        self.assertEqual(chosen, [self.alice, self.bob, self.carol, self.alice])
+        self.assertEqual(SupportSettings.objects.get(tenant=self.tenant).assignment_cursor, 4)
+
+    def test_round_robin_without_settings_starts_from_the_first_admin(self):
+        self.assertEqual(assign_ticket(self.make_ticket(), RoundRobinStrategy()), self.alice)
+
+    @override_settings(SUPPORT_ASSIGNMENT_SKILLS={'billing': ['bob', 'carol']})
+    def test_category_prefers_the_listed_admins(self):
+        self.make_ticket(assigned_to=self.bob)
+        billing = assign_ticket(self.make_ticket(category=SupportTicket.Category.BILLING), CategoryStrategy())
+        technical = assign_ticket(self.make_ticket(category=SupportTicket.Category.TECHNICAL), CategoryStrategy())
+        self.assertEqual((billing, technical), (self.carol, self.alice))
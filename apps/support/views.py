@@ -1,7 +1,7 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
 
@@ -12,6 +12,11 @@ from .serializers import (
     SupportNotificationSerializer, SupportSettingsSerializer
 )
 from .services import SupportTicketService
+from .assignment import auto_assign_enabled
+from .stats import ticket_dashboard_stats
+from .queries import tickets_with_activity, visible_messages
+from shared.cache import cached_payload, user_scope
+from shared.pagination import OldestFirstCursorPagination
 
 
 class SupportTicketViewSet(viewsets.ModelViewSet):
@@ -39,7 +44,6 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         priority_filter = self.request.query_params.get('priority')
         category_filter = self.request.query_params.get('category')
         assigned_to_filter = self.request.query_params.get('assigned_to')
-        search = self.request.query_params.get('search')
         
         if status_filter:
             queryset = queryset.filter(status=status_filter)
@@ -49,14 +53,10 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(category=category_filter)
         if assigned_to_filter:
             queryset = queryset.filter(assigned_to_id=assigned_to_filter)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(summary__icontains=search) | 
-                Q(ticket_id__icontains=search)
-            )
-        
-        return queryset.select_related('created_by', 'assigned_to', 'tenant').prefetch_related('messages')
+        queryset = queryset.select_related('created_by', 'assigned_to', 'tenant')
+        if self.action in ['list', 'retrieve']:
+            queryset = tickets_with_activity(queryset, user)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -69,6 +69,8 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         ticket = serializer.save()
+        if auto_assign_enabled(ticket.tenant):
+            SupportTicketService.auto_assign_ticket(ticket)
         # Create initial system message
         TicketMessage.objects.create(
             ticket=ticket,
@@ -216,6 +218,16 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         
         return Response({'message': 'Ticket reopened successfully'})
 
+    @action(detail=True, methods=['get'])
+    def messages(self, request, pk=None):
+        """The ticket's conversation, oldest first, in cursor pages"""
+        ticket = self.get_object()
+        messages = visible_messages(request.user).filter(ticket=ticket).select_related('sender')
+        paginator = OldestFirstCursorPagination()
+        page = paginator.paginate_queryset(messages, request, view=self)
+        serializer = TicketMessageSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get support dashboard statistics"""
@@ -226,44 +238,16 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         else:
             queryset = SupportTicket.objects.filter(tenant=user.tenant)
         
-        # Calculate stats
-        total_tickets = queryset.count()
-        open_tickets = queryset.filter(status__in=['open', 'in_progress', 'reopened']).count()
-        resolved_today = queryset.filter(
-            status='resolved',
-            resolved_at__date=timezone.now().date()
-        ).count()
-        
-        # Average response time
-        tickets_with_response = queryset.filter(
-            messages__sender__role='platform_admin'
-        ).distinct()
-        
-        total_response_time = 0
-        response_count = 0
-        
-        for ticket in tickets_with_response:
-            first_response = ticket.messages.filter(
-                sender__role='platform_admin'
-            ).order_by('created_at').first()
-            
-            if first_response:
-                response_time = first_response.created_at - ticket.created_at
-                total_response_time += response_time.total_seconds()
-                response_count += 1
-        
-        avg_response_hours = round(total_response_time / 3600 / response_count, 2) if response_count > 0 else 0
-        
-        # Priority breakdown
-        priority_stats = queryset.values('priority').annotate(count=Count('id'))
-        
-        return Response({
-            'total_tickets': total_tickets,
-            'open_tickets': open_tickets,
-            'resolved_today': resolved_today,
-            'avg_response_hours': avg_response_hours,
-            'priority_breakdown': priority_stats
-        })
+        data = cached_payload(
+            user_scope(user), 'support-dashboard', ('support',),
+            lambda: self._build_dashboard_stats(queryset),
+        )
+        return Response(data)
+
+    def _build_dashboard_stats(self, queryset):
+        # Response times are stamped on the tickets (see stats.py), so this is
+        # one aggregate query however many tickets and messages there are
+        return ticket_dashboard_stats(queryset)
 
 
 class TicketMessageViewSet(viewsets.ModelViewSet):
@@ -273,6 +257,7 @@ class TicketMessageViewSet(viewsets.ModelViewSet):
     queryset = TicketMessage.objects.all()
     serializer_class = TicketMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OldestFirstCursorPagination
 
     def get_queryset(self):
         user = self.request.user
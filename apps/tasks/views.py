@@ -15,6 +15,7 @@ from .serializers import (
     TaskDashboardSerializer, GoalDashboardSerializer
 )
 from apps.users.permissions import IsManagerOrHigher, IsBusinessAdminOrHigher
+from shared.pagination import cap_rows
 
 
 class GoalViewSet(viewsets.ModelViewSet):
@@ -86,7 +87,7 @@ class GoalViewSet(viewsets.ModelViewSet):
         elif status_filter == 'overdue':
             queryset = queryset.filter(end_date__lt=timezone.now().date(), is_completed=False)
         
-        serializer = GoalDashboardSerializer(queryset, many=True)
+        serializer = GoalDashboardSerializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -215,7 +216,7 @@ class WorkTaskViewSet(viewsets.ModelViewSet):
         if overdue_filter == 'true':
             queryset = queryset.filter(due_date__lt=timezone.now(), status__in=['pending', 'in_progress'])
         
-        serializer = TaskDashboardSerializer(queryset, many=True)
+        serializer = TaskDashboardSerializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -253,7 +254,7 @@ class WorkTaskViewSet(viewsets.ModelViewSet):
     def my_tasks(self, request):
         """Get current user's tasks."""
         queryset = self.get_queryset().filter(assigned_to=request.user)
-        serializer = TaskDashboardSerializer(queryset, many=True)
+        serializer = TaskDashboardSerializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -264,7 +265,7 @@ class WorkTaskViewSet(viewsets.ModelViewSet):
             due_date__lte=seven_days_from_now,
             status__in=['pending', 'in_progress']
         )
-        serializer = TaskDashboardSerializer(queryset, many=True)
+        serializer = TaskDashboardSerializer(cap_rows(queryset), many=True)
         return Response(serializer.data)
 
 
@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from apps.tenants.models import Tenant
+from shared.search import is_searchable, refresh, searchable_models
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored search vectors (e.g. after a search document changes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', help='Model label, e.g. products.Product (defaults to every searchable model)')
+        parser.add_argument('--tenant', help='Tenant slug (defaults to all tenants)')
+
+    def handle(self, *args, **options):
+        models = searchable_models()
+        if options['model']:
+            try:
+                model = apps.get_model(options['model'])
+            except (LookupError, ValueError):
+                model = None
+            if model is None or not is_searchable(model):
+                self.stdout.write(self.style.ERROR(f"'{options['model']}' is not a searchable model"))
+                return
+            models = [model]
+
+        tenants = Tenant.objects.all()
+        if options['tenant']:
+            tenants = tenants.filter(slug=options['tenant'])
+            if not tenants.exists():
+                self.stdout.write(self.style.ERROR(f"Tenant '{options['tenant']}' not found"))
+                return
+
+        for model in models:
+            queryset = model._default_manager.all()
+            if options['tenant']:
+                queryset = queryset.filter(tenant__in=tenants)
+            updated = refresh(model, queryset)
+            self.stdout.write(f"{model._meta.label}: {updated} rows indexed")
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
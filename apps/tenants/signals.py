@@ -0,0 +1,4 @@
+from shared.cache import invalidate_on_save
+from .models import Tenant
+
+invalidate_on_save(Tenant, 'tenants', tenant_id=lambda tenant: tenant.pk)
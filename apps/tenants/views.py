@@ -11,6 +11,8 @@ from .serializers import TenantSerializer
 from apps.users.permissions import IsRoleAllowed
 from apps.clients.models import Client
 from apps.sales.models import Sale, SalesPipeline
+from apps.sales.pipeline_stats import pipeline_stats
+from shared.cache import ALL_TENANTS, cached_payload
 from apps.products.models import Product
 from apps.users.models import User, TeamMember
 
@@ -93,61 +95,11 @@ class PlatformAdminDashboardView(APIView):
 
     def get(self, request):
         try:
-            # Get date range for analytics (last 30 days)
-            end_date = timezone.now()
-            start_date = end_date - timedelta(days=30)
-            
-            # 1. Total Tenants
-            total_tenants = Tenant.objects.count()
-            active_tenants = Tenant.objects.filter(subscription_status='active').count()
-            
-            # 2. Total Users across all tenants
-            total_users = User.objects.exclude(role=User.Role.PLATFORM_ADMIN).count()
-            
-            # 3. Total Sales across all tenants (last 30 days)
-            total_sales = Sale.objects.filter(
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).aggregate(
-                total=Sum('total_amount'),
-                count=Count('id')
+            data = cached_payload(
+                ALL_TENANTS, 'platform-dashboard', ('sales', 'tenants', 'users'),
+                self._build_dashboard,
             )
-            
-            sales_amount = total_sales['total'] or Decimal('0.00')
-            sales_count = total_sales['count'] or 0
-            
-            # 4. Recent Tenants (last 5 created)
-            recent_tenants = Tenant.objects.order_by('-created_at')[:5]
-            recent_tenants_data = []
-            for tenant in recent_tenants:
-                recent_tenants_data.append({
-                    'id': tenant.id,
-                    'name': tenant.name,
-                    'business_type': tenant.business_type or 'Jewelry Business',
-                    'subscription_status': tenant.subscription_status,
-                    'created_at': tenant.created_at.strftime('%Y-%m-%d'),
-                    'user_count': tenant.users.count()
-                })
-            
-            # 5. System Health Metrics
-            system_health = {
-                'uptime': '99.9%',
-                'active_subscriptions': active_tenants,
-                'total_revenue': float(sales_amount),
-                'support_tickets': 0  # Placeholder for future implementation
-            }
-            
-            return Response({
-                'total_tenants': total_tenants,
-                'active_tenants': active_tenants,
-                'total_users': total_users,
-                'total_sales': {
-                    'amount': float(sales_amount),
-                    'count': sales_count
-                },
-                'recent_tenants': recent_tenants_data,
-                'system_health': system_health
-            })
+            return Response(data)
             
         except Exception as e:
             print(f"Error in PlatformAdminDashboardView: {e}")
@@ -156,6 +108,63 @@ class PlatformAdminDashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _build_dashboard(self):
+        # Get date range for analytics (last 30 days)
+        end_date = timezone.now()
+        start_date = end_date - timedelta(days=30)
+        
+        # 1. Total Tenants
+        total_tenants = Tenant.objects.count()
+        active_tenants = Tenant.objects.filter(subscription_status='active').count()
+        
+        # 2. Total Users across all tenants
+        total_users = User.objects.exclude(role=User.Role.PLATFORM_ADMIN).count()
+        
+        # 3. Total Sales across all tenants (last 30 days)
+        total_sales = Sale.objects.filter(
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).aggregate(
+            total=Sum('total_amount'),
+            count=Count('id')
+        )
+        
+        sales_amount = total_sales['total'] or Decimal('0.00')
+        sales_count = total_sales['count'] or 0
+        
+        # 4. Recent Tenants (last 5 created)
+        recent_tenants = Tenant.objects.order_by('-created_at')[:5]
+        recent_tenants_data = []
+        for tenant in recent_tenants:
+            recent_tenants_data.append({
+                'id': tenant.id,
+                'name': tenant.name,
+                'business_type': tenant.business_type or 'Jewelry Business',
+                'subscription_status': tenant.subscription_status,
+                'created_at': tenant.created_at.strftime('%Y-%m-%d'),
+                'user_count': tenant.users.count()
+            })
+        
+        # 5. System Health Metrics
+        system_health = {
+            'uptime': '99.9%',
+            'active_subscriptions': active_tenants,
+            'total_revenue': float(sales_amount),
+            'support_tickets': 0  # Placeholder for future implementation
+        }
+        
+        return {
+            'total_tenants': total_tenants,
+            'active_tenants': active_tenants,
+            'total_users': total_users,
+            'total_sales': {
+                'amount': float(sales_amount),
+                'count': sales_count
+            },
+            'recent_tenants': recent_tenants_data,
+            'system_health': system_health
+        }
+
 
 class BusinessDashboardView(APIView):
     """Business Admin Dashboard - Provides real data for the dashboard"""
@@ -168,162 +177,11 @@ class BusinessDashboardView(APIView):
         if not tenant:
             return Response({'error': 'No tenant associated with user'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get date range for analytics (last 30 days)
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=30)
-        
         try:
-            # 1. Total Sales (last 30 days)
-            total_sales = Sale.objects.filter(
-                tenant=tenant,
-                created_at__gte=start_date,
-                created_at__lte=end_date
-            ).aggregate(
-                total=Sum('total_amount'),
-                count=Count('id')
-            )
-            
-            sales_amount = total_sales['total'] or Decimal('0.00')
-            sales_count = total_sales['count'] or 0
-            
-            # 2. Active Customers (customers with recent activity)
-            active_customers = Client.objects.filter(
-                tenant=tenant,
-                updated_at__gte=start_date
-            ).count()
-            
-            # 3. Total Products
-            total_products = Product.objects.filter(tenant=tenant).count()
-            
-            # 4. Team Members
-            team_members = User.objects.filter(
-                tenant=tenant,
-                is_active=True
-            ).exclude(role=User.Role.PLATFORM_ADMIN).count()
-            
-            # 5. Sales Pipeline Metrics
-            pipeline_data = SalesPipeline.objects.filter(tenant=tenant).values('stage').annotate(
-                count=Count('id')
+            dashboard_data = cached_payload(
+                tenant.pk, 'business-dashboard', ('sales', 'clients', 'products', 'users'),
+                lambda: self._build_dashboard(tenant),
             )
-            
-            # Initialize pipeline counts
-            pipeline_counts = {
-                'leads': 0,
-                'qualified': 0,
-                'proposals': 0,
-                'negotiations': 0,
-                'closed': 0
-            }
-            
-            # Map pipeline stages to dashboard categories
-            for item in pipeline_data:
-                stage = item['stage']
-                count = item['count']
-                
-                if stage in ['lead']:
-                    pipeline_counts['leads'] += count
-                elif stage in ['contacted', 'qualified']:
-                    pipeline_counts['qualified'] += count
-                elif stage in ['proposal']:
-                    pipeline_counts['proposals'] += count
-                elif stage in ['negotiation']:
-                    pipeline_counts['negotiations'] += count
-                elif stage in ['closed_won', 'closed_lost']:
-                    pipeline_counts['closed'] += count
-            
-            # 6. Recent Sales (last 10 sales)
-            recent_sales = Sale.objects.filter(
-                tenant=tenant
-            ).select_related('client').order_by('-created_at')[:10]
-            
-            recent_sales_data = []
-            for sale in recent_sales:
-                recent_sales_data.append({
-                    'id': sale.id,
-                    'client_name': sale.client.full_name if sale.client else 'Unknown',
-                    'amount': float(sale.total_amount),
-                    'status': sale.status,
-                    'date': sale.created_at.strftime('%Y-%m-%d'),
-                    'items_count': sale.items.count() if hasattr(sale, 'items') else 1
-                })
-            
-            # 7. Recent Activity (last 10 activities)
-            recent_activities = []
-            
-            # Add recent sales as activities
-            for sale in recent_sales[:5]:
-                recent_activities.append({
-                    'type': 'sale',
-                    'title': f'New sale to {sale.client.full_name if sale.client else "Unknown"}',
-                    'description': f'Sale of ₹{sale.total_amount}',
-                    'date': sale.created_at.strftime('%Y-%m-%d %H:%M'),
-                    'amount': float(sale.total_amount)
-                })
-            
-            # Add recent pipeline activities
-            recent_pipelines = SalesPipeline.objects.filter(
-                tenant=tenant
-            ).select_related('client').order_by('-updated_at')[:5]
-            
-            for pipeline in recent_pipelines:
-                recent_activities.append({
-                    'type': 'pipeline',
-                    'title': f'Pipeline: {pipeline.title}',
-                    'description': f'{pipeline.client.full_name} - {pipeline.get_stage_display()} (₹{pipeline.expected_value})',
-                    'date': pipeline.updated_at.strftime('%Y-%m-%d %H:%M'),
-                    'amount': float(pipeline.expected_value)
-                })
-            
-            # Add recent customer additions
-            recent_customers = Client.objects.filter(
-                tenant=tenant
-            ).order_by('-created_at')[:5]
-            
-            for customer in recent_customers:
-                recent_activities.append({
-                    'type': 'customer',
-                    'title': f'New customer: {customer.full_name}',
-                    'description': f'Customer added to database',
-                    'date': customer.created_at.strftime('%Y-%m-%d %H:%M'),
-                    'amount': None
-                })
-            
-            # Sort activities by date
-            recent_activities.sort(key=lambda x: x['date'], reverse=True)
-            recent_activities = recent_activities[:10]
-            
-            # 8. Growth metrics
-            previous_period_start = start_date - timedelta(days=30)
-            previous_sales = Sale.objects.filter(
-                tenant=tenant,
-                created_at__gte=previous_period_start,
-                created_at__lt=start_date
-            ).aggregate(total=Sum('total_amount'))
-            
-            previous_sales_amount = previous_sales['total'] or Decimal('0.00')
-            sales_growth = 0
-            if previous_sales_amount > 0:
-                sales_growth = ((sales_amount - previous_sales_amount) / previous_sales_amount) * 100
-            
-            # Prepare response data
-            dashboard_data = {
-                'metrics': {
-                    'total_sales': float(sales_amount),
-                    'sales_count': sales_count,
-                    'active_customers': active_customers,
-                    'total_products': total_products,
-                    'team_members': team_members,
-                    'sales_growth': round(sales_growth, 2)
-                },
-                'pipeline': pipeline_counts,
-                'recent_sales': recent_sales_data,
-                'recent_activities': recent_activities,
-                'period': {
-                    'start_date': start_date.strftime('%Y-%m-%d'),
-                    'end_date': end_date.strftime('%Y-%m-%d')
-                }
-            }
-            
             return Response(dashboard_data)
             
         except Exception as e:
@@ -385,3 +243,143 @@ class BusinessDashboardView(APIView):
                     'end_date': now.strftime('%Y-%m-%d')
                 }
             })
+
+    def _build_dashboard(self, tenant):
+        # Get date range for analytics (last 30 days)
+        end_date = timezone.now()
+        start_date = end_date - timedelta(days=30)
+        
+        # 1. Total Sales (last 30 days)
+        total_sales = Sale.objects.filter(
+            tenant=tenant,
+            created_at__gte=start_date,
+            created_at__lte=end_date
+        ).aggregate(
+            total=Sum('total_amount'),
+            count=Count('id')
+        )
+        
+        sales_amount = total_sales['total'] or Decimal('0.00')
+        sales_count = total_sales['count'] or 0
+        
+        # 2. Active Customers (customers with recent activity)
+        active_customers = Client.objects.filter(
+            tenant=tenant,
+            updated_at__gte=start_date
+        ).count()
+        
+        # 3. Total Products
+        total_products = Product.objects.filter(tenant=tenant).count()
+        
+        # 4. Team Members
+        team_members = User.objects.filter(
+            tenant=tenant,
+            is_active=True
+        ).exclude(role=User.Role.PLATFORM_ADMIN).count()
+        
+        # 5. Sales Pipeline Metrics
+        pipeline = pipeline_stats(tenant)
+        
+        # Map pipeline stages to dashboard categories
+        pipeline_counts = {
+            'leads': pipeline.count('lead'),
+            'qualified': pipeline.count('contacted') + pipeline.count('qualified'),
+            'proposals': pipeline.count('proposal'),
+            'negotiations': pipeline.count('negotiation'),
+            'closed': pipeline.count('closed_won') + pipeline.count('closed_lost'),
+        }
+        
+        # 6. Recent Sales (last 10 sales)
+        recent_sales = Sale.objects.filter(
+            tenant=tenant
+        ).select_related('client').order_by('-created_at')[:10]
+        
+        recent_sales_data = []
+        for sale in recent_sales:
+            recent_sales_data.append({
+                'id': sale.id,
+                'client_name': sale.client.full_name if sale.client else 'Unknown',
+                'amount': float(sale.total_amount),
+                'status': sale.status,
+                'date': sale.created_at.strftime('%Y-%m-%d'),
+                'items_count': sale.items.count() if hasattr(sale, 'items') else 1
+            })
+        
+        # 7. Recent Activity (last 10 activities)
+        recent_activities = []
+        
+        # Add recent sales as activities
+        for sale in recent_sales[:5]:
+            recent_activities.append({
+                'type': 'sale',
+                'title': f'New sale to {sale.client.full_name if sale.client else "Unknown"}',
+                'description': f'Sale of ₹{sale.total_amount}',
+                'date': sale.created_at.strftime('%Y-%m-%d %H:%M'),
+                'amount': float(sale.total_amount)
+            })
+        
+        # Add recent pipeline activities
+        recent_pipelines = SalesPipeline.objects.filter(
+            tenant=tenant
+        ).select_related('client').order_by('-updated_at')[:5]
+        
+        for pipeline in recent_pipelines:
+            recent_activities.append({
+                'type': 'pipeline',
+                'title': f'Pipeline: {pipeline.title}',
+                'description': f'{pipeline.client.full_name} - {pipeline.get_stage_display()} (₹{pipeline.expected_value})',
+                'date': pipeline.updated_at.strftime('%Y-%m-%d %H:%M'),
+                'amount': float(pipeline.expected_value)
+            })
+        
+        # Add recent customer additions
+        recent_customers = Client.objects.filter(
+            tenant=tenant
+        ).order_by('-created_at')[:5]
+        
+        for customer in recent_customers:
+            recent_activities.append({
+                'type': 'customer',
+                'title': f'New customer: {customer.full_name}',
+                'description': f'Customer added to database',
+                'date': customer.created_at.strftime('%Y-%m-%d %H:%M'),
+                'amount': None
+            })
+        
+        # Sort activities by date
+        recent_activities.sort(key=lambda x: x['date'], reverse=True)
+        recent_activities = recent_activities[:10]
+        
+        # 8. Growth metrics
+        previous_period_start = start_date - timedelta(days=30)
+        previous_sales = Sale.objects.filter(
+            tenant=tenant,
+            created_at__gte=previous_period_start,
+            created_at__lt=start_date
+        ).aggregate(total=Sum('total_amount'))
+        
+        previous_sales_amount = previous_sales['total'] or Decimal('0.00')
+        sales_growth = 0
+        if previous_sales_amount > 0:
+            sales_growth = ((sales_amount - previous_sales_amount) / previous_sales_amount) * 100
+        
+        # Prepare response data
+        dashboard_data = {
+            'metrics': {
+                'total_sales': float(sales_amount),
+                'sales_count': sales_count,
+                'active_customers': active_customers,
+                'total_products': total_products,
+                'team_members': team_members,
+                'sales_growth': round(sales_growth, 2)
+            },
+            'pipeline': pipeline_counts,
+            'recent_sales': recent_sales_data,
+            'recent_activities': recent_activities,
+            'period': {
+                'start_date': start_date.strftime('%Y-%m-%d'),
+                'end_date': end_date.strftime('%Y-%m-%d')
+            }
+        }
+        
+        return dashboard_data
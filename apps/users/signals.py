@@ -0,0 +1,4 @@
+from shared.cache import invalidate_on_save
+from .models import User
+
+invalidate_on_save(User, 'users')
@@ -8,6 +8,23 @@ echo "🚀 Starting build process..."
 echo "📦 Installing dependencies..."
 pip install -r requirements.txt
 
+# Fails the build on deployment errors, e.g. a per-process cache without REDIS_URL
+echo "🔍 Checking deployment settings..."
+python manage.py check --deploy --fail-level ERROR
+
+# Clients migration 0019 adds unique constraints over normalized email and phone
+# and refuses to run over live duplicates. On the deploy that first applies it,
+# bring everything else up to date, merge the duplicates (each merge is audited),
+# then let the migrate below add the constraints.
+if python manage.py showmigrations clients | grep '\[ \] 0019_client_identity_constraints' > /dev/null; then
+    echo "🧹 Merging duplicate clients before adding their unique constraints..."
+    python manage.py migrate clients 0018_client_identity_backfill --noinput
+    for app in users stores sales products integrations analytics automation tasks escalation feedback announcements marketing support telecalling tenants; do
+        python manage.py migrate "$app" --noinput
+    done
+    python manage.py dedupe_clients
+fi
+
 # Force migrations if environment variable is set
 if [ "$FORCE_MIGRATE" = "true" ]; then
     echo "🔄 Force migrating database..."
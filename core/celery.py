@@ -0,0 +1,19 @@
+"""
+Celery application for Jewelry CRM project.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+
+# All CELERY_* values in core/settings.py configure this app
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Picks up tasks.py from every installed app
+app.autodiscover_tasks()
+# Notification delivery task lives outside the apps
+app.autodiscover_tasks(['shared'], related_name='notifications')
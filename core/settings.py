@@ -2,6 +2,7 @@
 Django settings for Jewelry CRM project.
 """
 
+import json
 import os
 from pathlib import Path
 from decouple import config
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -57,6 +59,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'shared.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -64,6 +67,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.clients.middleware.AuditLogMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,6 +95,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'core.wsgi.application'
+# Production serves core.asgi under gunicorn's uvicorn worker (render.yaml, Dockerfile)
+ASGI_APPLICATION = 'core.asgi.application'
 
 # Database
 import dj_database_url
@@ -163,14 +169,27 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
+        'shared.search.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'shared.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Most rows any list response may carry, whatever page_size is requested
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+# Lists the planner expects to be smaller than this are counted exactly even when estimates are on
+PAGINATION_EXACT_COUNT_LIMIT = config('PAGINATION_EXACT_COUNT_LIMIT', default=10000, cast=int)
+
+# Request instrumentation (shared/instrumentation.py): samples kept per endpoint,
+# SQL query budgets per view name, bearer token for /api/metrics/prometheus/
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_WINDOW = config('METRICS_WINDOW', default=1000, cast=int)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=30, cast=int)
+QUERY_BUDGETS = {}  # e.g. {'client-list': 10}
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -212,6 +231,47 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 
+# Cache
+# Redis when REDIS_URL is set, a per-process local-memory cache otherwise
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'crm',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'crm-default',
+        }
+    }
+
+# Seconds a cached dashboard payload lives; writes invalidate it earlier (see shared/cache.py)
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60, cast=int)
+
+# Write notification rows from a Celery worker after the request commits (see shared/notifications.py)
+NOTIFICATIONS_ASYNC = config('NOTIFICATIONS_ASYNC', default=False, cast=bool)
+
+# How new support tickets pick a platform admin: least_loaded, round_robin or category (see apps/support/assignment.py)
+SUPPORT_ASSIGNMENT_STRATEGY = config('SUPPORT_ASSIGNMENT_STRATEGY', default='least_loaded')
+# For the category strategy, as JSON: {"category": ["platform admin username", ...]}
+SUPPORT_ASSIGNMENT_SKILLS = config('SUPPORT_ASSIGNMENT_SKILLS', default='{}', cast=json.loads)
+
+# Server push (shared/push.py): events kept per channel for Last-Event-ID resume, idle keepalive interval
+PUSH_STREAM_MAXLEN = config('PUSH_STREAM_MAXLEN', default=1000, cast=int)
+PUSH_HEARTBEAT_SECONDS = config('PUSH_HEARTBEAT_SECONDS', default=15, cast=int)
+# Seconds a stream stays open before it ends and EventSource reconnects with Last-Event-ID
+PUSH_STREAM_MAX_SECONDS = config('PUSH_STREAM_MAX_SECONDS', default=300, cast=int)
+# Seconds a single-use stream ticket (POST /api/push/ticket/) stays valid
+PUSH_TICKET_SECONDS = config('PUSH_TICKET_SECONDS', default=30, cast=int)
+# Serve streams from the in-process broker when REDIS_URL is unset; it only
+# reaches subscribers of the publishing process, so it is for runserver and tests
+PUSH_MEMORY_BROKER = config('PUSH_MEMORY_BROKER', default=DEBUG, cast=bool)
+
 # Celery Configuration
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379/0')
@@ -219,6 +279,69 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Run tasks inline (no broker needed), e.g. for tests: CELERY_TASK_ALWAYS_EAGER=True, CELERY_BROKER_URL=memory://
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TASK_TRACK_STARTED = True
+
+# Periodic tasks (run `celery -A core beat`, or a worker started with -B)
+from celery.schedules import crontab
+CELERY_BEAT_SCHEDULE = {
+    'refresh-time-dependent-client-tags': {
+        'task': 'apps.clients.tasks.refresh_time_dependent_tags',
+        'schedule': crontab(hour=0, minute=15),
+    },
+    'maintain-client-audit-logs': {
+        'task': 'apps.clients.tasks.maintain_audit_logs',
+        'schedule': crontab(hour=1, minute=0),
+    },
+    'reconcile-business-metrics': {
+        'task': 'apps.analytics.tasks.reconcile_business_metrics',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'sync-announcement-unread': {
+        'task': 'apps.announcements.tasks.sync_announcement_unread',
+        'schedule': crontab(),
+    },
+    'reconcile-unread-counters': {
+        'task': 'apps.announcements.tasks.reconcile_unread_counters',
+        'schedule': crontab(hour=2, minute=0),
+    },
+}
+
+# Client audit logs older than this many months are archived to storage and removed
+AUDIT_LOG_RETENTION_MONTHS = config('AUDIT_LOG_RETENTION_MONTHS', default=12, cast=int)
+
+# Phone numbers entered without a country code belong to this one (see apps/clients/identity.py)
+PHONE_DEFAULT_COUNTRY_CODE = config('PHONE_DEFAULT_COUNTRY_CODE', default='91')
+
+# File Storage
+# Import/export artifacts go to S3 when a bucket is configured, local media otherwise
+AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME', default='')
+if AWS_STORAGE_BUCKET_NAME:
+    AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
+    AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
+    AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME', default=None)
+    AWS_DEFAULT_ACL = None
+    AWS_QUERYSTRING_AUTH = True
+    DEFAULT_STORAGE_BACKEND = 'storages.backends.s3.S3Storage'
+else:
+    DEFAULT_STORAGE_BACKEND = 'django.core.files.storage.FileSystemStorage'
+
+# Background import/export jobs pass files between the web service and the Celery
+# worker, so they need storage both can read: S3, inline (eager) tasks, or a
+# MEDIA_ROOT on a disk shared by both (SHARED_MEDIA_ROOT=True)
+SHARED_MEDIA_ROOT = config('SHARED_MEDIA_ROOT', default=False, cast=bool)
+IMPORT_EXPORT_JOBS_ENABLED = bool(AWS_STORAGE_BUCKET_NAME) or CELERY_TASK_ALWAYS_EAGER or SHARED_MEDIA_ROOT
+
+STORAGES = {
+    'default': {
+        'BACKEND': DEFAULT_STORAGE_BACKEND,
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
 
 # API Documentation
 SPECTACULAR_SETTINGS = {
@@ -6,6 +6,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from shared.metrics import MetricsView, prometheus_metrics
+from shared.sse import StreamTicketView, event_stream
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -33,6 +35,14 @@ urlpatterns = [
     path('api/marketing/', include('apps.marketing.urls')),
     path('api/support/', include('apps.support.urls')),
     path('api/business-admin/dashboard/', include('apps.tenants.urls')),
+    
+    # Server-Sent Events push stream (served by core.asgi)
+    path('api/push/ticket/', StreamTicketView.as_view(), name='push-ticket'),
+    path('api/push/stream/', event_stream, name='push-stream'),
+    
+    # Request metrics (platform admins / Prometheus)
+    path('api/metrics/', MetricsView.as_view(), name='request-metrics'),
+    path('api/metrics/prometheus/', prometheus_metrics, name='request-metrics-prometheus'),
 ]
 
 # Serve static and media files in development
@@ -0,0 +1,134 @@
+"""
+Tenant-scoped cache for dashboard payloads.
+
+Every (tenant, domain) pair - e.g. (7, 'sales') - has a version number in the
+cache. Payload keys embed the versions of the domains they were built from,
+so a write that bumps a domain's version makes every dependent payload
+unreachable at once; nothing has to be deleted key by key. Each app's
+signals.py registers the models its dashboards read with
+invalidate_on_save(), which bumps after the write commits. Payloads also
+expire after DASHBOARD_CACHE_TIMEOUT seconds as a backstop for writes that
+bypass signals (queryset.update(), raw SQL).
+
+Versions only invalidate payloads cached by processes that see the bump,
+so production needs a cache shared by every web process and the Celery
+worker (REDIS_URL). `check --deploy` reports a per-process cache as an error.
+
+Platform-wide views use the ALL_TENANTS scope, which is bumped together
+with every tenant's version.
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Error, Tags, register
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+
+# Backends whose contents (and so versions) live in a single process
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+ALL_TENANTS = 'all'
+# Users without a tenant see tenant-filtered dashboards empty; kept apart from ALL_TENANTS
+NO_TENANT = 'none'
+
+
+def _version_key(scope, domain):
+    return f'dash:v:{scope}:{domain}'
+
+
+def _initial_version():
+    # Time-based so a version evicted from the cache never restarts below
+    # a value that payload keys were already built with
+    return time.time_ns() // 1000
+
+
+def get_versions(scope, domains):
+    """Current version of each domain for the scope, in the order given"""
+    keys = [_version_key(scope, domain) for domain in domains]
+    found = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def bump(tenant_id, *domains):
+    """Invalidate every cached payload built from these domains for the tenant (and platform-wide)"""
+    scopes = [ALL_TENANTS] if tenant_id is None else [tenant_id, ALL_TENANTS]
+    for scope in scopes:
+        for domain in domains:
+            key = _version_key(scope, domain)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_on_commit(tenant_id, *domains):
+    """bump() once the current transaction commits, so readers can't re-cache pre-write data"""
+    transaction.on_commit(partial(bump, tenant_id, *domains))
+
+
+def cached_payload(scope, name, domains, build, variant='', timeout=None):
+    """
+    Return the cached payload `name` for the scope, calling build() on a miss.
+    `variant` separates payloads of the same dashboard that differ per user
+    or per query parameter. The payload must be picklable (no querysets).
+    """
+    versions = get_versions(scope, domains)
+    key = f"dash:{scope}:{name}:{variant}:{'.'.join(str(version) for version in versions)}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, timeout or settings.DASHBOARD_CACHE_TIMEOUT)
+    return payload
+
+
+def tenant_scope(tenant):
+    """Cache scope of data filtered to one tenant"""
+    return tenant.pk if tenant is not None else NO_TENANT
+
+
+def user_scope(user):
+    """Cache scope of a user's dashboards: their tenant, or all tenants for platform admins"""
+    if getattr(user, 'role', None) == 'platform_admin':
+        return ALL_TENANTS
+    return tenant_scope(user.tenant)
+
+
+def invalidate_on_save(model, *domains, tenant_id=None):
+    """
+    Bump the domains' versions whenever an instance of `model` is saved or
+    deleted. `tenant_id` maps an instance to its tenant id (defaults to
+    instance.tenant_id).
+    """
+    get_tenant_id = tenant_id or (lambda instance: instance.tenant_id)
+
+    def handler(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        bump_on_commit(get_tenant_id(instance), *domains)
+
+    uid = f"dashboard-cache:{model._meta.label}:{','.join(domains)}"
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Version bumps from other processes never reach a per-process cache"""
+    if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_BACKENDS:
+        return [Error(
+            'The default cache is local to each process, so dashboard payloads stay stale '
+            'after writes made by other workers or Celery tasks.',
+            hint='Set REDIS_URL.',
+            id='shared.E001',
+        )]
+    return []
@@ -0,0 +1,250 @@
+"""
+Per-endpoint request instrumentation.
+
+RequestMetricsMiddleware measures every request resolved to a view and
+records four values for it:
+- the number of SQL queries
+- the time spent in the database
+- the time spent producing top-level serializer .data
+- the total latency
+
+Each sample is tagged with the view name and the user's tenant. The last
+METRICS_WINDOW samples per endpoint are kept in Redis when REDIS_URL is set
+and in process memory otherwise. summarize() turns them into rolling
+percentiles for the admin endpoint and the Prometheus exposition (see
+shared/metrics.py).
+
+A request that runs more queries than its endpoint's budget (QUERY_BUDGETS,
+falling back to QUERY_BUDGET_DEFAULT) is logged and counted, so an N+1
+shows up as soon as the endpoint is hit.
+"""
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+QUANTILES = (0.5, 0.9, 0.99)
+# Sample tuple layout
+TOTAL, DB, SERIALIZER, QUERIES, TENANT, STATUS = range(6)
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - start
+
+
+def _timed_data(prop):
+    @wraps(prop.fget)
+    def data(self):
+        metrics = _current.get()
+        if metrics is None:
+            return prop.fget(self)
+        start = perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            metrics.serializer_time += perf_counter() - start
+    data.timed = True
+    return property(data)
+
+
+def install_serializer_timing():
+    """Time .data of top-level serializers; nested ones never go through .data"""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.data.fget, 'timed', False):
+            cls.data = _timed_data(cls.data)
+
+
+def query_budget(endpoint):
+    return settings.QUERY_BUDGETS.get(endpoint, settings.QUERY_BUDGET_DEFAULT)
+
+
+class MemoryStore:
+    """Per-process sample windows; each worker reports only its own requests"""
+
+    def __init__(self, window):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.requests = defaultdict(int)
+        self.over_budget = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, sample, over_budget):
+        with self.lock:
+            self.samples[endpoint].append(sample)
+            self.requests[endpoint] += 1
+            self.over_budget[endpoint] += int(over_budget)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                endpoint: (list(samples), self.requests[endpoint], self.over_budget[endpoint])
+                for endpoint, samples in self.samples.items()
+            }
+
+
+class RedisStore:
+    """Sample windows in capped Redis lists shared by every worker"""
+    prefix = 'metrics'
+
+    def __init__(self, url, window):
+        import redis
+
+        self.window = window
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+
+    def record(self, endpoint, sample, over_budget):
+        key = f'{self.prefix}:{endpoint}'
+        pipe = self.client.pipeline(transaction=False)
+        pipe.sadd(f'{self.prefix}:endpoints', endpoint)
+        pipe.lpush(f'{key}:samples', json.dumps(sample))
+        pipe.ltrim(f'{key}:samples', 0, self.window - 1)
+        pipe.incr(f'{key}:requests')
+        if over_budget:
+            pipe.incr(f'{key}:over_budget')
+        pipe.execute()
+
+    def snapshot(self):
+        endpoints = sorted(self.client.smembers(f'{self.prefix}:endpoints'))
+        pipe = self.client.pipeline(transaction=False)
+        for endpoint in endpoints:
+            key = f'{self.prefix}:{endpoint}'
+            pipe.lrange(f'{key}:samples', 0, -1)
+            pipe.get(f'{key}:requests')
+            pipe.get(f'{key}:over_budget')
+        results = pipe.execute()
+        return {
+            endpoint: (
+                [json.loads(sample) for sample in results[index * 3]],
+                int(results[index * 3 + 1] or 0),
+                int(results[index * 3 + 2] or 0),
+            )
+            for index, endpoint in enumerate(endpoints)
+        }
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        if settings.REDIS_URL:
+            _store = RedisStore(settings.REDIS_URL, settings.METRICS_WINDOW)
+        else:
+            _store = MemoryStore(settings.METRICS_WINDOW)
+    return _store
+
+
+def _percentiles(values):
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    return {
+        quantile: ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+        for quantile in QUANTILES
+    }
+
+
+def summarize(tenant_id=None):
+    """Rolling percentiles per endpoint, optionally over one tenant's samples only"""
+    summary = {}
+    for endpoint, (samples, requests, over_budget) in get_store().snapshot().items():
+        if tenant_id is not None:
+            samples = [sample for sample in samples if sample[TENANT] == tenant_id]
+        if not samples:
+            continue
+        budget = query_budget(endpoint)
+        summary[endpoint] = {
+            'requests': requests,
+            'over_budget': over_budget,
+            'query_budget': budget,
+            'window': len(samples),
+            'errors': sum(1 for sample in samples if sample[STATUS] >= 500),
+            'latency': _percentiles(sample[TOTAL] for sample in samples),
+            'db_time': _percentiles(sample[DB] for sample in samples),
+            'serializer_time': _percentiles(sample[SERIALIZER] for sample in samples),
+            'queries': _percentiles(sample[QUERIES] for sample in samples),
+            'max_queries': max(sample[QUERIES] for sample in samples),
+        }
+        summary[endpoint]['flagged'] = summary[endpoint]['max_queries'] > budget
+    return summary
+
+
+class RequestMetricsMiddleware:
+    """Records query count and timings of each request against its view name"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_count_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        # Unresolved URLs and long-lived streams would only skew the numbers
+        if match is None or isinstance(response, StreamingHttpResponse):
+            return response
+        self.record(request, match.view_name or match._func_path, metrics, total, response.status_code)
+        return response
+
+    def record(self, request, endpoint, metrics, total, status_code):
+        budget = query_budget(endpoint)
+        over_budget = metrics.queries > budget
+        if over_budget:
+            logger.warning(
+                'Query budget exceeded: %s %s ran %d queries (budget %d)',
+                request.method, endpoint, metrics.queries, budget,
+            )
+        # DRF authenticates inside the view and copies the user back onto the request
+        tenant_id = getattr(getattr(request, 'user', None), 'tenant_id', None)
+        sample = [
+            round(total, 6), round(metrics.db_time, 6), round(metrics.serializer_time, 6),
+            metrics.queries, tenant_id, status_code,
+        ]
+        try:
+            get_store().record(endpoint, sample, over_budget)
+        except Exception:
+            # Metrics must never fail the request they describe
+            logger.exception('Could not record request metrics for %s', endpoint)
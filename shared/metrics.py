@@ -0,0 +1,72 @@
+"""
+Request metrics endpoints (data from shared/instrumentation.py).
+
+GET /api/metrics/ returns the per-endpoint summary as JSON. It is for
+platform admins; ?tenant=<id> restricts the summary to one tenant's
+requests and ?flagged=1 to endpoints over their query budget.
+
+GET /api/metrics/prometheus/ serves the same numbers in the Prometheus text
+format. Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`.
+The endpoint is disabled while METRICS_TOKEN is empty.
+"""
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.users.permissions import IsRoleAllowed
+from .instrumentation import QUANTILES, summarize
+
+
+class MetricsView(APIView):
+    permission_classes = [IsRoleAllowed.for_roles(['platform_admin'])]
+
+    def get(self, request):
+        tenant = request.query_params.get('tenant')
+        summary = summarize(int(tenant) if tenant and tenant.isdigit() else None)
+        if request.query_params.get('flagged'):
+            summary = {endpoint: stats for endpoint, stats in summary.items() if stats['flagged']}
+        return Response(summary)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(summary):
+    lines = []
+    summaries = (
+        ('crm_request_duration_seconds', 'latency', 'Request latency'),
+        ('crm_request_db_seconds', 'db_time', 'Time spent in SQL per request'),
+        ('crm_request_serializer_seconds', 'serializer_time', 'Time spent serializing per request'),
+        ('crm_request_queries', 'queries', 'SQL queries per request'),
+    )
+    for name, field, description in summaries:
+        lines += [f'# HELP {name} {description} (recent window)', f'# TYPE {name} summary']
+        for endpoint, stats in summary.items():
+            for quantile in QUANTILES:
+                lines.append(
+                    f'{name}{{endpoint="{_label(endpoint)}",quantile="{quantile}"}} {stats[field][quantile]}'
+                )
+            lines.append(f'{name}_count{{endpoint="{_label(endpoint)}"}} {stats["window"]}')
+
+    counters = (
+        ('crm_requests_total', 'requests', 'counter', 'Requests recorded'),
+        ('crm_query_budget_exceeded_total', 'over_budget', 'counter', 'Requests over the query budget'),
+        ('crm_query_budget', 'query_budget', 'gauge', 'Query budget'),
+    )
+    for name, field, kind, description in counters:
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        for endpoint, stats in summary.items():
+            lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {stats[field]}')
+    return '\n'.join(lines) + '\n'
+
+
+def prometheus_metrics(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(render_prometheus(summarize()), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,128 @@
+"""
+Bulk notification dispatch.
+
+A notification is rendered once from a NotificationTemplate (str.format()
+strings over a context) and written for every recipient with bulk_create,
+so telling N admins about M tickets costs a handful of INSERTs instead of
+N x M. Recipient sets by role are cached per tenant and invalidated through
+the 'users' domain of shared/cache.py whenever a user is saved. With
+NOTIFICATIONS_ASYNC the rows are written by a Celery worker once the
+current transaction commits. Written rows are pushed to their recipients
+(see shared/push.py).
+"""
+from dataclasses import dataclass
+from functools import partial
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache import ALL_TENANTS, get_versions
+from .push import publish_many, user_channel
+
+
+BATCH_SIZE = 500
+RECIPIENTS_TIMEOUT = 300
+
+
+@dataclass(frozen=True)
+class NotificationTemplate:
+    """notification_type plus title/message format strings, e.g. 'Ticket Closed: {ticket.ticket_id}'"""
+    notification_type: str
+    title: str
+    message: str
+
+    def render(self, context):
+        return self.title.format(**context), self.message.format(**context)
+
+
+def role_recipients(role, tenant_id=None):
+    """Ids of the users with `role` in a tenant (or platform-wide), cached until a user changes"""
+    scope = ALL_TENANTS if tenant_id is None else tenant_id
+    version, = get_versions(scope, ('users',))
+    key = f'notify:recipients:{scope}:{role}:{version}'
+    ids = cache.get(key)
+    if ids is None:
+        users = get_user_model().objects.filter(role=role)
+        if tenant_id is not None:
+            users = users.filter(tenant_id=tenant_id)
+        ids = list(users.order_by('pk').values_list('pk', flat=True))
+        cache.set(key, ids, RECIPIENTS_TIMEOUT)
+    return ids
+
+
+def _recipient_ids(recipients):
+    """Users or user ids, de-duplicated in order; None entries are skipped"""
+    ids = []
+    for recipient in recipients:
+        pk = getattr(recipient, 'pk', recipient)
+        if pk is not None and pk not in ids:
+            ids.append(pk)
+    return ids
+
+
+def _write(model_label, rows):
+    model = apps.get_model(model_label)
+    notifications = model.objects.bulk_create([model(**row) for row in rows], batch_size=BATCH_SIZE)
+    # Each recipient's open tabs get the row pushed instead of polling for it
+    publish_many([
+        (
+            user_channel(notification.recipient_id),
+            model_label.lower(),
+            {
+                'id': notification.pk,
+                'notification_type': notification.notification_type,
+                'title': notification.title,
+                'message': notification.message,
+            },
+        )
+        for notification in notifications
+    ])
+    return len(rows)
+
+
+@shared_task
+def deliver_notifications(model_label, rows):
+    """Write notification rows that dispatch_many() deferred to the queue"""
+    return _write(model_label, rows)
+
+
+def dispatch_many(model, template, notices, defer=None):
+    """
+    Write one `model` row per recipient of each (recipients, context, fields)
+    notice. `fields` are extra columns of the row, e.g. {'ticket_id': ticket.pk}.
+    Returns the number of rows written (or queued).
+    """
+    rows = []
+    for recipients, context, fields in notices:
+        title, message = template.render(context)
+        rows.extend(
+            {
+                'recipient_id': recipient_id,
+                'notification_type': template.notification_type,
+                'title': title,
+                'message': message,
+                **fields,
+            }
+            for recipient_id in _recipient_ids(recipients)
+        )
+    if not rows:
+        return 0
+
+    if defer is None:
+        defer = settings.NOTIFICATIONS_ASYNC
+    label = model._meta.label
+    if defer:
+        for start in range(0, len(rows), BATCH_SIZE):
+            transaction.on_commit(partial(deliver_notifications.delay, label, rows[start:start + BATCH_SIZE]))
+    else:
+        _write(label, rows)
+    return len(rows)
+
+
+def dispatch(model, recipients, template, context, defer=None, **fields):
+    """Notify every recipient of one rendered template"""
+    return dispatch_many(model, template, [(recipients, context, fields)], defer=defer)
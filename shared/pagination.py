@@ -0,0 +1,137 @@
+"""
+Pagination for the API.
+
+PageNumberPagination is the default for every list endpoint.
+CreatedAtCursorPagination is DRF cursor pagination ordered by
+(created_at, id), which viewsets enable with `pagination_class`. The cursor
+holds a created_at position, so a page is an index range scan from there
+however deep the client scrolls, and no COUNT(*) is run. It is not a full
+(created_at, id) keyset: id only breaks ties in ORDER BY, and rows sharing
+the position's created_at are stepped over with a small OFFSET. Responses
+are {next, previous, results}. While a ?search= is ranked (shared/search.py)
+it pages by number instead, so the best matches come first, and so does a
+request carrying ?page=, for clients that still read `count` and page
+numbers.
+
+Page-number lists can report a planner estimate instead of an exact
+count, either through `estimated_count = True` on the view or ?count=estimate.
+Exact counts are still used below PAGINATION_EXACT_COUNT_LIMIT rows.
+
+No response carries more than API_MAX_PAGE_SIZE rows, whatever page_size
+is requested. Unpaginated list views cap their querysets with cap_rows(),
+or with CappedListMixin once the filter backends have run.
+"""
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework import pagination
+from rest_framework.settings import api_settings
+
+from .search import is_ranked
+
+
+def planner_estimate(queryset):
+    """Rows PostgreSQL expects `queryset` to return (from table statistics); None elsewhere"""
+    if not isinstance(queryset, QuerySet):
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cap_rows(queryset):
+    """Slice an unpaginated list to the response row budget"""
+    return queryset[:settings.API_MAX_PAGE_SIZE]
+
+
+class CappedListMixin:
+    """For unpaginated generic list views: caps the rows after filtering and ordering"""
+
+    def filter_queryset(self, queryset):
+        # Slicing earlier, in get_queryset(), would break ?search= and ?ordering=
+        return cap_rows(super().filter_queryset(queryset))
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count comes from the planner once a list is large"""
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = planner_estimate(self.object_list)
+        if estimate is None or estimate < settings.PAGINATION_EXACT_COUNT_LIMIT:
+            return super().count
+        self.estimated = True
+        return estimate
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if getattr(view, 'estimated_count', False) or request.query_params.get(self.count_query_param) == 'estimate':
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if getattr(self.page.paginator, 'estimated', False):
+            response.data['count_is_estimate'] = True
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_is_estimate'] = {'type': 'boolean'}
+        return schema
+
+
+class CreatedAtCursorPagination(pagination.CursorPagination):
+    """Newest first by (created_at, id); subclasses may change `ordering`"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # A cursor can't hold a relevance position; ranked searches page by number
+        by_number = is_ranked(queryset) or PageNumberPagination.page_query_param in request.query_params
+        self.numbered = PageNumberPagination() if by_number else None
+        if self.numbered is not None:
+            return self.numbered.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.numbered is not None:
+            return self.numbered.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_ordering(self, request, queryset, view):
+        # OrderingFilter only decides when the client asks for an ordering;
+        # otherwise it would fall back to the view's (usually unset) default
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return super().get_ordering(request, queryset, view)
+        return self.ordering
+
+
+class OldestFirstCursorPagination(CreatedAtCursorPagination):
+    """Chronological (created_at, id), e.g. for conversation threads"""
+    ordering = ('created_at', 'id')
@@ -0,0 +1,170 @@
+"""
+Server push backplane.
+
+Events are published to channels - one per user, one per tenant and one for
+platform admins - and streamed to browsers by shared/sse.py. With REDIS_URL
+each channel is a capped Redis stream, so any ASGI worker can serve any
+subscriber and a reconnecting client resumes from its Last-Event-ID. Without
+Redis an in-process broker stands in (tests, runserver); it never sees events
+published by other processes, including Celery workers.
+
+Publishing happens after the surrounding transaction commits, so a
+subscriber that refetches on an event always sees the new row.
+"""
+import json
+import threading
+from collections import defaultdict, deque
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+
+PLATFORM = 'platform'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def tenant_channel(tenant_id):
+    return f'tenant:{tenant_id}'
+
+
+def channels_for(user):
+    """Channels a user may subscribe to"""
+    channels = [user_channel(user.pk)]
+    if user.tenant_id:
+        channels.append(tenant_channel(user.tenant_id))
+    if user.role == 'platform_admin':
+        channels.append(PLATFORM)
+    return channels
+
+
+class MemoryBroker:
+    """Single-process stand-in for the Redis backplane"""
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self.streams = defaultdict(deque)
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def publish_many(self, messages):
+        with self.condition:
+            for channel, payload in messages:
+                self.sequence += 1
+                stream = self.streams[channel]
+                stream.append((str(self.sequence), payload))
+                while len(stream) > self.maxlen:
+                    stream.popleft()
+            self.condition.notify_all()
+
+    def latest(self, channel):
+        with self.condition:
+            stream = self.streams.get(channel)
+            return stream[-1][0] if stream else '0'
+
+    def _pending(self, positions):
+        return [
+            (channel, event_id, payload)
+            for channel, last_id in positions.items()
+            for event_id, payload in self.streams.get(channel, ())
+            if int(event_id) > int(last_id)
+        ]
+
+    def _wait(self, positions, timeout):
+        with self.condition:
+            pending = self._pending(positions)
+            if not pending:
+                self.condition.wait(timeout)
+                pending = self._pending(positions)
+            return pending
+
+    async def read(self, positions, timeout):
+        return await sync_to_async(self._wait, thread_sensitive=False)(positions, timeout)
+
+
+class RedisBroker:
+    """Capped Redis streams, one per channel"""
+
+    def __init__(self, url, maxlen):
+        import redis
+        import redis.asyncio
+
+        self.maxlen = maxlen
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.async_client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(channel):
+        return f'push:{channel}'
+
+    def publish_many(self, messages):
+        pipe = self.client.pipeline(transaction=False)
+        for channel, payload in messages:
+            pipe.xadd(self._key(channel), {'event': payload}, maxlen=self.maxlen, approximate=True)
+        pipe.execute()
+
+    def latest(self, channel):
+        entries = self.client.xrevrange(self._key(channel), count=1)
+        return entries[0][0] if entries else '0-0'
+
+    async def read(self, positions, timeout):
+        streams = {self._key(channel): last_id for channel, last_id in positions.items()}
+        response = await self.async_client.xread(streams, count=100, block=max(1, int(timeout * 1000)))
+        prefix = len(self._key(''))
+        return [
+            (key[prefix:], event_id, fields['event'])
+            for key, entries in response or ()
+            for event_id, fields in entries
+        ]
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        if settings.REDIS_URL:
+            _broker = RedisBroker(settings.REDIS_URL, settings.PUSH_STREAM_MAXLEN)
+        else:
+            _broker = MemoryBroker(settings.PUSH_STREAM_MAXLEN)
+    return _broker
+
+
+def _send(messages):
+    get_broker().publish_many(messages)
+
+
+def publish_many(events):
+    """Publish (channel, event_type, data) triples once the current transaction commits"""
+    messages = [
+        (channel, json.dumps({'type': event_type, 'data': data}, cls=DjangoJSONEncoder))
+        for channel, event_type, data in events
+    ]
+    if messages:
+        transaction.on_commit(partial(_send, messages))
+
+
+def publish(channel, event_type, data):
+    publish_many([(channel, event_type, data)])
+
+
+def encode_positions(positions):
+    """Last-Event-ID for a subscriber: every channel's last delivered id"""
+    return '|'.join(f'{channel}={event_id}' for channel, event_id in positions.items())
+
+
+def resume_positions(channels, last_event_id=None):
+    """Start positions: from Last-Event-ID where it covers a channel, otherwise the current end"""
+    resumed = {}
+    for part in (last_event_id or '').split('|'):
+        channel, _, event_id = part.partition('=')
+        if channel in channels and event_id:
+            resumed[channel] = event_id
+    broker = get_broker()
+    return {channel: resumed.get(channel) or broker.latest(channel) for channel in channels}
@@ -0,0 +1,227 @@
+"""
+Indexed, ranked search.
+
+Models opt in with index_for_search() from their signals module, which
+declares two kinds of fields:
+
+  document     - (field, weight) pairs folded into the model's search_vector
+                 column (tsvector, 'simple' config, GIN index). A BEFORE
+                 INSERT/UPDATE trigger, created by search_trigger() in the
+                 model's migration, computes it in the same write, so the
+                 migration must freeze the same fields.
+  identifiers  - short fields (SKU, email, phone, ticket number) matched as
+                 substrings. Their migrations add pg_trgm GIN indexes on
+                 UPPER(field), which is the expression Django's icontains
+                 compiles to.
+
+search() matches every word of the term as a prefix against the document
+or the whole term inside any identifier, and annotates `search_rank`.
+Prefix matches come from the tsvector index and substring matches from the
+trigram indexes, so type-ahead needs no table scan. SearchFilter plugs this
+into DRF's ?search= for registered models; a view that declares its own
+search_fields keeps DRF's lookups over them instead. Cursor-paginated lists switch
+to page numbers while a search is ranked (see shared/pagination.py).
+
+On databases other than PostgreSQL (SQLite test runs) an in-memory token
+index over the queryset stands in. The rebuild_search_index command
+recomputes stored vectors, e.g. after a document changes.
+"""
+import re
+from dataclasses import dataclass
+from functools import partial
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections, migrations
+from django.db.models import Case, F, FloatField, Q, TextField, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+from rest_framework import filters
+
+
+CONFIG = 'simple'
+VECTOR_FIELD = 'search_vector'
+RANK = 'search_rank'
+_registry = {}
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    document: tuple
+    identifiers: tuple = ()
+
+    @property
+    def fields(self):
+        return {field for field, _ in self.document} | set(self.identifiers)
+
+
+def document_vector(document):
+    """SearchVector over (field, weight) pairs; usable from migrations"""
+    vectors = [
+        SearchVector(Coalesce(Cast(field, TextField()), Value('')), weight=weight, config=CONFIG)
+        for field, weight in document
+    ]
+    vector = vectors[0]
+    for other in vectors[1:]:
+        vector = vector + other
+    return vector
+
+
+def _vector_sql(document, row=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('{CONFIG}', coalesce({row}\"{column}\"::text, '')), '{weight}')"
+        for column, weight in document
+    )
+
+
+def _create_search_trigger(app_label, model_name, document, apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model(app_label, model_name)._meta.db_table
+    columns = ', '.join(f'"{column}"' for column, _ in document)
+    schema_editor.execute(
+        f'CREATE OR REPLACE FUNCTION "{table}_search_vector"() RETURNS trigger AS $$ '
+        f'BEGIN NEW."{VECTOR_FIELD}" := {_vector_sql(document, "NEW.")}; RETURN NEW; END '
+        f'$$ LANGUAGE plpgsql'
+    )
+    schema_editor.execute(
+        f'CREATE TRIGGER "{table}_search_vector" BEFORE INSERT OR UPDATE OF {columns} ON "{table}" '
+        f'FOR EACH ROW EXECUTE FUNCTION "{table}_search_vector"()'
+    )
+    schema_editor.execute(f'UPDATE "{table}" SET "{VECTOR_FIELD}" = {_vector_sql(document)}')
+
+
+def _drop_search_trigger(app_label, model_name, apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = apps.get_model(app_label, model_name)._meta.db_table
+    schema_editor.execute(f'DROP TRIGGER IF EXISTS "{table}_search_vector" ON "{table}"')
+    schema_editor.execute(f'DROP FUNCTION IF EXISTS "{table}_search_vector"()')
+
+
+def search_trigger(app_label, model_name, document):
+    """
+    Migration operation computing search_vector in the same INSERT/UPDATE that
+    writes the document columns, which also covers bulk_create and
+    queryset.update(). Existing rows are filled in; a no-op off PostgreSQL.
+    """
+    return migrations.RunPython(
+        partial(_create_search_trigger, app_label, model_name, tuple(document)),
+        partial(_drop_search_trigger, app_label, model_name),
+    )
+
+
+def _is_postgres(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def refresh(model, queryset=None):
+    """Recompute search_vector for `queryset` (all rows by default); returns rows updated"""
+    queryset = model._default_manager.all() if queryset is None else queryset
+    if not _is_postgres(queryset):
+        return 0
+    return queryset.update(**{VECTOR_FIELD: document_vector(_registry[model].document)})
+
+
+def index_for_search(model, document, identifiers=()):
+    """Register `model` for search(); its migration's trigger maintains search_vector"""
+    _registry[model] = SearchSpec(tuple(document), tuple(identifiers))
+    return _registry[model]
+
+
+def is_searchable(model):
+    return model in _registry
+
+
+def searchable_models():
+    return list(_registry)
+
+
+def is_ranked(queryset):
+    """Whether search() ordered `queryset` by relevance"""
+    return RANK in queryset.query.annotations
+
+
+def _words(term):
+    return re.findall(r'\w+', term.lower())
+
+
+def prefix_query(term):
+    """Every word of the term as a prefix ('ring gold' -> 'ring:* & gold:*'), or None"""
+    words = _words(term)
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=CONFIG)
+
+
+def search(queryset, term):
+    """Rows of `queryset` matching `term`, annotated with search_rank and best first"""
+    spec = _registry[queryset.model]
+    term = term.strip()
+    if not term:
+        return queryset
+    if not _is_postgres(queryset):
+        return _memory_search(queryset, spec, term)
+
+    query = prefix_query(term)
+    match = Q()
+    ranks = []
+    if query is not None:
+        match |= Q(**{VECTOR_FIELD: query})
+        ranks.append(SearchRank(F(VECTOR_FIELD), query))
+    for field in spec.identifiers:
+        match |= Q(**{f'{field}__icontains': term})
+        ranks.append(TrigramWordSimilarity(term, field))
+    if not ranks:
+        return queryset.none()
+    rank = ranks[0] if len(ranks) == 1 else Greatest(*ranks)
+    return queryset.filter(match).annotate(**{RANK: rank}).order_by(f'-{RANK}', '-pk')
+
+
+class MemoryIndex:
+    """Token index over (pk, {field: value}) rows, for databases without tsvector / pg_trgm"""
+
+    def __init__(self, rows, spec):
+        self.spec = spec
+        self.entries = []
+        for pk, values in rows:
+            tokens = set()
+            for field, _ in spec.document:
+                tokens.update(_words(str(values.get(field) or '')))
+            identifiers = [str(values.get(field) or '').lower() for field in spec.identifiers]
+            self.entries.append((pk, tokens, identifiers))
+
+    def search(self, term):
+        words = _words(term)
+        needle = term.lower()
+        results = []
+        for pk, tokens, identifiers in self.entries:
+            score = 0.0
+            if words and all(any(token.startswith(word) for token in tokens) for word in words):
+                score += sum(1.0 if word in tokens else 0.5 for word in words) / len(words)
+            if any(needle in value for value in identifiers):
+                score += 1.0
+            if score:
+                results.append((pk, score))
+        return results
+
+
+def _memory_search(queryset, spec, term):
+    fields = sorted(spec.fields)
+    rows = ((row['pk'], row) for row in queryset.values('pk', *fields))
+    matches = MemoryIndex(rows, spec).search(term)
+    if not matches:
+        return queryset.none()
+    rank = Case(*(When(pk=pk, then=Value(score)) for pk, score in matches), output_field=FloatField())
+    return queryset.filter(pk__in=[pk for pk, _ in matches]).annotate(**{RANK: rank}).order_by(f'-{RANK}', '-pk')
+
+
+class SearchFilter(filters.SearchFilter):
+    """
+    DRF's SearchFilter, answered from the search index for registered models
+    unless the view narrows the search with its own search_fields
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if terms and is_searchable(queryset.model) and not self.get_search_fields(view, request):
+            return search(queryset, ' '.join(terms))
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,122 @@
+"""
+Server-Sent Events endpoint for the push backplane (shared/push.py).
+
+GET /api/push/stream/ streams the events of the user's channels. EventSource
+can't send headers, and a JWT in the query string would end up in access
+and proxy logs, so browsers first POST /api/push/ticket/ (with the usual
+Authorization header) and open the stream with ?ticket=. A ticket is good
+for one connection within PUSH_TICKET_SECONDS. Browsers reconnect with the
+Last-Event-ID header and the stream resumes after the last delivered event.
+
+Needs an ASGI server (core.asgi under gunicorn's uvicorn worker). Under
+WSGI Django reads an async streaming response to the end before sending
+it, so the endpoint answers 501 there instead of holding a worker forever.
+Django 4.2 does not stop the generator when the client disconnects, so
+every stream ends after PUSH_STREAM_MAX_SECONDS and EventSource reconnects.
+
+Streams need REDIS_URL outside development: the in-process broker only
+reaches subscribers of the process that published, never events from other
+workers or from Celery.
+"""
+import json
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .push import channels_for, encode_positions, get_broker, resume_positions
+
+
+def _ticket_key(ticket):
+    return f'push:ticket:{ticket}'
+
+
+def issue_ticket(user):
+    """A random single-use token that opens one stream for `user`"""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), user.pk, settings.PUSH_TICKET_SECONDS)
+    return ticket
+
+
+def redeem_ticket(ticket):
+    """The user a ticket was issued to, or None; a ticket can be redeemed once"""
+    key = _ticket_key(ticket)
+    user_id = cache.get(key)
+    # Only the caller whose delete removed the key gets the user
+    if user_id is None or not cache.delete(key):
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+class StreamTicketView(APIView):
+    """POST /api/push/ticket/: a ticket for opening the event stream from a browser"""
+
+    def post(self, request):
+        return Response({'ticket': issue_ticket(request.user), 'expires_in': settings.PUSH_TICKET_SECONDS})
+
+
+def _authenticate(request):
+    ticket = request.GET.get('ticket')
+    if ticket:
+        return redeem_ticket(ticket)
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        user = auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+async def _events(positions):
+    broker = get_broker()
+    deadline = time.monotonic() + settings.PUSH_STREAM_MAX_SECONDS
+    # Tell EventSource how long to wait before reconnecting
+    yield 'retry: 3000\n\n'
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # A disconnected client is never noticed; ending the stream bounds its cost
+            return
+        events = await broker.read(positions, min(settings.PUSH_HEARTBEAT_SECONDS, remaining))
+        if not events:
+            # Keeps proxies from closing an idle connection
+            yield ': keepalive\n\n'
+            continue
+        for channel, event_id, payload in events:
+            positions[channel] = event_id
+            event = json.loads(payload)
+            yield f"id: {encode_positions(positions)}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def event_stream(request):
+    """Stream the authenticated user's push events"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Push streams need the ASGI server (core.asgi).'}, status=501)
+    if not settings.REDIS_URL and not settings.PUSH_MEMORY_BROKER:
+        return JsonResponse({'detail': 'Push streams need REDIS_URL.'}, status=503)
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    channels = channels_for(user)
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    positions = await sync_to_async(resume_positions)(channels, last_event_id)
+
+    response = StreamingHttpResponse(_events(positions), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,350 @@
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.test import TestCase, override_settings
+from rest_framework.generics import ListAPIView
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.clients.models import Client
+from apps.products.models import Product
+from apps.support.models import SupportNotification, SupportTicket
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from . import instrumentation, notifications, push
+from .cache import ALL_TENANTS, bump, cached_payload, check_shared_cache, get_versions
+from .instrumentation import MemoryStore, summarize
+from .push import MemoryBroker, encode_positions, resume_positions, user_channel
+from .search import RANK, MemoryIndex, SearchFilter, SearchSpec, is_ranked, search
+from .sse import issue_ticket, redeem_ticket
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'build': self.builds}
+
+    def test_payload_is_reused_until_a_domain_is_bumped(self):
+        self.assertEqual(cached_payload(7, 'dash', ('sales', 'clients'), self.build), {'build': 1})
+        self.assertEqual(cached_payload(7, 'dash', ('sales', 'clients'), self.build), {'build': 1})
+        bump(7, 'clients')
+        self.assertEqual(cached_payload(7, 'dash', ('sales', 'clients'), self.build), {'build': 2})
+
+    def test_bump_reaches_the_platform_scope_but_not_other_tenants(self):
+        other, = get_versions(8, ('sales',))
+        platform, = get_versions(ALL_TENANTS, ('sales',))
+        bump(7, 'sales')
+        self.assertEqual(get_versions(8, ('sales',)), [other])
+        self.assertEqual(get_versions(ALL_TENANTS, ('sales',)), [platform + 1])
+
+    def test_saving_a_product_bumps_after_commit(self):
+        tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        version, = get_versions(tenant.pk, ('products',))
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Product.objects.create(name='Ring', sku='R-1', cost_price=1, selling_price=2, tenant=tenant)
+            self.assertEqual(get_versions(tenant.pk, ('products',)), [version])
+        self.assertTrue(callbacks)
+        self.assertEqual(get_versions(tenant.pk, ('products',)), [version + 1])
+
+    def test_deploy_check_rejects_a_per_process_cache(self):
+        local = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with override_settings(CACHES=local):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['shared.E001'])
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+class MemoryBrokerTests(TestCase):
+    def test_read_returns_events_after_each_position(self):
+        broker = MemoryBroker(maxlen=10)
+        broker.publish_many([('a', 'one'), ('b', 'two'), ('a', 'three')])
+
+        events = broker._wait({'a': '1', 'b': '0'}, timeout=0)
+
+        self.assertEqual(events, [('a', '3', 'three'), ('b', '2', 'two')])
+        self.assertEqual(broker.latest('a'), '3')
+        self.assertEqual(broker.latest('missing'), '0')
+
+    def test_streams_are_capped(self):
+        broker = MemoryBroker(maxlen=2)
+        broker.publish_many([('a', str(n)) for n in range(5)])
+        self.assertEqual([payload for _, _, payload in broker._wait({'a': '0'}, timeout=0)], ['3', '4'])
+
+    def test_resume_positions_use_last_event_id_then_the_current_end(self):
+        broker = MemoryBroker(maxlen=10)
+        broker.publish_many([('user:1', 'x'), ('tenant:1', 'y')])
+        with mock.patch.object(push, '_broker', broker):
+            positions = resume_positions(['user:1', 'tenant:1'], encode_positions({'user:1': '0'}))
+        self.assertEqual(positions, {'user:1': '0', 'tenant:1': '2'})
+
+
+@override_settings(PUSH_MEMORY_BROKER=True, REDIS_URL='')
+class EventStreamTests(TestCase):
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.user = User.objects.create_user(username='rep', password='x', role='inhouse_sales', tenant=tenant)
+        self.broker = MemoryBroker(maxlen=10)
+        patcher = mock.patch.object(push, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def read_stream(self, **params):
+        response = await self.async_client.get('/api/push/stream/', params)
+        if not response.streaming:
+            return response, ''
+        return response, ''.join([chunk.decode() async for chunk in response.streaming_content])
+
+    def test_ticket_endpoint_requires_authentication(self):
+        api = APIClient()
+        self.assertEqual(api.post('/api/push/ticket/').status_code, 401)
+        api.force_authenticate(self.user)
+        response = api.post('/api/push/ticket/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(redeem_ticket(response.data['ticket']), self.user)
+
+    def test_ticket_is_single_use(self):
+        ticket = issue_ticket(self.user)
+        self.assertEqual(redeem_ticket(ticket), self.user)
+        self.assertIsNone(redeem_ticket(ticket))
+        self.assertIsNone(redeem_ticket('unknown'))
+
+    @override_settings(PUSH_STREAM_MAX_SECONDS=0)
+    async def test_stream_ends_after_its_lifetime(self):
+        response, body = await self.read_stream(ticket=issue_ticket(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(body, 'retry: 3000\n\n')
+
+    @override_settings(PUSH_STREAM_MAX_SECONDS=1, PUSH_HEARTBEAT_SECONDS=1)
+    async def test_stream_resumes_after_last_event_id(self):
+        channel = user_channel(self.user.pk)
+        self.broker.publish_many([(channel, '{"type": "notification", "data": {"id": 7}}')])
+
+        response, body = await self.read_stream(
+            ticket=issue_ticket(self.user), last_event_id=encode_positions({channel: '0'})
+        )
+
+        self.assertIn(f'id: {channel}=1', body)
+        self.assertIn('event: notification\ndata: {"id": 7}\n\n', body)
+
+    async def test_jwt_in_the_query_string_is_rejected(self):
+        response, _ = await self.read_stream(token=str(AccessToken.for_user(self.user)))
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(PUSH_MEMORY_BROKER=False)
+    async def test_stream_is_refused_without_redis(self):
+        response, _ = await self.read_stream(ticket=issue_ticket(self.user))
+        self.assertEqual(response.status_code, 503)
+
+    def test_stream_needs_the_asgi_server(self):
+        self.assertEqual(self.client.get('/api/push/stream/').status_code, 501)
+
+
+class SearchFilterTests(TestCase):
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.ring = Product.objects.create(
+            name='Gold ring', sku='GR-1', cost_price=1, selling_price=2, tenant=tenant
+        )
+        self.chain = Product.objects.create(
+            name='Chain', sku='CH-1', description='Pairs with a ring', cost_price=1, selling_price=2, tenant=tenant
+        )
+
+    def filter(self, term, **view_attributes):
+        view = type('ProductList', (ListAPIView,), view_attributes)()
+        request = view.initialize_request(APIRequestFactory().get('/', {'search': term}))
+        return list(SearchFilter().filter_queryset(request, Product.objects.all(), view))
+
+    def test_registered_models_are_answered_from_the_index(self):
+        self.assertCountEqual(self.filter('ring'), [self.ring, self.chain])
+
+    def test_view_search_fields_take_precedence(self):
+        self.assertEqual(self.filter('ring', search_fields=['name']), [self.ring])
+
+
+class MemorySearchTests(TestCase):
+    def setUp(self):
+        self.spec = SearchSpec(document=(('name', 'A'), ('description', 'C')), identifiers=('sku',))
+        self.index = MemoryIndex([
+            (1, {'name': 'Gold ring', 'description': '', 'sku': 'GR-100'}),
+            (2, {'name': 'Ring box', 'description': 'Velvet', 'sku': 'BX-7'}),
+            (3, {'name': 'Chain', 'description': None, 'sku': 'CH-1'}),
+        ], self.spec)
+
+    def test_every_word_must_match_a_token_prefix(self):
+        self.assertEqual(dict(self.index.search('gold ri')), {1: 0.75})
+        self.assertEqual(dict(self.index.search('ring')), {1: 1.0, 2: 1.0})
+        self.assertEqual(self.index.search('gold velvet'), [])
+
+    def test_identifiers_match_as_substrings(self):
+        self.assertEqual(dict(self.index.search('r-10')), {1: 1.0})
+        self.assertEqual(dict(self.index.search('bx-7')), {2: 1.0})
+
+    def test_search_ranks_the_queryset_best_first(self):
+        tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        ring, rings = (
+            Product.objects.create(name=name, sku=sku, cost_price=1, selling_price=2, tenant=tenant)
+            for name, sku in (('Ring', 'R-1'), ('Rings set', 'R-2'))
+        )
+
+        results = search(Product.objects.all(), 'ring')
+        self.assertTrue(is_ranked(results))
+        self.assertEqual([(product, getattr(product, RANK)) for product in results], [(ring, 1.0), (rings, 0.5)])
+        self.assertFalse(search(Product.objects.all(), 'bangle').exists())
+        self.assertFalse(is_ranked(search(Product.objects.all(), '  ')))
+
+
+class ClientListPaginationTests(TestCase):
+    def setUp(self):
+        tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.api = APIClient()
+        self.api.force_authenticate(
+            User.objects.create_user(username='owner', password='x', role='business_admin', tenant=tenant)
+        )
+        self.clients = [
+            Client.objects.create(tenant=tenant, email=f'client{n}@example.com', first_name=f'Client {n}')
+            for n in range(5)
+        ]
+        # Three rows share a created_at, so only the id orders them
+        Client.objects.filter(pk__in=[c.pk for c in self.clients[1:4]]).update(created_at=timezone.now())
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(set(response.data), {'next', 'previous', 'results'})
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next'] and urlsplit(response.data['next'])._replace(scheme='', netloc='').geturl()
+        return ids
+
+    def test_cursor_pages_follow_created_at_then_id_across_ties(self):
+        expected = list(Client.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(self.walk('/api/clients/clients/?page_size=2'), expected)
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        response = self.api.get('/api/clients/clients/', {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_page_numbers_on_request(self):
+        response = self.api.get('/api/clients/clients/', {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class NotificationDispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.owner = User.objects.create_user(username='owner', password='x', role='business_admin', tenant=self.tenant)
+        self.admins = [
+            User.objects.create_user(username=f'admin{n}', password='x', role='platform_admin') for n in range(3)
+        ]
+        self.tickets = [
+            SupportTicket.objects.create(title=f'Issue {n}', summary='x', created_by=self.owner, tenant=self.tenant)
+            for n in range(2)
+        ]
+        self.template = notifications.NotificationTemplate(
+            SupportNotification.NotificationType.TICKET_CREATED, 'New ticket: {ticket.title}', 'From {user}'
+        )
+        self.broker = MemoryBroker(maxlen=10)
+        patcher = mock.patch.object(push, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def notices(self):
+        recipients = self.admins + [self.admins[0], None]
+        return [(recipients, {'ticket': ticket, 'user': 'owner'}, {'ticket_id': ticket.pk}) for ticket in self.tickets]
+
+    def test_rows_for_every_recipient_and_notice_are_written_together(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                written = notifications.dispatch_many(SupportNotification, self.template, self.notices(), defer=False)
+
+        self.assertEqual(written, 6)
+        self.assertEqual(
+            set(SupportNotification.objects.values_list('recipient_id', 'title')),
+            {(admin.pk, f'New ticket: {ticket.title}') for admin in self.admins for ticket in self.tickets},
+        )
+        pushed = self.broker._wait({user_channel(self.admins[0].pk): '0'}, timeout=0)
+        self.assertEqual(len(pushed), 2)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=True)
+    def test_deferred_rows_are_written_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications.dispatch_many(SupportNotification, self.template, self.notices(), defer=True)
+            self.assertFalse(SupportNotification.objects.exists())
+        self.assertEqual(SupportNotification.objects.count(), 6)
+
+    def test_role_recipients_are_cached_until_a_user_changes(self):
+        ids = [admin.pk for admin in self.admins]
+        self.assertEqual(notifications.role_recipients('platform_admin'), ids)
+        with self.assertNumQueries(0):
+            notifications.role_recipients('platform_admin')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            extra = User.objects.create_user(username='admin3', password='x', role='platform_admin')
+        self.assertEqual(notifications.role_recipients('platform_admin'), ids + [extra.pk])
+        self.assertEqual(notifications.role_recipients('business_admin', self.tenant.pk), [self.owner.pk])
+
+
+@override_settings(METRICS_ENABLED=True, QUERY_BUDGETS={}, QUERY_BUDGET_DEFAULT=30, METRICS_TOKEN='')
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.api = APIClient()
+        self.api.force_authenticate(
+            User.objects.create_user(username='owner', password='x', role='business_admin', tenant=self.tenant)
+        )
+        Client.objects.create(tenant=self.tenant, email='asha@example.com', first_name='Asha')
+        self.store = MemoryStore(window=10)
+        patcher = mock.patch.object(instrumentation, '_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_are_sampled_per_view_and_tenant(self):
+        self.assertEqual(self.api.get('/api/clients/clients/').status_code, 200)
+
+        stats = summarize()['client-list']
+        self.assertEqual((stats['requests'], stats['window'], stats['over_budget']), (1, 1, 0))
+        self.assertGreater(stats['max_queries'], 0)
+        self.assertFalse(stats['flagged'])
+        self.assertIn('client-list', summarize(self.tenant.pk))
+        self.assertEqual(summarize(self.tenant.pk + 1), {})
+
+    @override_settings(QUERY_BUDGETS={'client-list': 1})
+    def test_requests_over_budget_are_logged_and_flagged(self):
+        with self.assertLogs('shared.instrumentation', 'WARNING') as logs:
+            self.api.get('/api/clients/clients/')
+
+        self.assertIn('client-list', logs.output[0])
+        stats = summarize()['client-list']
+        self.assertEqual((stats['over_budget'], stats['query_budget']), (1, 1))
+        self.assertTrue(stats['flagged'])
+
+    def test_unresolved_urls_are_not_recorded(self):
+        self.assertEqual(self.api.get('/api/no-such-endpoint/').status_code, 404)
+        self.assertEqual(summarize(), {})
+
+    def test_a_failing_store_does_not_fail_the_request(self):
+        with mock.patch.object(self.store, 'record', side_effect=ConnectionError('down')):
+            with self.assertLogs('shared.instrumentation', 'ERROR'):
+                self.assertEqual(self.api.get('/api/clients/clients/').status_code, 200)
+
+    def test_prometheus_endpoint_needs_the_token(self):
+        self.api.get('/api/clients/clients/')
+        self.assertEqual(self.client.get('/api/metrics/prometheus/').status_code, 404)
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/api/metrics/prometheus/').status_code, 401)
+            response = self.client.get('/api/metrics/prometheus/', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('crm_requests_total{endpoint="client-list"} 1', response.content.decode())
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TelecallingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'telecalling'
+
+    def ready(self):
+        import telecalling.signals
@@ -0,0 +1,149 @@
+"""
+Bulk lead assignment for managers.
+
+bulk_assign() distributes customer visits over telecallers in one
+transaction: the visits are locked, Assignment and Notification rows are
+written with bulk_create and the visits are flagged with a single UPDATE,
+so a failure leaves nothing half-assigned. Balancing strategies:
+
+  round_robin  - visits go to the telecallers in turn (the original behaviour)
+  least_loaded - each visit goes to the telecaller with the fewest open assignments
+  weighted     - like least_loaded, but a telecaller's share grows with their
+                 conversion rate (connected calls with positive sentiment)
+"""
+import heapq
+from itertools import cycle
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q, prefetch_related_objects
+from django.utils import timezone
+
+from shared.notifications import NotificationTemplate, dispatch_many
+from .models import Assignment, CallLog, CustomerVisit, Notification
+
+
+User = get_user_model()
+OPEN_STATUSES = ['assigned', 'in_progress', 'follow_up']
+BATCH_SIZE = 1000
+
+NEW_ASSIGNMENT = NotificationTemplate(
+    'assignment', "New Assignment", "You have been assigned to call {visit.customer_name}"
+)
+
+
+def open_loads(telecaller_ids):
+    """{telecaller_id: open assignment count}, one grouped query"""
+    rows = Assignment.objects.filter(
+        telecaller_id__in=telecaller_ids, status__in=OPEN_STATUSES
+    ).values('telecaller_id').annotate(count=Count('id')).order_by()
+    loads = {telecaller_id: 0 for telecaller_id in telecaller_ids}
+    loads.update({row['telecaller_id']: row['count'] for row in rows})
+    return loads
+
+
+def conversion_rates(telecaller_ids):
+    """{telecaller_id: share of calls that converted, 0..1}, one grouped query"""
+    rows = CallLog.objects.filter(assignment__telecaller_id__in=telecaller_ids).values(
+        'assignment__telecaller_id'
+    ).annotate(
+        calls=Count('id'),
+        conversions=Count('id', filter=Q(call_status='connected', customer_sentiment='positive')),
+    ).order_by()
+    rates = {telecaller_id: 0.0 for telecaller_id in telecaller_ids}
+    rates.update({
+        row['assignment__telecaller_id']: row['conversions'] / row['calls']
+        for row in rows if row['calls']
+    })
+    return rates
+
+
+def _balanced(telecaller_ids, count, weights):
+    """Give each of `count` leads to the telecaller with the lowest (load + 1) / weight"""
+    loads = open_loads(telecaller_ids)
+    heap = [((loads[t] + 1) / weights[t], position, t) for position, t in enumerate(telecaller_ids)]
+    heapq.heapify(heap)
+    picks = []
+    for _ in range(count):
+        _, position, telecaller_id = heapq.heappop(heap)
+        picks.append(telecaller_id)
+        loads[telecaller_id] += 1
+        heapq.heappush(heap, ((loads[telecaller_id] + 1) / weights[telecaller_id], position, telecaller_id))
+    return picks
+
+
+def round_robin(telecaller_ids, count):
+    turns = cycle(telecaller_ids)
+    return [next(turns) for _ in range(count)]
+
+
+def least_loaded(telecaller_ids, count):
+    return _balanced(telecaller_ids, count, {t: 1.0 for t in telecaller_ids})
+
+
+def weighted(telecaller_ids, count):
+    # A telecaller converting every call takes twice the share of one converting none
+    rates = conversion_rates(telecaller_ids)
+    return _balanced(telecaller_ids, count, {t: 1.0 + rates[t] for t in telecaller_ids})
+
+
+STRATEGIES = {
+    'round_robin': round_robin,
+    'least_loaded': least_loaded,
+    'weighted': weighted,
+}
+
+
+def bulk_assign(assigned_by, telecaller_ids, customer_visit_ids, priority='medium', notes='', strategy='round_robin'):
+    """
+    Assign the visits to the telecallers; returns (assignments, skipped visit ids).
+    Visits that are missing or already assigned are skipped. Raises
+    ValueError for unknown telecallers or strategies.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown assignment strategy '{strategy}'")
+    telecaller_ids = list(dict.fromkeys(telecaller_ids))
+    if not telecaller_ids:
+        raise ValueError("At least one telecaller is required")
+    telecallers = User.objects.in_bulk(telecaller_ids)
+    missing = [telecaller_id for telecaller_id in telecaller_ids if telecaller_id not in telecallers]
+    if missing:
+        raise ValueError(f"Unknown telecaller ids: {missing}")
+
+    with transaction.atomic():
+        # Locking the visits keeps two managers from assigning the same lead
+        visits = list(
+            CustomerVisit.objects.select_for_update(of=('self',))
+            .select_related('sales_rep')
+            .filter(pk__in=customer_visit_ids, assigned_to_telecaller=False)
+            .order_by('pk')
+        )
+        found = {visit.pk for visit in visits}
+        skipped = [visit_id for visit_id in dict.fromkeys(customer_visit_ids) if visit_id not in found]
+        if not visits:
+            return [], skipped
+
+        picks = STRATEGIES[strategy](telecaller_ids, len(visits))
+        assignments = Assignment.objects.bulk_create([
+            Assignment(
+                telecaller=telecallers[telecaller_id],
+                customer_visit=visit,
+                assigned_by=assigned_by,
+                priority=priority,
+                notes=notes,
+            )
+            for visit, telecaller_id in zip(visits, picks)
+        ], batch_size=BATCH_SIZE)
+
+        CustomerVisit.objects.filter(pk__in=found).update(assigned_to_telecaller=True, updated_at=timezone.now())
+        for visit in visits:
+            visit.assigned_to_telecaller = True
+
+        dispatch_many(Notification, NEW_ASSIGNMENT, [
+            ([assignment.telecaller_id], {'visit': assignment.customer_visit}, {'related_assignment_id': assignment.pk})
+            for assignment in assignments
+        ])
+
+    # New assignments have no call logs; one query fills the cache the serializer reads
+    prefetch_related_objects(assignments, 'call_logs')
+    return assignments, skipped
@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from django.db.models import Min
+from django.utils import timezone
+from telecalling.models import CallLog
+from telecalling.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily per-telecaller Analytics rollups from the call logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD), defaults to the first call log')
+        parser.add_argument('--until', help='Last day to rebuild (YYYY-MM-DD), defaults to today')
+
+    def handle(self, *args, **options):
+        if options['since']:
+            since = date.fromisoformat(options['since'])
+        else:
+            first_call = CallLog.objects.aggregate(first=Min('call_time'))['first']
+            if first_call is None:
+                self.stdout.write('No call logs to roll up')
+                return
+            since = timezone.localtime(first_call).date()
+        until = date.fromisoformat(options['until']) if options['until'] else timezone.localdate()
+
+        written = rebuild_rollups(since, until)
+        self.stdout.write(self.style.SUCCESS(f'{written} telecaller rollup rows written for {since} to {until}'))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 12:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('telecalling', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analytics',
+            name='telecaller',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='telecalling_analytics', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='analytics',
+            name='total_calls',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analytics',
+            name='unconnected_calls',
+            field=models.IntegerField(default=0, help_text='No answer, busy or call back'),
+        ),
+        migrations.AddField(
+            model_name='analytics',
+            name='total_call_duration',
+            field=models.IntegerField(default=0, help_text='Duration in seconds'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='analytics',
+            unique_together={('date', 'telecaller')},
+        ),
+    ]
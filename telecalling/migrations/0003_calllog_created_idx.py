@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telecalling', '0002_analytics_telecaller_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calllog',
+            index=models.Index(fields=['-created_at', '-id'], name='calllog_created_idx'),
+        ),
+    ]
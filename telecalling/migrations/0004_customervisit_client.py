@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copies of apps.clients.identity.normalize_email / normalize_phone as of
+# this migration, so later changes there can't change what history computes
+NATIONAL_NUMBER_LENGTH = 10
+
+
+def normalize_email(value):
+    value = str(value or '').strip().lower()
+    return value or None
+
+
+def normalize_phone(value):
+    value = str(value or '').strip()
+    digits = re.sub(r'\D', '', value)
+    if not digits:
+        return None
+    if value.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    else:
+        country_code = getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '91')
+        digits = digits.lstrip('0')
+        if not (digits.startswith(country_code) and len(digits) > NATIONAL_NUMBER_LENGTH):
+            digits = country_code + digits
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f'+{digits}'
+
+
+def link_visits(apps, schema_editor):
+    CustomerVisit = apps.get_model('telecalling', 'CustomerVisit')
+    Client = apps.get_model('clients', 'Client')
+    visits = list(CustomerVisit.objects.values_list('pk', 'sales_rep__tenant_id', 'customer_phone', 'customer_email'))
+    tenant_ids = {tenant_id for _, tenant_id, _, _ in visits if tenant_id}
+
+    # (tenant, normalized phone or email) -> client; phones and emails cannot collide
+    clients = {}
+    for pk, tenant_id, email, phone in Client.objects.filter(tenant_id__in=tenant_ids, is_deleted=False).values_list(
+        'pk', 'tenant_id', 'email_normalized', 'phone_normalized'
+    ):
+        for key in (email, phone):
+            if key:
+                clients[(tenant_id, key)] = pk
+
+    linked = []
+    for pk, tenant_id, phone, email in visits:
+        client_id = clients.get((tenant_id, normalize_phone(phone))) or clients.get((tenant_id, normalize_email(email)))
+        if client_id:
+            linked.append(CustomerVisit(pk=pk, client_id=client_id))
+    CustomerVisit.objects.bulk_update(linked, ['client'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0018_client_identity_backfill'),
+        ('telecalling', '0003_calllog_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customervisit',
+            name='client',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='visits', to='clients.client'),
+        ),
+        migrations.RunPython(link_visits, migrations.RunPython.noop),
+    ]
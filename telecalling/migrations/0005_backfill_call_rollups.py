@@ -0,0 +1,60 @@
+import zoneinfo
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+# Frozen copy of rollups.UNCONNECTED_STATUSES
+UNCONNECTED_STATUSES = ['no_answer', 'busy', 'call_back']
+
+
+def backfill_rollups(apps, schema_editor):
+    """Roll every existing call log into the daily per-telecaller rows, as rebuild_rollups() does"""
+    Analytics = apps.get_model('telecalling', 'Analytics')
+    CallLog = apps.get_model('telecalling', 'CallLog')
+
+    tz = zoneinfo.ZoneInfo(settings.TIME_ZONE)
+    rows = CallLog.objects.annotate(day=TruncDate('call_time', tzinfo=tz)).values(
+        'day', 'assignment__telecaller_id'
+    ).annotate(
+        total_calls=Count('id'),
+        connected_calls=Count('id', filter=Q(call_status='connected')),
+        conversions=Count('id', filter=Q(call_status='connected', customer_sentiment='positive')),
+        unconnected_calls=Count('id', filter=Q(call_status__in=UNCONNECTED_STATUSES)),
+        total_call_duration=Coalesce(Sum('call_duration'), 0),
+    ).order_by()
+
+    Analytics.objects.filter(telecaller__isnull=False).delete()
+    Analytics.objects.bulk_create(
+        [
+            Analytics(
+                date=row['day'],
+                telecaller_id=row['assignment__telecaller_id'],
+                total_calls=row['total_calls'],
+                connected_calls=row['connected_calls'],
+                conversions=row['conversions'],
+                unconnected_calls=row['unconnected_calls'],
+                total_call_duration=row['total_call_duration'],
+                avg_call_duration=row['total_call_duration'] / row['total_calls'],
+                conversion_rate=(
+                    row['conversions'] / row['connected_calls'] * 100 if row['connected_calls'] else 0
+                ),
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telecalling', '0004_customervisit_client'),
+    ]
+
+    operations = [
+        # The rows stay correct after unapplying, so there is nothing to undo
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
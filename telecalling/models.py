@@ -8,6 +8,10 @@ class CustomerVisit(models.Model):
     customer_name = models.CharField(max_length=255)
     customer_phone = models.CharField(max_length=20)
     customer_email = models.EmailField(blank=True, null=True)
+    # Existing client with this phone or email, matched at capture (see apps/clients/identity.py)
+    client = models.ForeignKey(
+        'clients.Client', on_delete=models.SET_NULL, null=True, blank=True, related_name='visits'
+    )
     interests = models.JSONField(default=list, help_text="List of product interests")
     visit_timestamp = models.DateTimeField(default=timezone.now)
     notes = models.TextField(blank=True)
@@ -75,6 +79,11 @@ class CallLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='calllog_created_idx'),
+        ]
+
     def __str__(self):
         return f"CallLog {self.id} for Assignment {self.assignment_id}"
 
@@ -146,6 +155,10 @@ class Notification(models.Model):
 class Analytics(models.Model):
     """Analytics tracking for conversion rates and performance metrics"""
     date = models.DateField()
+    telecaller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='telecalling_analytics'
+    )
     total_leads = models.IntegerField(default=0)
     assigned_leads = models.IntegerField(default=0)
     connected_calls = models.IntegerField(default=0)
@@ -153,10 +166,14 @@ class Analytics(models.Model):
     avg_call_duration = models.FloatField(default=0)
     engagement_score_avg = models.FloatField(default=0)
     conversion_rate = models.FloatField(default=0)
+    # Daily counters, incremented as call logs are created (see rollups.py)
+    total_calls = models.IntegerField(default=0)
+    unconnected_calls = models.IntegerField(default=0, help_text="No answer, busy or call back")
+    total_call_duration = models.IntegerField(default=0, help_text="Duration in seconds")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ['date']
+        unique_together = ['date', 'telecaller']
 
     def __str__(self):
         return f"Analytics for {self.date}"
@@ -0,0 +1,112 @@
+"""
+Daily per-telecaller call rollups in the Analytics table.
+
+Every new CallLog adds to its telecaller's row for the call's day with a
+single F() UPDATE, so concurrent calls never lose an increment. The
+telecalling dashboards sum these rows instead of counting CallLog.
+rebuild_rollups() recomputes any date range from the raw logs (for
+edits and deletes, which are not applied incrementally).
+"""
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
+from django.utils import timezone
+
+from .models import Analytics, CallLog
+
+
+UNCONNECTED_STATUSES = ['no_answer', 'busy', 'call_back']
+
+
+def _counters(call_log):
+    connected = call_log.call_status == 'connected'
+    return {
+        'total_calls': 1,
+        'connected_calls': int(connected),
+        'conversions': int(connected and call_log.customer_sentiment == 'positive'),
+        'unconnected_calls': int(call_log.call_status in UNCONNECTED_STATUSES),
+        'total_call_duration': call_log.call_duration or 0,
+    }
+
+
+def _ratio(numerator, denominator, scale=1):
+    """numerator * scale / denominator as a float SQL expression, 0 when the denominator is 0"""
+    return Coalesce(
+        Cast(numerator, FloatField()) * scale / Cast(NullIf(denominator, Value(0)), FloatField()),
+        Value(0.0),
+    )
+
+
+def record_call(call_log):
+    """Add a newly created call log to its telecaller's daily row"""
+    day = timezone.localtime(call_log.call_time).date()
+    telecaller_id = call_log.assignment.telecaller_id
+    counters = _counters(call_log)
+
+    # get_or_create retries the get if a concurrent call inserted the row first
+    Analytics.objects.get_or_create(date=day, telecaller_id=telecaller_id)
+
+    new = {field: F(field) + value for field, value in counters.items()}
+    Analytics.objects.filter(date=day, telecaller_id=telecaller_id).update(
+        **new,
+        avg_call_duration=_ratio(new['total_call_duration'], new['total_calls']),
+        conversion_rate=_ratio(new['conversions'], new['connected_calls'], 100),
+    )
+
+
+def rebuild_rollups(start, end):
+    """Recompute the rows for the days start..end (inclusive) from CallLog; returns rows written"""
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.combine(start, time.min), tz)
+    until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    rows = CallLog.objects.filter(call_time__gte=since, call_time__lt=until).annotate(
+        day=TruncDate('call_time', tzinfo=tz),
+    ).values('day', 'assignment__telecaller_id').annotate(
+        total_calls=Count('id'),
+        connected_calls=Count('id', filter=Q(call_status='connected')),
+        conversions=Count('id', filter=Q(call_status='connected', customer_sentiment='positive')),
+        unconnected_calls=Count('id', filter=Q(call_status__in=UNCONNECTED_STATUSES)),
+        total_call_duration=Coalesce(Sum('call_duration'), 0),
+    ).order_by()
+
+    rollups = [
+        Analytics(
+            date=row['day'],
+            telecaller_id=row['assignment__telecaller_id'],
+            total_calls=row['total_calls'],
+            connected_calls=row['connected_calls'],
+            conversions=row['conversions'],
+            unconnected_calls=row['unconnected_calls'],
+            total_call_duration=row['total_call_duration'],
+            avg_call_duration=row['total_call_duration'] / row['total_calls'],
+            conversion_rate=(
+                row['conversions'] / row['connected_calls'] * 100 if row['connected_calls'] else 0
+            ),
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        Analytics.objects.filter(date__range=(start, end), telecaller__isnull=False).delete()
+        Analytics.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def call_totals(telecaller=None):
+    """Summed counters over all days (for one telecaller, or everyone), in one query"""
+    rows = Analytics.objects.filter(telecaller__isnull=False)
+    if telecaller is not None:
+        rows = rows.filter(telecaller=telecaller)
+    totals = rows.aggregate(
+        total_calls=Coalesce(Sum('total_calls'), 0),
+        connected_calls=Coalesce(Sum('connected_calls'), 0),
+        conversions=Coalesce(Sum('conversions'), 0),
+        unconnected_calls=Coalesce(Sum('unconnected_calls'), 0),
+        total_call_duration=Coalesce(Sum('total_call_duration'), 0),
+    )
+    connected = totals['connected_calls']
+    calls = totals['total_calls']
+    totals['conversion_rate'] = totals['conversions'] / connected * 100 if connected else 0
+    totals['avg_call_duration'] = totals['total_call_duration'] / calls if calls else 0
+    return totals
@@ -24,10 +24,10 @@ class CustomerVisitSerializer(serializers.ModelSerializer):
         model = CustomerVisit
         fields = [
             'id', 'sales_rep', 'sales_rep_details', 'customer_name', 'customer_phone', 
-            'customer_email', 'interests', 'visit_timestamp', 'notes', 'lead_quality',
+            'customer_email', 'client', 'interests', 'visit_timestamp', 'notes', 'lead_quality',
             'assigned_to_telecaller', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['sales_rep', 'created_at', 'updated_at']
+        read_only_fields = ['sales_rep', 'client', 'created_at', 'updated_at']
 
 class CallLogSerializer(serializers.ModelSerializer):
     class Meta:
@@ -92,9 +92,9 @@ class AnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Analytics
         fields = [
-            'id', 'date', 'total_leads', 'assigned_leads', 'connected_calls',
+            'id', 'date', 'telecaller', 'total_leads', 'assigned_leads', 'connected_calls',
             'conversions', 'avg_call_duration', 'engagement_score_avg', 'conversion_rate',
-            'created_at'
+            'total_calls', 'unconnected_calls', 'total_call_duration', 'created_at'
         ]
         read_only_fields = ['created_at']
 
@@ -113,6 +113,11 @@ class BulkAssignmentSerializer(serializers.Serializer):
         default='medium'
     )
     notes = serializers.CharField(required=False, allow_blank=True)
+    strategy = serializers.ChoiceField(
+        choices=[('round_robin', 'Round Robin'), ('least_loaded', 'Least Loaded'), ('weighted', 'Weighted by Conversion')],
+        default='round_robin',
+        help_text="How leads are balanced across the telecallers"
+    )
 
 # Assignment statistics serializer
 class AssignmentStatsSerializer(serializers.Serializer):
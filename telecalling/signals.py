@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import CallLog
+from .rollups import record_call
+
+
+@receiver(post_save, sender=CallLog)
+def update_call_rollups(sender, instance, created, raw=False, **kwargs):
+    """Count new calls into the daily per-telecaller Analytics row"""
+    if raw or not created:
+        return
+    record_call(instance)
@@ -1,3 +1,155 @@
+from importlib import import_module
+
+from django.apps import apps
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.clients.models import Client
+from apps.tenants.models import Tenant
+from apps.users.models import User
+from .assignment import bulk_assign
+from .models import Analytics, Assignment, CallLog, CustomerVisit, Notification
+from .rollups import call_totals, rebuild_rollups
+
+
+class VisitCaptureTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.rep = User.objects.create_user(
+            username='rep', password='x', role='inhouse_sales', tenant=self.tenant
+        )
+        self.api = APIClient()
+        self.api.force_authenticate(self.rep)
+
+    def capture(self, **fields):
+        data = {'customer_name': 'Asha Rao', 'customer_phone': '98765 43210', 'interests': [], **fields}
+        response = self.api.post('/api/telecalling/customer-visits/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return CustomerVisit.objects.get(pk=response.data['id'])
+
+    def test_visit_is_linked_to_the_client_with_the_same_phone(self):
+        client = Client.objects.create(tenant=self.tenant, email='asha@example.com', phone='+91 98765 43210')
+        self.assertEqual(self.capture().client, client)
+
+    def test_visit_is_linked_by_email_when_the_phone_differs(self):
+        client = Client.objects.create(tenant=self.tenant, email='asha@example.com', phone='9000000001')
+        self.assertEqual(self.capture(customer_email='Asha@Example.com').client, client)
+
+    def test_clients_of_other_tenants_are_not_linked(self):
+        other = Tenant.objects.create(name='Silver House', slug='silver-house')
+        Client.objects.create(tenant=other, email='asha@example.com', phone='9876543210')
+        self.assertIsNone(self.capture().client)
+
+
+class CallRollupTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.rep = User.objects.create_user(username='rep', password='x', role='inhouse_sales', tenant=self.tenant)
+        self.asha = User.objects.create_user(username='asha', password='x', role='tele_calling', tenant=self.tenant)
+        self.ravi = User.objects.create_user(username='ravi', password='x', role='tele_calling', tenant=self.tenant)
+
+    def log_call(self, telecaller, call_status='connected', sentiment='neutral', duration=60):
+        visit = CustomerVisit.objects.create(sales_rep=self.rep, customer_name='Lead', customer_phone='9876543210')
+        assignment = Assignment.objects.create(telecaller=telecaller, customer_visit=visit)
+        return CallLog.objects.create(
+            assignment=assignment, call_status=call_status, customer_sentiment=sentiment, call_duration=duration
+        )
+
+    def test_each_call_increments_the_daily_row(self):
+        self.log_call(self.asha, sentiment='positive', duration=120)
+        self.log_call(self.asha, duration=60)
+        self.log_call(self.asha, call_status='busy', duration=0)
+
+        row = Analytics.objects.get(telecaller=self.asha, date=timezone.localdate())
+        self.assertEqual(
+            (row.total_calls, row.connected_calls, row.conversions, row.unconnected_calls, row.total_call_duration),
+            (3, 2, 1, 1, 180),
+        )
+        self.assertEqual(row.avg_call_duration, 60)
+        self.assertEqual(row.conversion_rate, 50)
+
+    def test_call_totals_sum_the_rollups(self):
+        self.log_call(self.asha, sentiment='positive')
+        self.log_call(self.ravi, duration=30)
+        self.log_call(self.ravi, call_status='no_answer', duration=0)
+
+        totals = call_totals()
+        self.assertEqual((totals['total_calls'], totals['connected_calls'], totals['conversions']), (3, 2, 1))
+        self.assertEqual(totals['conversion_rate'], 50)
+        self.assertEqual(totals['avg_call_duration'], 30)
+        self.assertEqual(call_totals(telecaller=self.ravi)['conversion_rate'], 0)
+        self.assertEqual(call_totals(telecaller=self.asha)['total_calls'], 1)
+
+    def test_rebuild_matches_the_incremental_rows(self):
+        self.log_call(self.asha, sentiment='positive')
+        self.log_call(self.ravi)
+        incremental = call_totals()
+
+        today = timezone.localdate()
+        self.assertEqual(rebuild_rollups(today, today), 2)
+        self.assertEqual(call_totals(), incremental)
+
+    def test_migration_backfills_calls_logged_before_the_rollups(self):
+        self.log_call(self.asha, sentiment='positive', duration=90)
+        self.log_call(self.ravi)
+        Analytics.objects.all().delete()
+
+        import_module('telecalling.migrations.0005_backfill_call_rollups').backfill_rollups(apps, None)
+
+        self.assertEqual(call_totals(telecaller=self.asha)['total_call_duration'], 90)
+        self.assertEqual(call_totals()['conversions'], 1)
+
+
+class BulkAssignTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name='Gold House', slug='gold-house')
+        self.manager = User.objects.create_user(username='manager', password='x', role='manager', tenant=self.tenant)
+        self.rep = User.objects.create_user(username='rep', password='x', role='inhouse_sales', tenant=self.tenant)
+        self.asha = User.objects.create_user(username='asha', password='x', role='tele_calling', tenant=self.tenant)
+        self.ravi = User.objects.create_user(username='ravi', password='x', role='tele_calling', tenant=self.tenant)
+
+    def visits(self, count):
+        return [
+            CustomerVisit.objects.create(sales_rep=self.rep, customer_name=f'Lead {n}', customer_phone='9876543210').pk
+            for n in range(count)
+        ]
+
+    def owners(self, assignments):
+        return [assignment.telecaller for assignment in assignments]
+
+    def test_round_robin_takes_turns_and_skips_assigned_visits(self):
+        visit_ids = self.visits(3)
+        bulk_assign(self.manager, [self.asha.pk], visit_ids[:1])
+
+        assignments, skipped = bulk_assign(self.manager, [self.asha.pk, self.ravi.pk], visit_ids + [0])
+
+        self.assertEqual(self.owners(assignments), [self.asha, self.ravi])
+        self.assertEqual(skipped, [visit_ids[0], 0])
+        self.assertFalse(CustomerVisit.objects.filter(assigned_to_telecaller=False).exists())
+        self.assertEqual(Notification.objects.filter(recipient=self.ravi).count(), 1)
+
+    def test_least_loaded_evens_out_open_assignments(self):
+        bulk_assign(self.manager, [self.asha.pk], self.visits(2))
+
+        assignments, _ = bulk_assign(self.manager, [self.asha.pk, self.ravi.pk], self.visits(3), strategy='least_loaded')
+
+        self.assertEqual(self.owners(assignments), [self.ravi, self.ravi, self.asha])
+
+    def test_weighted_favours_the_better_converter(self):
+        converted, = bulk_assign(self.manager, [self.asha.pk], self.visits(1))[0]
+        CallLog.objects.create(assignment=converted, call_status='connected', customer_sentiment='positive')
+        Assignment.objects.filter(pk=converted.pk).update(status='completed')
+
+        assignments, _ = bulk_assign(self.manager, [self.asha.pk, self.ravi.pk], self.visits(6), strategy='weighted')
+
+        owners = self.owners(assignments)
+        # Weights 2 and 1: twice the share
+        self.assertEqual((owners.count(self.asha), owners.count(self.ravi)), (4, 2))
 
-# Create your tests here.
+    def test_unknown_telecallers_and_strategies_are_refused(self):
+        with self.assertRaises(ValueError):
+            bulk_assign(self.manager, [0], self.visits(1))
+        with self.assertRaises(ValueError):
+            bulk_assign(self.manager, [self.asha.pk], self.visits(1), strategy='random')
+        self.assertFalse(Assignment.objects.exists())
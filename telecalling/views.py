@@ -13,6 +13,18 @@ from .serializers import (
     CustomerProfileSerializer, NotificationSerializer, AnalyticsSerializer,
     BulkAssignmentSerializer, AssignmentStatsSerializer, DashboardDataSerializer
 )
+from .assignment import NEW_ASSIGNMENT, bulk_assign
+from .rollups import call_totals
+from apps.clients.identity import find_existing
+from shared.notifications import NotificationTemplate, dispatch
+from shared.pagination import CreatedAtCursorPagination, cap_rows
+
+FEEDBACK_RECEIVED = NotificationTemplate(
+    'feedback', "Call Feedback Received", "Feedback received for {visit.customer_name}"
+)
+FOLLOW_UP_SCHEDULED = NotificationTemplate(
+    'follow_up', "Follow-up Scheduled", "Follow-up scheduled for {visit.customer_name}"
+)
 
 class CustomerVisitViewSet(viewsets.ModelViewSet):
     """Step 1: In-House Sales Rep records customer visit info"""
@@ -40,7 +52,13 @@ class CustomerVisitViewSet(viewsets.ModelViewSet):
         return CustomerVisit.objects.none()
 
     def perform_create(self, serializer):
-        serializer.save(sales_rep=self.request.user)
+        # Link the visit to the tenant's client with the same phone or email, if any
+        client = find_existing(
+            self.request.user.tenant,
+            email=serializer.validated_data.get('customer_email'),
+            phone=serializer.validated_data.get('customer_phone'),
+        )
+        serializer.save(sales_rep=self.request.user, client=client)
 
     @action(detail=False, methods=['get'])
     def today_leads(self, request):
@@ -53,7 +71,7 @@ class CustomerVisitViewSet(viewsets.ModelViewSet):
             visit_timestamp__date=today,
             assigned_to_telecaller=False
         )
-        serializer = self.get_serializer(leads, many=True)
+        serializer = self.get_serializer(cap_rows(leads), many=True)
         return Response(serializer.data)
 
 class AssignmentViewSet(viewsets.ModelViewSet):
@@ -80,12 +98,9 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         customer_visit.save()
         
         # Create notification for telecaller
-        Notification.objects.create(
-            recipient=serializer.instance.telecaller,
-            title="New Assignment",
-            message=f"You have been assigned to call {customer_visit.customer_name}",
-            notification_type='assignment',
-            related_assignment=serializer.instance
+        dispatch(
+            Notification, [serializer.instance.telecaller_id], NEW_ASSIGNMENT,
+            {'visit': customer_visit}, related_assignment_id=serializer.instance.pk
         )
 
     @action(detail=False, methods=['post'])
@@ -100,40 +115,22 @@ class AssignmentViewSet(viewsets.ModelViewSet):
             customer_visit_ids = serializer.validated_data['customer_visit_ids']
             priority = serializer.validated_data['priority']
             notes = serializer.validated_data.get('notes', '')
+            strategy = serializer.validated_data['strategy']
             
-            assignments_created = []
-            for i, visit_id in enumerate(customer_visit_ids):
-                telecaller_id = telecaller_ids[i % len(telecaller_ids)]
-                try:
-                    assignment = Assignment.objects.create(
-                        telecaller_id=telecaller_id,
-                        customer_visit_id=visit_id,
-                        assigned_by=request.user,
-                        priority=priority,
-                        notes=notes
-                    )
-                    assignments_created.append(assignment)
-                    
-                    # Mark customer visit as assigned
-                    customer_visit = assignment.customer_visit
-                    customer_visit.assigned_to_telecaller = True
-                    customer_visit.save()
-                    
-                    # Create notification
-                    Notification.objects.create(
-                        recipient_id=telecaller_id,
-                        title="New Assignment",
-                        message=f"You have been assigned to call {customer_visit.customer_name}",
-                        notification_type='assignment',
-                        related_assignment=assignment
-                    )
-                except Exception as e:
-                    return Response({'error': f'Failed to create assignment: {str(e)}'}, 
-                                  status=status.HTTP_400_BAD_REQUEST)
+            # One transaction, bulk inserts (see assignment.py)
+            try:
+                assignments_created, skipped = bulk_assign(
+                    request.user, telecaller_ids, customer_visit_ids,
+                    priority=priority, notes=notes, strategy=strategy
+                )
+            except Exception as e:
+                return Response({'error': f'Failed to create assignments: {str(e)}'}, 
+                              status=status.HTTP_400_BAD_REQUEST)
             
             return Response({
                 'message': f'Successfully created {len(assignments_created)} assignments',
-                'assignments': AssignmentSerializer(assignments_created, many=True).data
+                'assignments': AssignmentSerializer(assignments_created, many=True).data,
+                'skipped_customer_visit_ids': skipped
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -181,6 +178,7 @@ class CallLogViewSet(viewsets.ModelViewSet):
     queryset = CallLog.objects.all()
     serializer_class = CallLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -206,12 +204,9 @@ class CallLogViewSet(viewsets.ModelViewSet):
         assignment.save()
 
         # Create notification for manager
-        Notification.objects.create(
-            recipient=assignment.assigned_by,
-            title="Call Feedback Received",
-            message=f"Feedback received for {assignment.customer_visit.customer_name}",
-            notification_type='feedback',
-            related_assignment=assignment
+        dispatch(
+            Notification, [assignment.assigned_by_id], FEEDBACK_RECEIVED,
+            {'visit': assignment.customer_visit}, related_assignment_id=assignment.pk
         )
         
         # Update customer profile
@@ -294,12 +289,9 @@ class FollowUpViewSet(viewsets.ModelViewSet):
         
         # Create notification for telecaller
         follow_up = serializer.instance
-        Notification.objects.create(
-            recipient=follow_up.assignment.telecaller,
-            title="Follow-up Scheduled",
-            message=f"Follow-up scheduled for {follow_up.assignment.customer_visit.customer_name}",
-            notification_type='follow_up',
-            related_assignment=follow_up.assignment
+        dispatch(
+            Notification, [follow_up.assignment.telecaller_id], FOLLOW_UP_SCHEDULED,
+            {'visit': follow_up.assignment.customer_visit}, related_assignment_id=follow_up.assignment_id
         )
 
     @action(detail=False, methods=['get'])
@@ -315,7 +307,7 @@ class FollowUpViewSet(viewsets.ModelViewSet):
             status='follow_up'
         ).distinct()
         
-        serializer = AssignmentSerializer(high_potential, many=True)
+        serializer = AssignmentSerializer(cap_rows(high_potential), many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -328,7 +320,7 @@ class FollowUpViewSet(viewsets.ModelViewSet):
             call_logs__call_status__in=['no_answer', 'busy', 'call_back']
         ).distinct()
         
-        serializer = AssignmentSerializer(unconnected, many=True)
+        serializer = AssignmentSerializer(cap_rows(unconnected), many=True)
         return Response(serializer.data)
 
 class CustomerProfileViewSet(viewsets.ModelViewSet):
@@ -419,6 +411,8 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
         
         if user.role == 'manager':
             today = timezone.now().date()
+            # Call counts come from the daily rollups (see rollups.py)
+            totals = call_totals()
             data = {
                 'today_leads': CustomerVisit.objects.filter(
                     visit_timestamp__date=today
@@ -426,31 +420,25 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
                 'pending_assignments': Assignment.objects.filter(
                     status='assigned'
                 ).count(),
-                'completed_calls': CallLog.objects.filter(
-                    call_status='connected'
-                ).count(),
+                'completed_calls': totals['connected_calls'],
                 'high_potential_leads': Assignment.objects.filter(
                     call_logs__customer_sentiment='positive',
                     status='follow_up'
                 ).distinct().count(),
-                'unconnected_calls': CallLog.objects.filter(
-                    call_status__in=['no_answer', 'busy', 'call_back']
-                ).count(),
+                'unconnected_calls': totals['unconnected_calls'],
                 'recent_activities': self.get_recent_activities(),
-                'performance_metrics': self.get_performance_metrics()
+                'performance_metrics': self.get_performance_metrics(totals)
             }
         elif user.role == 'tele_calling':
+            totals = call_totals(telecaller=user)
             data = {
                 'my_assignments': Assignment.objects.filter(telecaller=user).count(),
-                'completed_calls': CallLog.objects.filter(
-                    assignment__telecaller=user,
-                    call_status='connected'
-                ).count(),
+                'completed_calls': totals['connected_calls'],
                 'pending_followups': FollowUp.objects.filter(
                     assignment__telecaller=user,
                     status='pending'
                 ).count(),
-                'conversion_rate': self.calculate_telecaller_conversion_rate(user),
+                'conversion_rate': totals['conversion_rate'],
                 'recent_activities': self.get_telecaller_activities(user)
             }
         else:
@@ -492,9 +480,10 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
         activities.sort(key=lambda x: x['timestamp'], reverse=True)
         return activities[:10]
 
-    def get_performance_metrics(self):
+    def get_performance_metrics(self, totals=None):
         """Get performance metrics for manager dashboard"""
         today = timezone.now().date()
+        totals = totals or call_totals()
         
         return {
             'total_leads_today': CustomerVisit.objects.filter(
@@ -503,40 +492,17 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
             'assigned_leads_today': Assignment.objects.filter(
                 created_at__date=today
             ).count(),
-            'conversion_rate': self.calculate_overall_conversion_rate(),
-            'avg_call_duration': CallLog.objects.aggregate(
-                avg=Avg('call_duration')
-            )['avg'] or 0
+            'conversion_rate': totals['conversion_rate'],
+            'avg_call_duration': totals['avg_call_duration']
         }
 
     def calculate_overall_conversion_rate(self):
         """Calculate overall conversion rate"""
-        total_calls = CallLog.objects.filter(call_status='connected').count()
-        conversions = CallLog.objects.filter(
-            call_status='connected',
-            customer_sentiment='positive'
-        ).count()
-        
-        if total_calls > 0:
-            return (conversions / total_calls) * 100
-        return 0
+        return call_totals()['conversion_rate']
 
     def calculate_telecaller_conversion_rate(self, telecaller):
         """Calculate conversion rate for specific telecaller"""
-        total_calls = CallLog.objects.filter(
-            assignment__telecaller=telecaller,
-            call_status='connected'
-        ).count()
-        
-        conversions = CallLog.objects.filter(
-            assignment__telecaller=telecaller,
-            call_status='connected',
-            customer_sentiment='positive'
-        ).count()
-        
-        if total_calls > 0:
-            return (conversions / total_calls) * 100
-        return 0
+        return call_totals(telecaller=telecaller)['conversion_rate']
 
     def get_telecaller_activities(self, telecaller):
         """Get recent activities for telecaller"""